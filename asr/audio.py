@@ -0,0 +1,37 @@
+import asyncio
+import os
+import wave
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+def _read_wav(path: str) -> np.ndarray:
+    with wave.open(path, "rb") as f:
+        if f.getframerate() != SAMPLE_RATE or f.getnchannels() != 1 or f.getsampwidth() != 2:
+            raise ValueError("not 16 kHz mono PCM16")
+        pcm = f.readframes(f.getnframes())
+    return np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+
+async def load_audio(path: str) -> np.ndarray:
+    """
+    Load audio as a 16 kHz mono float32 array without blocking the event
+    loop. WAVs produced by RecordingFetcher are read directly; anything
+    else is decoded by ffmpeg.
+    """
+    if path.lower().endswith(".wav"):
+        try:
+            return await asyncio.to_thread(_read_wav, path)
+        except (ValueError, wave.Error):
+            pass
+
+    process = await asyncio.create_subprocess_exec(
+        os.getenv("FFMPEG_BINARY", "ffmpeg"), "-nostdin", "-loglevel", "error",
+        "-i", path, "-vn", "-f", "s16le", "-ac", "1", "-ar", str(SAMPLE_RATE), "-",
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    pcm, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise Exception(f"Failed to load audio: {stderr.decode(errors='ignore')[:500]}")
+    return np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
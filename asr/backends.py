@@ -0,0 +1,114 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Union
+import os
+
+import numpy as np
+
+class ASRBackend(ABC):
+    """
+    A speech recognition engine loaded inside a transcription worker.
+
+    transcribe() takes a local file path or a 16 kHz mono float32 array and
+    returns {"text", "language", "segments": [{"start", "end", "text"}]}.
+    """
+    name = None
+    default_compute_type = "float32"
+
+    def __init__(self, model_size: str, compute_type: Optional[str] = None, threads: int = 4):
+        self.model_size = model_size
+        self.compute_type = compute_type or self.default_compute_type
+        self.threads = threads
+
+    @abstractmethod
+    def load(self):
+        pass
+
+    @abstractmethod
+    def transcribe(self, audio: Union[str, np.ndarray], options: Optional[Dict] = None) -> Dict:
+        pass
+
+    def describe(self) -> str:
+        return f"{self.name}:{self.model_size}:{self.compute_type}"
+
+class WhisperBackend(ASRBackend):
+    """openai-whisper on PyTorch (fp32 on CPU)"""
+    name = "whisper"
+    default_compute_type = "float32"
+
+    def load(self):
+        import torch
+        import whisper
+
+        torch.set_num_threads(self.threads)
+        self.model = whisper.load_model(self.model_size, device="cpu")
+
+    def transcribe(self, audio, options=None) -> Dict:
+        result = self.model.transcribe(audio, fp16=self.compute_type == "float16", **(options or {}))
+        return {
+            "text": result["text"],
+            "language": result.get("language"),
+            "segments": [
+                {"start": segment["start"], "end": segment["end"], "text": segment["text"]}
+                for segment in result.get("segments", [])
+            ]
+        }
+
+class FasterWhisperBackend(ASRBackend):
+    """CTranslate2 Whisper via faster-whisper, int8-quantized on CPU by default"""
+    name = "faster-whisper"
+    default_compute_type = "int8"
+
+    def load(self):
+        from faster_whisper import WhisperModel
+
+        self.model = WhisperModel(
+            self.model_size,
+            device="cpu",
+            compute_type=self.compute_type,
+            cpu_threads=self.threads,
+            num_workers=1
+        )
+
+    def transcribe(self, audio, options=None) -> Dict:
+        options = dict(options or {})
+        segments, info = self.model.transcribe(
+            audio,
+            beam_size=options.pop("beam_size", 5),
+            # Silence is already removed by our own VAD
+            vad_filter=options.pop("vad_filter", False),
+            **options
+        )
+        segments = [
+            {"start": segment.start, "end": segment.end, "text": segment.text}
+            for segment in segments
+        ]
+        return {
+            "text": "".join(segment["text"] for segment in segments),
+            "language": info.language,
+            "segments": segments
+        }
+
+BACKENDS = {
+    WhisperBackend.name: WhisperBackend,
+    FasterWhisperBackend.name: FasterWhisperBackend,
+}
+
+def backend_config_from_env() -> Dict:
+    return {
+        "engine": os.getenv("ASR_ENGINE", "whisper"),
+        "model_size": os.getenv("ASR_MODEL_SIZE") or os.getenv("WHISPER_MODEL", "base"),
+        "compute_type": os.getenv("ASR_COMPUTE_TYPE") or None,
+    }
+
+def create_backend(engine: Optional[str] = None, model_size: Optional[str] = None,
+                   compute_type: Optional[str] = None, threads: int = 4) -> ASRBackend:
+    """Instantiate (without loading) the configured backend"""
+    config = backend_config_from_env()
+    engine = engine or config["engine"]
+    if engine not in BACKENDS:
+        raise ValueError(f"Unsupported ASR engine: {engine} (choose from {', '.join(BACKENDS)})")
+    return BACKENDS[engine](
+        model_size or config["model_size"],
+        compute_type=compute_type or config["compute_type"],
+        threads=threads
+    )
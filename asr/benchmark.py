@@ -0,0 +1,142 @@
+"""
+Compare ASR backends on local sample audio.
+
+    python -m asr.benchmark --samples ./samples \\
+        --engines whisper:base:float32 faster-whisper:base:int8 faster-whisper:small:int8
+
+Every audio file in the samples directory is transcribed by each engine
+(engine:model_size[:compute_type]). If a reference transcript with the same
+name and a .txt extension sits next to it, the word error rate is reported
+as well. RTF (real-time factor) is processing time divided by audio
+duration: below 1.0 is faster than real time.
+"""
+from typing import Dict, List, Optional
+import argparse
+import asyncio
+import json
+import os
+import re
+import time
+
+from asr.audio import SAMPLE_RATE, load_audio
+from asr.backends import create_backend
+
+AUDIO_EXTENSIONS = (".wav", ".mp3", ".m4a", ".mp4", ".ogg", ".opus", ".flac", ".webm")
+
+def normalize_words(text: str) -> List[str]:
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """Word-level Levenshtein distance divided by the reference length"""
+    ref = normalize_words(reference)
+    hyp = normalize_words(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, 1):
+            current[j] = min(
+                previous[j] + 1,  # deletion
+                current[j - 1] + 1,  # insertion
+                previous[j - 1] + (ref_word != hyp_word)  # substitution
+            )
+        previous = current
+    return previous[-1] / len(ref)
+
+def load_samples(samples_dir: str) -> List[Dict]:
+    samples = []
+    for name in sorted(os.listdir(samples_dir)):
+        path = os.path.join(samples_dir, name)
+        stem, extension = os.path.splitext(path)
+        if extension.lower() not in AUDIO_EXTENSIONS:
+            continue
+        reference = None
+        if os.path.exists(stem + ".txt"):
+            with open(stem + ".txt", encoding="utf-8") as f:
+                reference = f.read()
+        audio = asyncio.run(load_audio(path))
+        samples.append({"name": name, "audio": audio, "reference": reference})
+    return samples
+
+def run_engine(spec: str, samples: List[Dict], threads: int) -> Dict:
+    engine, _, rest = spec.partition(":")
+    model_size, _, compute_type = rest.partition(":")
+    backend = create_backend(engine, model_size or None, compute_type or None, threads)
+
+    started = time.perf_counter()
+    backend.load()
+    load_seconds = time.perf_counter() - started
+
+    audio_seconds = 0.0
+    processing_seconds = 0.0
+    errors: List[float] = []
+    weights: List[int] = []
+    results = []
+    for sample in samples:
+        duration = len(sample["audio"]) / SAMPLE_RATE
+        started = time.perf_counter()
+        result = backend.transcribe(sample["audio"])
+        elapsed = time.perf_counter() - started
+        audio_seconds += duration
+        processing_seconds += elapsed
+
+        wer = None
+        if sample["reference"] is not None:
+            wer = word_error_rate(sample["reference"], result["text"])
+            errors.append(wer)
+            weights.append(len(normalize_words(sample["reference"])))
+        results.append({
+            "sample": sample["name"],
+            "audio_seconds": round(duration, 2),
+            "rtf": round(elapsed / duration, 3) if duration else None,
+            "wer": round(wer, 4) if wer is not None else None,
+        })
+
+    # Corpus WER weights each sample by its reference length
+    total_words = sum(weights)
+    corpus_wer = sum(e * w for e, w in zip(errors, weights)) / total_words if total_words else None
+    return {
+        "engine": backend.describe(),
+        "load_seconds": round(load_seconds, 2),
+        "audio_seconds": round(audio_seconds, 2),
+        "processing_seconds": round(processing_seconds, 2),
+        "rtf": round(processing_seconds / audio_seconds, 3) if audio_seconds else None,
+        "wer": round(corpus_wer, 4) if corpus_wer is not None else None,
+        "samples": results,
+    }
+
+def print_table(reports: List[Dict]):
+    print(f"{'engine':<36} {'load s':>8} {'audio s':>9} {'RTF':>7} {'WER':>7}")
+    for report in reports:
+        wer = f"{report['wer']:.2%}" if report["wer"] is not None else "-"
+        rtf = f"{report['rtf']:.3f}" if report["rtf"] is not None else "-"
+        print(f"{report['engine']:<36} {report['load_seconds']:>8.1f} {report['audio_seconds']:>9.1f} {rtf:>7} {wer:>7}")
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Benchmark ASR backends (real-time factor and word error rate)")
+    parser.add_argument("--samples", required=True, help="Directory of audio files with optional .txt references")
+    parser.add_argument("--engines", nargs="+", default=["whisper:base", "faster-whisper:base:int8"],
+                        help="engine:model_size[:compute_type] specs to compare")
+    parser.add_argument("--threads", type=int, default=int(os.getenv("ASR_THREADS_PER_WORKER", "4")),
+                        help="CPU threads per engine (match ASR_THREADS_PER_WORKER)")
+    parser.add_argument("--json", dest="json_path", help="Also write the full report to this file")
+    args = parser.parse_args(argv)
+
+    samples = load_samples(args.samples)
+    if not samples:
+        parser.error(f"No audio files found in {args.samples}")
+    print(f"Loaded {len(samples)} samples from {args.samples}")
+
+    reports = []
+    for spec in args.engines:
+        print(f"Running {spec}...")
+        reports.append(run_engine(spec, samples, args.threads))
+    print_table(reports)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(reports, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Union
+import asyncio
+import itertools
+import multiprocessing
+import os
+import wave
+
+import numpy as np
+
+from asr.backends import backend_config_from_env, create_backend
+
+SAMPLE_RATE = 16000
+
+# Priority lanes: lower runs first
+LANE_LIVE = -1
+LANE_SHORT = 0
+LANE_NORMAL = 1
+
+class TranscriptionQueueFull(Exception):
+    """Raised when the transcription queue stays full past the admission timeout"""
+
+# --- Worker process side ---------------------------------------------------
+
+_worker_backend = None
+
+def _init_worker(engine: str, model_size: str, compute_type: Optional[str], threads: int):
+    """Runs once in every worker process: load the configured ASR backend"""
+    global _worker_backend
+    _worker_backend = create_backend(engine, model_size, compute_type, threads)
+    _worker_backend.load()
+
+def _ping() -> int:
+    return os.getpid()
+
+def _transcribe_in_worker(audio: Union[str, np.ndarray], options: Dict) -> Dict:
+    return _worker_backend.transcribe(audio, options)
+
+# --- API side --------------------------------------------------------------
+
+def audio_duration(audio: Union[str, np.ndarray]) -> Optional[float]:
+    """Duration in seconds for 16 kHz arrays and WAV files, None if unknown"""
+    if isinstance(audio, np.ndarray):
+        return len(audio) / SAMPLE_RATE
+    try:
+        with wave.open(audio, "rb") as f:
+            return f.getnframes() / float(f.getframerate())
+    except Exception:
+        return None
+
+def asr_worker_count(threads_per_worker: Optional[int] = None) -> int:
+    """ASR_WORKERS, by default as many workers as the CPUs can give their threads"""
+    threads_per_worker = threads_per_worker or int(os.getenv("ASR_THREADS_PER_WORKER", "4"))
+    default_workers = max(1, (os.cpu_count() or 1) // threads_per_worker)
+    return int(os.getenv("ASR_WORKERS", str(default_workers)))
+
+class TranscriptionEngine:
+    """
+    Pool of CPU worker processes, each holding its own loaded ASR backend
+    (see asr.backends), fed from a bounded priority queue.
+
+    Callers await results without ever blocking the event loop. When the
+    queue is full, submitters wait up to the admission timeout and are then
+    rejected with TranscriptionQueueFull (backpressure). Short clips go
+    through a higher-priority lane so they are not stuck behind hour-long
+    recordings.
+    """
+
+    def __init__(self, model_name: Optional[str] = None, workers: Optional[int] = None,
+                 threads_per_worker: Optional[int] = None, queue_depth: Optional[int] = None,
+                 short_clip_seconds: Optional[float] = None, admission_timeout: Optional[float] = None,
+                 engine: Optional[str] = None, compute_type: Optional[str] = None):
+        config = backend_config_from_env()
+        self.engine = engine or config["engine"]
+        self.model_name = model_name or config["model_size"]
+        self.compute_type = compute_type or config["compute_type"]
+        self.threads_per_worker = threads_per_worker or int(os.getenv("ASR_THREADS_PER_WORKER", "4"))
+        self.workers = workers or asr_worker_count(self.threads_per_worker)
+        self.queue_depth = queue_depth or int(os.getenv("ASR_QUEUE_DEPTH", "32"))
+        self.short_clip_seconds = short_clip_seconds or float(os.getenv("ASR_SHORT_CLIP_SECONDS", "120"))
+        self.admission_timeout = admission_timeout or float(os.getenv("ASR_ADMISSION_TIMEOUT_SECONDS", "30"))
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._dispatchers: List[asyncio.Task] = []
+        self._sequence = itertools.count()
+        self._pool_lock = asyncio.Lock()
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            # spawn: forking a process that already imported torch is unsafe
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.engine, self.model_name, self.compute_type, self.threads_per_worker)
+        )
+
+    async def _replace_pool(self, broken: ProcessPoolExecutor):
+        """
+        A worker process died (e.g. killed for memory), which breaks the
+        whole pool; start a new one, once however many dispatchers noticed
+        """
+        async with self._pool_lock:
+            if self._pool is not broken:
+                return
+            print("A transcription worker died, restarting the worker pool")
+            broken.shutdown(wait=False, cancel_futures=True)
+            self._pool = self._new_pool()
+
+    def _ensure_started(self):
+        if self._pool is not None:
+            return
+        backend = create_backend(self.engine, self.model_name, self.compute_type, self.threads_per_worker)
+        print(f"Starting {self.workers} transcription workers ({self.threads_per_worker} threads each, {backend.describe()})")
+        self._pool = self._new_pool()
+        self._queue = asyncio.PriorityQueue(maxsize=self.queue_depth)
+        # One dispatcher per worker keeps exactly `workers` jobs in flight
+        self._dispatchers = [asyncio.create_task(self._dispatch()) for _ in range(self.workers)]
+
+    async def warm_up(self):
+        """Start every worker process and load its model ahead of the first request"""
+        self._ensure_started()
+        loop = asyncio.get_running_loop()
+        # Each worker finishes its initializer (model load) before running a ping
+        await asyncio.gather(*(loop.run_in_executor(self._pool, _ping) for _ in range(self.workers)))
+
+    def stats(self) -> Dict:
+        return {
+            "engine": self.engine,
+            "model": self.model_name,
+            "workers": self.workers,
+            "threads_per_worker": self.threads_per_worker,
+            "queue_depth": self.queue_depth,
+            "queued": self._queue.qsize() if self._queue else 0,
+        }
+
+    async def transcribe(self, audio: Union[str, np.ndarray], priority: Optional[int] = None,
+                         options: Optional[Dict] = None) -> Dict:
+        """
+        Transcribe a local audio file or 16 kHz float32 array; returns
+        {"text", "language", "segments"}
+        """
+        self._ensure_started()
+        if priority is None:
+            duration = audio_duration(audio)
+            priority = LANE_SHORT if duration is not None and duration <= self.short_clip_seconds else LANE_NORMAL
+
+        future = asyncio.get_running_loop().create_future()
+        item = (priority, next(self._sequence), audio, options or {}, future)
+        try:
+            await asyncio.wait_for(self._queue.put(item), timeout=self.admission_timeout)
+        except asyncio.TimeoutError:
+            raise TranscriptionQueueFull(
+                f"Transcription queue is full ({self.queue_depth} waiting); retry later"
+            )
+        # If the caller is cancelled while queued, the dispatcher skips the item
+        return await future
+
+    async def _dispatch(self):
+        while True:
+            _, _, audio, options, future = await self._queue.get()
+            try:
+                if future.cancelled():
+                    continue
+                pool = self._pool
+                try:
+                    running = pool.submit(_transcribe_in_worker, audio, options)
+                except BrokenProcessPool:
+                    # Broke before this item reached it: not this item's fault
+                    await self._replace_pool(pool)
+                    pool = self._pool
+                    running = pool.submit(_transcribe_in_worker, audio, options)
+                try:
+                    result = await asyncio.wrap_future(running)
+                except BrokenProcessPool:
+                    # This item was in flight when a worker died; only it fails
+                    await self._replace_pool(pool)
+                    raise
+                if not future.cancelled():
+                    future.set_result(result)
+            except asyncio.CancelledError:
+                if not future.done():
+                    future.cancel()
+                raise
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self._queue.task_done()
+
+    async def aclose(self):
+        for task in self._dispatchers:
+            task.cancel()
+        await asyncio.gather(*self._dispatchers, return_exceptions=True)
+        self._dispatchers = []
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,281 @@
+from typing import Dict, Optional
+import aiohttp
+import asyncio
+import base64
+import hashlib
+import os
+import re
+import time
+
+from ingestion.http import get_session_pool
+
+_CONTENT_RANGE = re.compile(r"bytes (\d+)-(\d+)/(\d+|\*)")
+
+class RecordingFetcher:
+    """
+    Downloads platform recordings to a spool directory and extracts a 16 kHz
+    mono WAV for transcription.
+
+    The body is streamed to disk in chunks (never held in memory), an
+    interrupted download resumes with an HTTP Range request, and the result
+    is checked against the size and any checksum the server advertises.
+    On a fresh download the chunks are also piped straight into ffmpeg, so
+    audio extraction finishes together with the download and Whisper never
+    decodes video frames.
+    """
+
+    def __init__(self, spool_dir: Optional[str] = None, chunk_size: Optional[int] = None,
+                 retries: Optional[int] = None):
+        self.spool_dir = spool_dir or os.getenv("RECORDING_SPOOL_DIR", "./spool/recordings")
+        self.chunk_size = chunk_size or int(os.getenv("RECORDING_CHUNK_BYTES", str(1024 * 1024)))
+        self.retries = retries or int(os.getenv("RECORDING_DOWNLOAD_RETRIES", "3"))
+        self.keep_media = os.getenv("RECORDING_KEEP_MEDIA", "false").lower() == "true"
+        self.retention = float(os.getenv("RECORDING_SPOOL_RETENTION_HOURS", "24")) * 3600
+        self.ffmpeg = os.getenv("FFMPEG_BINARY", "ffmpeg")
+        self.sessions = get_session_pool()
+        os.makedirs(self.spool_dir, exist_ok=True)
+        self.sweep()
+
+    async def fetch_url(self, url: str, key: Optional[str] = None, headers: Optional[Dict] = None) -> str:
+        """
+        Return a local 16 kHz mono WAV for a recording URL (or local file)
+        """
+        if os.path.exists(url):
+            key = key or hashlib.sha256(os.path.abspath(url).encode()).hexdigest()[:16]
+            audio_path = self._path(key, ".wav")
+            if not self._reusable(audio_path, newer_than=os.path.getmtime(url)):
+                await self._extract_file(url, audio_path)
+            return audio_path
+
+        key = key or hashlib.sha256(url.encode()).hexdigest()[:16]
+        audio_path = self._path(key, ".wav")
+        if self._reusable(audio_path):
+            print(f"Using spooled audio {audio_path}")
+            return audio_path
+
+        media_path = self._path(key, ".media")
+        streamed = False
+        for attempt in range(1, self.retries + 1):
+            try:
+                streamed = await self._download(url, headers or {}, media_path, audio_path)
+                break
+            except (aiohttp.ClientError, asyncio.TimeoutError, ConnectionError) as e:
+                if attempt == self.retries:
+                    raise Exception(f"Recording download failed after {attempt} attempts: {str(e)}")
+                print(f"Recording download interrupted ({str(e)}), resuming (attempt {attempt + 1})")
+                await asyncio.sleep(min(2 ** attempt, 30))
+
+        if not streamed:
+            await self._extract_file(media_path, audio_path)
+        if not self.keep_media:
+            os.remove(media_path)
+        return audio_path
+
+    def release(self, audio_path: str):
+        """Delete a spooled WAV once its transcript is safely stored"""
+        try:
+            os.remove(audio_path)
+        except FileNotFoundError:
+            pass
+
+    def sweep(self):
+        """
+        Delete spool files older than RECORDING_SPOOL_RETENTION_HOURS: audio
+        of meetings that failed after extraction and abandoned downloads
+        (media kept with RECORDING_KEEP_MEDIA is left alone)
+        """
+        cutoff = time.time() - self.retention
+        for entry in os.scandir(self.spool_dir):
+            if self.keep_media and entry.name.endswith(".media"):
+                continue
+            try:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+    def _reusable(self, audio_path: str, newer_than: float = 0) -> bool:
+        """
+        A WAV left by an earlier attempt is reused while it is within the
+        retention window (and newer than its local source)
+        """
+        try:
+            mtime = os.path.getmtime(audio_path)
+        except FileNotFoundError:
+            return False
+        if mtime > newer_than and mtime >= time.time() - self.retention:
+            return True
+        os.remove(audio_path)
+        return False
+
+    def _path(self, key: str, suffix: str) -> str:
+        safe_key = re.sub(r"[^A-Za-z0-9._-]+", "_", key)
+        return os.path.join(self.spool_dir, safe_key + suffix)
+
+    async def _download(self, url: str, headers: Dict, media_path: str, audio_path: str) -> bool:
+        """
+        Stream url into media_path, resuming a previous partial download.
+        Returns True when audio was extracted from the stream on the fly.
+        """
+        if os.path.exists(media_path):
+            return False
+
+        part_path = media_path + ".part"
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        request_headers = dict(headers)
+        if offset:
+            request_headers["Range"] = f"bytes={offset}-"
+
+        session = await self.sessions.get("downloads")
+        # Large recordings: no overall deadline, only a stall timeout
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=30, sock_read=120)
+        async with session.get(url, headers=request_headers, timeout=timeout) as response:
+            if response.status == 416:
+                # Our partial file is unusable (e.g. the recording changed); start over
+                os.remove(part_path)
+                raise aiohttp.ClientPayloadError("Range not satisfiable, restarting download")
+            if response.status not in (200, 206):
+                error_text = await response.text()
+                raise Exception(f"Failed to download recording. Status: {response.status}, Response: {error_text[:500]}")
+
+            total = None
+            if response.status == 206:
+                match = _CONTENT_RANGE.match(response.headers.get("Content-Range", ""))
+                if not match or int(match.group(1)) != offset:
+                    raise Exception(f"Unexpected Content-Range: {response.headers.get('Content-Range')}")
+                if match.group(3) != "*":
+                    total = int(match.group(3))
+                print(f"Resuming download at byte {offset}")
+            else:
+                # Full body (server ignored or we sent no Range): start from scratch
+                offset = 0
+                if response.content_length is not None:
+                    total = response.content_length
+
+            md5 = hashlib.md5()
+            sha256 = hashlib.sha256()
+            if offset:
+                await asyncio.to_thread(self._hash_file, part_path, (md5, sha256))
+
+            # Only a download starting at byte 0 can be fed to ffmpeg as it arrives
+            extractor = await self._start_stream_extraction(audio_path) if offset == 0 else None
+
+            mode = "ab" if offset else "wb"
+            try:
+                with open(part_path, mode) as f:
+                    async for chunk in response.content.iter_chunked(self.chunk_size):
+                        await asyncio.to_thread(f.write, chunk)
+                        md5.update(chunk)
+                        sha256.update(chunk)
+                        if extractor is not None:
+                            extractor = await self._feed(extractor, chunk)
+            except BaseException:
+                await self._abort_extraction(extractor)
+                raise
+
+            size = os.path.getsize(part_path)
+            try:
+                if total is not None and size != total:
+                    raise aiohttp.ClientPayloadError(f"Incomplete download: {size} of {total} bytes")
+                if response.status == 200:
+                    try:
+                        self._verify_checksum(response.headers, md5, sha256)
+                    except Exception:
+                        # Corrupt data must not be resumed from
+                        os.remove(part_path)
+                        raise
+            except BaseException:
+                await self._abort_extraction(extractor)
+                raise
+
+        os.replace(part_path, media_path)
+        print(f"Downloaded recording ({size} bytes) to {media_path}")
+
+        if extractor is not None:
+            return await self._finish_stream_extraction(extractor, audio_path)
+        return False
+
+    @staticmethod
+    def _hash_file(path: str, digests):
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                for digest in digests:
+                    digest.update(block)
+
+    @staticmethod
+    def _verify_checksum(headers, md5, sha256):
+        expected_md5 = headers.get("Content-MD5")
+        goog_hash = headers.get("x-goog-hash", "")
+        for part in goog_hash.split(","):
+            name, _, value = part.strip().partition("=")
+            if name == "md5":
+                expected_md5 = value
+        if expected_md5 and base64.b64decode(expected_md5) != md5.digest():
+            raise Exception("Recording checksum mismatch (MD5)")
+
+        digest = headers.get("Digest", "")
+        for part in digest.split(","):
+            name, _, value = part.strip().partition("=")
+            if name.lower() == "sha-256" and base64.b64decode(value) != sha256.digest():
+                raise Exception("Recording checksum mismatch (SHA-256)")
+
+    def _ffmpeg_args(self, source: str, target: str):
+        return [
+            self.ffmpeg, "-nostdin", "-loglevel", "error", "-y",
+            "-i", source,
+            "-vn", "-ac", "1", "-ar", "16000", "-f", "wav",
+            target
+        ]
+
+    async def _start_stream_extraction(self, audio_path: str):
+        try:
+            return await asyncio.create_subprocess_exec(
+                *self._ffmpeg_args("pipe:0", audio_path + ".part"),
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE
+            )
+        except Exception as e:
+            print(f"Streaming audio extraction unavailable: {str(e)}")
+            return None
+
+    async def _feed(self, process, chunk: bytes):
+        try:
+            process.stdin.write(chunk)
+            await process.stdin.drain()
+            return process
+        except (BrokenPipeError, ConnectionResetError):
+            # ffmpeg gave up (e.g. MP4 index at the end of the file); extract after download instead
+            await process.wait()
+            return None
+
+    @staticmethod
+    async def _abort_extraction(process):
+        if process is None:
+            return
+        if process.returncode is None:
+            process.kill()
+        await process.wait()
+
+    async def _finish_stream_extraction(self, process, audio_path: str) -> bool:
+        try:
+            process.stdin.close()
+        except Exception:
+            pass
+        _, stderr = await process.communicate()
+        if process.returncode == 0:
+            os.replace(audio_path + ".part", audio_path)
+            return True
+        print(f"Streaming audio extraction failed, extracting from file: {stderr.decode(errors='ignore')[:200]}")
+        return False
+
+    async def _extract_file(self, source: str, audio_path: str):
+        process = await asyncio.create_subprocess_exec(
+            *self._ffmpeg_args(source, audio_path + ".part"),
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE
+        )
+        _, stderr = await process.communicate()
+        if process.returncode != 0:
+            raise Exception(f"Audio extraction failed: {stderr.decode(errors='ignore')[:500]}")
+        os.replace(audio_path + ".part", audio_path)
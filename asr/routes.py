@@ -0,0 +1,100 @@
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+import asyncio
+import json
+import os
+
+from asr.streaming import StreamingSession, run_decoder
+
+router = APIRouter()
+
+@router.websocket("/ws/meetings/{meeting_id}/transcribe")
+async def stream_transcription(websocket: WebSocket, meeting_id: str, process: bool = False):
+    """
+    Live transcription. The client sends a JSON start message
+    ({"type": "start", "encoding": "pcm16" | "opus", "sample_rate": 16000,
+    "channels": 1}), then binary audio frames, then {"type": "stop"}.
+    The server streams "partial" and "final" segment events and, after
+    stop, the complete "transcript". With ?process=true the transcript is
+    queued for summary and task extraction right away. A dropped
+    connection is treated like a stop: the audio received so far is still
+    finalized and queued. Malformed audio frames close the socket with 1007.
+    """
+    await websocket.accept()
+    components = websocket.app.state.components
+
+    try:
+        start = await websocket.receive_json()
+        if start.get("type") != "start":
+            raise ValueError("First message must be a start message")
+        transcriber = await components.get("transcriber")
+        session = StreamingSession(
+            transcriber.engine,
+            encoding=start.get("encoding", "pcm16"),
+            sample_rate=int(start.get("sample_rate", 16000)),
+            channels=int(start.get("channels", 1))
+        )
+    except (ValueError, KeyError) as e:
+        await websocket.send_json({"type": "error", "detail": str(e)})
+        await websocket.close(code=1003)
+        return
+
+    stop = asyncio.Event()
+    decoder = asyncio.create_task(run_decoder(
+        session, websocket.send_json, stop, float(os.getenv("ASR_STREAM_STEP_SECONDS", "2"))
+    ))
+    connected = True
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                print(f"Live transcription client for meeting {meeting_id} disconnected")
+                connected = False
+                break
+            if message.get("bytes"):
+                try:
+                    session.add_audio(message["bytes"])
+                except Exception as e:
+                    # Odd-length PCM or a corrupt Opus packet: the stream cannot be trusted further
+                    await websocket.send_json({"type": "error", "detail": f"Invalid audio frame: {str(e)}"})
+                    await websocket.close(code=1007)
+                    connected = False
+                    break
+            elif message.get("text"):
+                try:
+                    control = json.loads(message["text"])
+                except ValueError:
+                    continue
+                if control.get("type") == "stop":
+                    break
+
+        stop.set()
+        if connected:
+            # Let an in-flight decode finish so its events are not lost
+            await decoder
+        else:
+            decoder.cancel()
+            await asyncio.gather(decoder, return_exceptions=True)
+
+        # Finalized even when the client went away, so a dropped connection keeps the meeting
+        try:
+            events = await session.finish()
+        except Exception as e:
+            print(f"Finalizing live transcription of meeting {meeting_id} failed: {str(e)}")
+            events = [{"type": "error", "detail": str(e)}]
+        if process and session.transcript:
+            job_id = await websocket.app.state.jobs.submit({
+                "meeting_id": meeting_id,
+                "platform": start.get("platform", "live"),
+                "transcript": session.transcript
+            })
+            events.append({"type": "job", "job_id": job_id, "status_url": f"/jobs/{job_id}"})
+        if connected:
+            for event in events:
+                await websocket.send_json(event)
+            await websocket.close()
+    except WebSocketDisconnect:
+        print(f"Live transcription client for meeting {meeting_id} disconnected")
+    finally:
+        stop.set()
+        decoder.cancel()
@@ -0,0 +1,180 @@
+from typing import Dict, List
+import asyncio
+import os
+
+import numpy as np
+
+from asr.audio import SAMPLE_RATE
+from asr.engine import LANE_LIVE, TranscriptionEngine
+from asr.vad import frame_energy_db
+
+try:
+    import opuslib
+except ImportError:  # Opus input is optional
+    opuslib = None
+
+class StreamingSession:
+    """
+    Incremental transcription of a live audio stream.
+
+    Incoming audio is appended to a rolling buffer. Each step decodes the
+    buffered window (on the engine's live lane). Segments that end more
+    than finalize_lag_seconds before the newest audio are considered
+    stable: they are emitted as final and cut from the buffer. The rest is
+    emitted as a partial hypothesis that may still change. When the stream
+    stops, the remaining buffer is finalized, so the full transcript is
+    ready the moment the meeting ends.
+    """
+
+    def __init__(self, engine: TranscriptionEngine, encoding: str = "pcm16", sample_rate: int = SAMPLE_RATE,
+                 channels: int = 1):
+        self.engine = engine
+        self.encoding = encoding
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.finalize_lag_seconds = float(os.getenv("ASR_STREAM_FINALIZE_LAG_SECONDS", "5"))
+        self.max_buffer_seconds = float(os.getenv("ASR_STREAM_MAX_BUFFER_SECONDS", "30"))
+        self.min_step_seconds = float(os.getenv("ASR_STREAM_MIN_STEP_SECONDS", "1"))
+
+        self._buffer = np.zeros(0, dtype=np.float32)
+        self._buffer_start = 0.0  # stream time (seconds) of _buffer[0]
+        self._decoded_samples = 0  # buffer length at the last decode
+        self.finalized: List[Dict] = []
+        self._decoder = None
+        if encoding == "opus":
+            if opuslib is None:
+                raise ValueError("Opus input requires the opuslib package")
+            self._decoder = opuslib.Decoder(sample_rate, channels)
+        elif encoding != "pcm16":
+            raise ValueError(f"Unsupported encoding: {encoding}")
+
+    def add_audio(self, frame: bytes):
+        if self._decoder is not None:
+            # 120 ms is the largest Opus frame
+            frame = self._decoder.decode(frame, int(self.sample_rate * 0.12))
+        samples = np.frombuffer(frame, dtype=np.int16).astype(np.float32) / 32768.0
+        if self.channels > 1:
+            samples = samples[:len(samples) - len(samples) % self.channels].reshape(-1, self.channels).mean(axis=1)
+        if self.sample_rate != SAMPLE_RATE:
+            target = int(len(samples) * SAMPLE_RATE / self.sample_rate)
+            samples = np.interp(
+                np.linspace(0, len(samples), target, endpoint=False),
+                np.arange(len(samples)), samples
+            ).astype(np.float32)
+        self._buffer = np.concatenate((self._buffer, samples))
+
+    @property
+    def transcript(self) -> str:
+        return " ".join(segment["text"] for segment in self.finalized if segment["text"])
+
+    async def step(self) -> List[Dict]:
+        """Decode the current window; returns the events to send to the client"""
+        new_samples = len(self._buffer) - self._decoded_samples
+        if new_samples < self.min_step_seconds * SAMPLE_RATE:
+            return []
+        return await self._decode(final=False)
+
+    async def finish(self) -> List[Dict]:
+        """Finalize everything still buffered at the end of the stream"""
+        events = await self._decode(final=True) if len(self._buffer) else []
+        events.append({"type": "transcript", "text": self.transcript, "segments": self.finalized})
+        return events
+
+    async def _decode(self, final: bool) -> List[Dict]:
+        self._decoded_samples = len(self._buffer)
+        window = self._buffer
+        buffer_seconds = len(window) / SAMPLE_RATE
+        options = {"condition_on_previous_text": False}
+        if self.finalized:
+            # Recent finalized text keeps names and terminology consistent
+            options["initial_prompt"] = self.transcript[-200:]
+
+        result = await self.engine.transcribe(window, priority=LANE_LIVE, options=options)
+        segments = [segment for segment in result["segments"] if segment["text"].strip()]
+
+        stable_until = buffer_seconds if final else buffer_seconds - self.finalize_lag_seconds
+        if not final and buffer_seconds > self.max_buffer_seconds and len(segments) > 1:
+            # No natural break for too long: finalize everything but the last segment
+            stable_until = max(stable_until, segments[-2]["end"])
+        elif not final and buffer_seconds > self.max_buffer_seconds and segments and segments[0]["end"] > stable_until:
+            # One segment spans the whole over-long buffer: force a break
+            return await self._force_finalize(options)
+
+        events = []
+        cut = 0.0
+        pending = []
+        for segment in segments:
+            if segment["end"] <= stable_until:
+                finalized = {
+                    "start": round(self._buffer_start + segment["start"], 3),
+                    "end": round(self._buffer_start + segment["end"], 3),
+                    "text": segment["text"].strip()
+                }
+                self.finalized.append(finalized)
+                events.append({"type": "final", **finalized})
+                cut = segment["end"]
+            else:
+                pending.append(segment["text"].strip())
+
+        if cut:
+            self._cut(int(cut * SAMPLE_RATE))
+        elif not final and buffer_seconds > self.max_buffer_seconds and not segments:
+            # Only silence in a full buffer: drop the oldest audio
+            drop = len(self._buffer) - int(self.finalize_lag_seconds * SAMPLE_RATE)
+            self._buffer = self._buffer[drop:]
+            self._buffer_start += drop / SAMPLE_RATE
+            self._decoded_samples = len(self._buffer)
+
+        if pending and not final:
+            events.append({"type": "partial", "text": " ".join(pending)})
+        return events
+
+    async def _force_finalize(self, options: Dict) -> List[Dict]:
+        """
+        Cut the buffer at its quietest 30 ms frame between the middle and the
+        finalize lag, then decode the audio before the cut on its own and
+        finalize all of it; the rest stays buffered
+        """
+        frame_samples = int(SAMPLE_RATE * 0.03)
+        window_start = len(self._buffer) // 2
+        window_end = len(self._buffer) - int(self.finalize_lag_seconds * SAMPLE_RATE)
+        energy = frame_energy_db(self._buffer[window_start:window_end], frame_samples)
+        cut_samples = window_start + int(np.argmin(energy)) * frame_samples if len(energy) else window_start
+
+        result = await self.engine.transcribe(self._buffer[:cut_samples], priority=LANE_LIVE, options=options)
+        events = []
+        for segment in result["segments"]:
+            if not segment["text"].strip():
+                continue
+            finalized = {
+                "start": round(self._buffer_start + segment["start"], 3),
+                "end": round(self._buffer_start + min(segment["end"], cut_samples / SAMPLE_RATE), 3),
+                "text": segment["text"].strip()
+            }
+            self.finalized.append(finalized)
+            events.append({"type": "final", **finalized})
+        self._cut(cut_samples)
+        return events
+
+    def _cut(self, cut_samples: int):
+        """Drop finalized audio from the front of the buffer"""
+        self._buffer = self._buffer[cut_samples:]
+        self._buffer_start += cut_samples / SAMPLE_RATE
+        self._decoded_samples = max(0, self._decoded_samples - cut_samples)
+
+async def run_decoder(session: StreamingSession, send, stop: asyncio.Event, step_seconds: float):
+    """Decode periodically until stop is set; decodes never overlap"""
+    while not stop.is_set():
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=step_seconds)
+        except asyncio.TimeoutError:
+            pass
+        if stop.is_set():
+            break
+        try:
+            events = await session.step()
+        except Exception as e:
+            # A failed step (e.g. the ASR queue is full) is retried on the next one
+            events = [{"type": "error", "detail": str(e)}]
+        for event in events:
+            await send(event)
@@ -1,17 +1,100 @@
-import whisper
-from typing import Optional
+import asyncio
+import os
+from typing import Dict, Optional
+
+from asr.audio import SAMPLE_RATE, load_audio
+from asr.engine import LANE_NORMAL, LANE_SHORT, TranscriptionEngine, TranscriptionQueueFull
+from asr.vad import plan_segments
 
 class Transcriber:
-    def __init__(self):
-        self.model = whisper.load_model("base")
+    def __init__(self, model_name: Optional[str] = None, engine: Optional[TranscriptionEngine] = None):
+        # The ASR backend runs in the engine's worker processes, one model copy per worker
+        self.engine = engine or TranscriptionEngine(model_name=model_name)
+        self.model_name = self.engine.model_name
+        self.vad_enabled = os.getenv("ASR_VAD_ENABLED", "true").lower() == "true"
+        self.segment_seconds = float(os.getenv("ASR_SEGMENT_SECONDS", "120"))
+        self.max_gap_seconds = float(os.getenv("ASR_MAX_GAP_SECONDS", "2.0"))
+        # Segments of one meeting queued at once (default: the engine's worker count)
+        self.segments_in_flight = int(os.getenv("ASR_SEGMENTS_IN_FLIGHT", "0"))
+
+    async def transcribe(self, audio_url: str, priority: Optional[int] = None) -> str:
+        """
+        Transcribe a local audio file using Whisper (remote recordings are
+        downloaded first by RecordingFetcher)
+        """
+        result = await self.transcribe_segments(audio_url, priority=priority)
+        return result["text"]
 
-    async def transcribe(self, audio_url: str) -> str:
+    async def transcribe_segments(self, audio_url: str, priority: Optional[int] = None) -> Dict:
         """
-        Transcribe audio from URL using Whisper
+        Transcribe a local audio file, returning the text and timestamped
+        segments. With VAD enabled the audio is split at pauses, silence is
+        skipped, and the speech segments are transcribed in parallel across
+        the worker pool, then stitched back in order.
         """
         try:
-            # For demo, assuming local file. In production, download from URL first
-            result = self.model.transcribe(audio_url)
-            return result["text"]
+            if not self.vad_enabled:
+                return await self.engine.transcribe(audio_url, priority=priority)
+
+            audio = await load_audio(audio_url)
+            duration = len(audio) / SAMPLE_RATE
+            segments = await asyncio.to_thread(
+                plan_segments, audio, SAMPLE_RATE, self.segment_seconds, self.max_gap_seconds
+            )
+            if not segments:
+                # Nothing looked like speech; let Whisper judge the whole file
+                segments = [(0, len(audio))]
+
+            speech_seconds = sum(end - start for start, end in segments) / SAMPLE_RATE
+            print(f"Transcribing {speech_seconds:.0f}s of speech out of {duration:.0f}s in {len(segments)} segments")
+
+            if priority is None:
+                priority = LANE_SHORT if duration <= self.engine.short_clip_seconds else LANE_NORMAL
+            results = await self._transcribe_all(audio, segments, priority)
+            return self._stitch(segments, results)
+        except TranscriptionQueueFull:
+            raise
         except Exception as e:
-            raise Exception(f"Transcription failed: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Transcription failed: {str(e)}")
+
+    async def _transcribe_all(self, audio, segments, priority: int):
+        """
+        Transcribe the segments with at most one in flight per worker, so a
+        long meeting never floods the engine's admission queue on its own.
+        On the first failure the segments not yet finished are cancelled.
+        """
+        slots = asyncio.Semaphore(self.segments_in_flight or self.engine.workers)
+
+        async def transcribe_one(start: int, end: int):
+            async with slots:
+                return await self.engine.transcribe(audio[start:end], priority=priority)
+
+        tasks = [asyncio.create_task(transcribe_one(start, end)) for start, end in segments]
+        try:
+            return await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    @staticmethod
+    def _stitch(segments, results) -> Dict:
+        stitched = []
+        language = None
+        for (start, _), result in zip(segments, results):
+            offset = start / SAMPLE_RATE
+            language = language or result.get("language")
+            for segment in result["segments"]:
+                stitched.append({
+                    "start": round(segment["start"] + offset, 3),
+                    "end": round(segment["end"] + offset, 3),
+                    "text": segment["text"].strip()
+                })
+        text = " ".join(result["text"].strip() for result in results if result["text"].strip())
+        return {"text": text, "language": language, "segments": stitched}
+
+    async def warm_up(self):
+        await self.engine.warm_up()
+
+    async def aclose(self):
+        await self.engine.aclose()
@@ -0,0 +1,101 @@
+from typing import List, Tuple
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+def frame_energy_db(audio: np.ndarray, frame_samples: int) -> np.ndarray:
+    """Mean energy (dB) of consecutive non-overlapping frames"""
+    frames = len(audio) // frame_samples
+    if frames == 0:
+        return np.zeros(0, dtype=np.float32)
+    framed = audio[:frames * frame_samples].reshape(frames, frame_samples)
+    energy = np.mean(framed.astype(np.float32) ** 2, axis=1)
+    return 10.0 * np.log10(energy + 1e-10)
+
+def detect_speech(audio: np.ndarray, sample_rate: int = SAMPLE_RATE, frame_ms: int = 30,
+                  margin_db: float = 12.0, min_speech_ms: int = 250, min_silence_ms: int = 500,
+                  padding_ms: int = 200) -> List[Tuple[int, int]]:
+    """
+    Energy-based voice activity detection.
+
+    The threshold adapts to the recording: frames more than margin_db above
+    the estimated noise floor (10th percentile of frame energy) count as
+    speech. Pauses shorter than min_silence_ms are bridged, blips shorter
+    than min_speech_ms dropped, and each region padded by padding_ms.
+    Returns (start_sample, end_sample) regions in order.
+    """
+    frame_samples = int(sample_rate * frame_ms / 1000)
+    energy = frame_energy_db(audio, frame_samples)
+    if len(energy) == 0:
+        return []
+
+    noise_floor = np.percentile(energy, 10)
+    threshold = max(noise_floor + margin_db, -60.0)
+    if np.percentile(energy, 90) - noise_floor < margin_db:
+        # Little dynamic range (continuous speech or uniform noise): fall back
+        # to an absolute threshold rather than discarding everything
+        threshold = -50.0
+    voiced = energy > threshold
+
+    # Run-length encode the voiced flags into [start_frame, end_frame) regions
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], voiced.astype(np.int8), [0]))))
+    regions = [[int(start), int(end)] for start, end in zip(edges[::2], edges[1::2])]
+
+    min_silence = max(1, min_silence_ms // frame_ms)
+    merged: List[List[int]] = []
+    for region in regions:
+        if merged and region[0] - merged[-1][1] < min_silence:
+            merged[-1][1] = region[1]
+        else:
+            merged.append(region)
+
+    min_speech = max(1, min_speech_ms // frame_ms)
+    padding = padding_ms * sample_rate // 1000
+    speech = []
+    for start, end in merged:
+        if end - start < min_speech:
+            continue
+        start_sample = max(0, start * frame_samples - padding)
+        end_sample = min(len(audio), end * frame_samples + padding)
+        if speech and start_sample <= speech[-1][1]:
+            speech[-1] = (speech[-1][0], end_sample)
+        else:
+            speech.append((start_sample, end_sample))
+    return speech
+
+def _split_at_quietest(audio: np.ndarray, start: int, end: int, max_samples: int,
+                       frame_samples: int) -> List[Tuple[int, int]]:
+    """Cut an over-long region at the quietest frame in the second half of each window"""
+    pieces = []
+    while end - start > max_samples:
+        window_start = start + max_samples // 2
+        window_end = start + max_samples
+        energy = frame_energy_db(audio[window_start:window_end], frame_samples)
+        cut = window_start + int(np.argmin(energy)) * frame_samples if len(energy) else window_end
+        pieces.append((start, cut))
+        start = cut
+    pieces.append((start, end))
+    return pieces
+
+def plan_segments(audio: np.ndarray, sample_rate: int = SAMPLE_RATE, max_segment_seconds: float = 120.0,
+                  max_gap_seconds: float = 2.0) -> List[Tuple[int, int]]:
+    """
+    Group detected speech into contiguous segments of at most
+    max_segment_seconds for parallel transcription. Pauses longer than
+    max_gap_seconds always end a segment, so long stretches of silence are
+    never sent to the model.
+    """
+    max_samples = int(max_segment_seconds * sample_rate)
+    max_gap = int(max_gap_seconds * sample_rate)
+    frame_samples = int(sample_rate * 0.03)
+
+    segments: List[Tuple[int, int]] = []
+    for start, end in detect_speech(audio, sample_rate):
+        for piece_start, piece_end in _split_at_quietest(audio, start, end, max_samples, frame_samples):
+            if segments:
+                last_start, last_end = segments[-1]
+                if piece_start - last_end <= max_gap and piece_end - last_start <= max_samples:
+                    segments[-1] = (last_start, piece_end)
+                    continue
+            segments.append((piece_start, piece_end))
+    return segments
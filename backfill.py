@@ -0,0 +1,101 @@
+"""
+Backfill historical meetings from the command line.
+
+    python backfill.py --platform zoom --ids 81234567890 81234567891
+    python backfill.py --ids-file meetings.txt            # lines of "platform,meeting_id" or "meeting_id"
+    python backfill.py --range zoom:2025-07-01:2025-10-01 --range teams:2025-07-01:2025-10-01
+    python backfill.py --resume <batch_id>
+
+Progress is checkpointed in the database after every meeting; re-running
+with --resume (or restarting the server) continues an interrupted batch.
+"""
+from datetime import datetime
+import argparse
+import asyncio
+import json
+
+from core.components import ComponentRegistry
+from db.database import init_db, close_db
+from jobs.batch import BatchRequest, BatchRunner, DateRange, MeetingRef
+from pipeline.meeting_pipeline import StageLimits
+
+def parse_range(value: str) -> DateRange:
+    try:
+        platform, start, end = value.split(":", 2)
+        return DateRange(platform=platform, start=datetime.fromisoformat(start), end=datetime.fromisoformat(end))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected platform:YYYY-MM-DD:YYYY-MM-DD, got {value}")
+
+def read_ids_file(path: str, platform: str):
+    meetings = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if "," in line:
+                line_platform, meeting_id = (part.strip() for part in line.split(",", 1))
+            else:
+                line_platform, meeting_id = platform, line
+            meetings.append(MeetingRef(meeting_id=meeting_id, platform=line_platform))
+    return meetings
+
+async def report_progress(runner: BatchRunner, batch_id: str, interval: float):
+    while True:
+        await asyncio.sleep(interval)
+        progress = await runner.progress(batch_id)
+        if progress is None:
+            continue
+        rate = progress.get("meetings_per_minute")
+        eta = progress.get("eta_seconds")
+        print(
+            f"[{progress['status']}] {progress['done']}/{progress['total']} done "
+            f"({progress['counts'].get('failed', 0)} failed, {progress['counts'].get('skipped', 0)} skipped)"
+            + (f", {rate} meetings/min" if rate is not None else "")
+            + (f", ETA {eta // 60}m{eta % 60:02d}s" if eta is not None else "")
+            + (f", in flight: {progress['in_flight']}" if progress.get("in_flight") else "")
+        )
+
+async def main(args):
+    await init_db()
+    components = ComponentRegistry()
+    runner = BatchRunner(components, limits=StageLimits.from_env(), concurrency=args.concurrency)
+
+    if args.resume:
+        batch_id = args.resume
+    else:
+        meetings = [MeetingRef(meeting_id=meeting_id, platform=args.platform) for meeting_id in args.ids]
+        if args.ids_file:
+            meetings.extend(read_ids_file(args.ids_file, args.platform))
+        request = BatchRequest(meetings=meetings, ranges=args.range, skip_existing=not args.reprocess)
+        if not request.meetings and not request.ranges:
+            raise SystemExit("Nothing to do: pass --ids, --ids-file, --range or --resume")
+        batch_id = await runner.create(request)
+        print(f"Created batch {batch_id} (resume with: python backfill.py --resume {batch_id})")
+
+    reporter = asyncio.create_task(report_progress(runner, batch_id, args.progress_interval))
+    try:
+        if not await runner.run(batch_id):
+            print(f"Batch {batch_id} not found, already finished, or running elsewhere")
+    finally:
+        reporter.cancel()
+        await components.shutdown()
+
+    print(json.dumps(await runner.progress(batch_id), indent=2))
+    await close_db()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill meetings through the processing pipeline")
+    parser.add_argument("--platform", default="zoom", help="Platform of --ids (and unprefixed --ids-file lines)")
+    parser.add_argument("--ids", nargs="*", default=[], help="Meeting ids to process")
+    parser.add_argument("--ids-file", help="File with one meeting id (or platform,meeting_id) per line")
+    parser.add_argument("--range", action="append", type=parse_range, default=[],
+                        help="platform:START:END date range of recordings to list and process (repeatable)")
+    parser.add_argument("--resume", help="Continue an interrupted batch by id")
+    parser.add_argument("--concurrency", type=int, help="Meetings in flight (default BATCH_CONCURRENCY)")
+    parser.add_argument("--reprocess", action="store_true", help="Also process meetings that already have a summary")
+    parser.add_argument("--progress-interval", type=float, default=10.0, help="Seconds between progress lines")
+    try:
+        asyncio.run(main(parser.parse_args()))
+    except KeyboardInterrupt:
+        print("Interrupted; progress is saved, resume with --resume")
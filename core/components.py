@@ -0,0 +1,173 @@
+from typing import Any, Callable, Dict, Optional
+import asyncio
+import inspect
+import os
+from fastapi import Request
+from dotenv import load_dotenv
+
+load_dotenv()
+
+def _build_meeting_connector():
+    from ingestion.meeting_connector import MeetingConnector
+    return MeetingConnector()
+
+def _build_transcriber():
+    from asr.transcription import Transcriber
+    return Transcriber()
+
+def _build_recording_fetcher():
+    from asr.recording_fetcher import RecordingFetcher
+    return RecordingFetcher()
+
+def _build_summarizer():
+    from nlu.agents import SummarizerAgent
+    return SummarizerAgent()
+
+def _build_task_agent():
+    from nlu.agents import TaskAgent
+    return TaskAgent()
+
+def _build_analyst():
+    from nlu.agents import MeetingAnalystAgent
+    return MeetingAnalystAgent()
+
+def _build_qa_agent():
+    from nlu.agents import QAAgent
+    return QAAgent()
+
+def _build_semantic_index():
+    from search.semantic import SemanticIndex
+    return SemanticIndex()
+
+def _build_scheduler():
+    from scheduler.meeting_scheduler import MeetingScheduler
+    return MeetingScheduler()
+
+def _build_integrator():
+    from nlu.agents import IntegratorAgent
+    return IntegratorAgent()
+
+def _build_transcript_store():
+    from transcripts.store import TranscriptStore
+    return TranscriptStore()
+
+def _build_notion():
+    from integrations.notion_client import NotionClient
+    return NotionClient()
+
+# Component name -> (factory, blocking). Blocking factories are run in a worker
+# thread so they never stall the event loop.
+DEFAULT_FACTORIES: Dict[str, tuple] = {
+    "meeting_connector": (_build_meeting_connector, False),
+    "recording_fetcher": (_build_recording_fetcher, False),
+    "transcriber": (_build_transcriber, False),
+    "summarizer": (_build_summarizer, False),
+    "task_agent": (_build_task_agent, False),
+    "analyst": (_build_analyst, False),
+    "qa_agent": (_build_qa_agent, False),
+    "integrator": (_build_integrator, False),
+    "notion": (_build_notion, False),
+    "transcript_store": (_build_transcript_store, False),
+    "semantic_index": (_build_semantic_index, False),
+    "scheduler": (_build_scheduler, False),
+}
+
+class ComponentRegistry:
+    """
+    Application-lifetime holder for the pipeline components.
+
+    Components are built lazily on first use and then shared by every
+    request handled by this worker process, so heavy resources such as the
+    transcription worker pool are created exactly once per process.
+    Components exposing warm_up() are also warmed when pre-warming.
+    """
+
+    def __init__(self, factories: Optional[Dict[str, tuple]] = None):
+        self._factories = dict(factories or DEFAULT_FACTORIES)
+        self._instances: Dict[str, Any] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._closed = False
+
+    def register(self, name: str, factory: Callable[[], Any], blocking: bool = False):
+        """Register (or replace) the factory for a component"""
+        if name in self._instances:
+            raise ValueError(f"Component already initialized: {name}")
+        self._factories[name] = (factory, blocking)
+
+    def is_ready(self, name: str) -> bool:
+        return name in self._instances
+
+    async def get(self, name: str) -> Any:
+        """
+        Return the shared instance of a component, building it on first use
+        """
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        if self._closed:
+            raise RuntimeError("Component registry has been shut down")
+        if name not in self._factories:
+            raise KeyError(f"Unknown component: {name}")
+
+        lock = self._locks.setdefault(name, asyncio.Lock())
+        async with lock:
+            # Another request may have finished building it while we waited
+            if name in self._instances:
+                return self._instances[name]
+
+            factory, blocking = self._factories[name]
+            print(f"Initializing component: {name}")
+            if blocking:
+                instance = await asyncio.to_thread(factory)
+            else:
+                instance = factory()
+            self._instances[name] = instance
+            return instance
+
+    async def warm_up(self, names: Optional[list] = None):
+        """
+        Pre-build components so the first request does not pay setup cost
+        """
+        names = names or list(self._factories)
+        await asyncio.gather(*(self._warm_up_one(name) for name in names))
+
+    async def _warm_up_one(self, name: str):
+        instance = await self.get(name)
+        warm_up = getattr(instance, "warm_up", None)
+        if warm_up is not None:
+            await warm_up()
+
+    async def shutdown(self):
+        """
+        Release resources held by components, in reverse creation order
+        """
+        self._closed = True
+        for name, instance in reversed(list(self._instances.items())):
+            close = getattr(instance, "aclose", None) or getattr(instance, "close", None)
+            if close is None:
+                continue
+            try:
+                result = close()
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                print(f"Error shutting down component {name}: {str(e)}")
+        self._instances.clear()
+
+def prewarm_components_from_env() -> list:
+    """
+    Components listed in PREWARM_COMPONENTS (comma separated, or "all")
+    """
+    value = os.getenv("PREWARM_COMPONENTS", "").strip()
+    if not value:
+        return []
+    if value.lower() == "all":
+        return list(DEFAULT_FACTORIES)
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+def get_components(request: Request) -> ComponentRegistry:
+    """
+    FastAPI dependency returning the registry created at startup
+    """
+    return request.app.state.components
@@ -0,0 +1,63 @@
+from typing import Dict, Optional
+import asyncio
+import os
+import time
+
+class RateLimiter:
+    """
+    Token bucket: on average `rate` acquisitions per second, with bursts of
+    up to `burst`. Waiters are served in arrival order.
+
+    The limiter is adaptive: throttle() (called when the API answers 429)
+    pauses it for the Retry-After period and halves the rate, and each
+    recover() (a successful call) adds back a small fraction of the
+    configured rate until it is reached again.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None, min_rate: Optional[float] = None):
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min_rate if min_rate is not None else rate / 16
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens: float = 1.0):
+        if self.max_rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    await asyncio.sleep(self._blocked_until - now)
+                    continue
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+    def throttle(self, retry_after: Optional[float] = None):
+        if self.max_rate <= 0:
+            return
+        self.rate = max(self.min_rate, self.rate / 2)
+        self._tokens = 0.0
+        if retry_after:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+
+    def recover(self):
+        if self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+def platform_rate_limiters(prefix: str, default_rate: float, platforms=("zoom", "teams", "google_meet")) -> Dict[str, RateLimiter]:
+    """
+    One limiter per platform, rate read from <prefix><PLATFORM> (per second,
+    0 = unlimited)
+    """
+    return {
+        platform: RateLimiter(float(os.getenv(f"{prefix}{platform.upper()}", str(default_rate))))
+        for platform in platforms
+    }
@@ -0,0 +1,202 @@
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+import asyncio
+import os
+import random
+import time
+
+from core.ratelimit import RateLimiter
+
+# Default requests per second per API (override with RATE_LIMIT_<API>)
+DEFAULT_RATES = {
+    "zoom": 10.0,
+    "teams": 10.0,
+    "google": 10.0,
+    "gemini": 2.0,
+    "notion": 3.0,
+}
+
+class RetryableError(Exception):
+    """
+    A transient failure of an outbound call (throttling, 5xx, network).
+    retry_after is the server's requested delay in seconds, if any.
+    """
+
+    def __init__(self, message: str, retry_after: Optional[float] = None, throttled: bool = False):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.throttled = throttled
+
+class CircuitOpenError(Exception):
+    """Raised without calling out while a host's circuit breaker is open"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After header (delta seconds or HTTP date) in seconds"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+class CircuitBreaker:
+    """
+    Opens after failure_threshold consecutive failures; while open, calls
+    fail fast. After reset_timeout a single probe call is let through
+    (half-open): success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+
+    def before_call(self, name: str):
+        if self.state == "closed":
+            return
+        remaining = self.opened_at + self.reset_timeout - time.monotonic()
+        if self.state == "open" and remaining <= 0:
+            self.state = "half_open"
+        if self.state == "half_open" and not self._probing:
+            self._probing = True
+            return
+        raise CircuitOpenError(f"Circuit open for {name}", retry_after=max(remaining, 1.0))
+
+    def release_probe(self):
+        """The probe call ended without telling us about the host's health"""
+        self._probing = False
+
+    def record_success(self):
+        self.state = "closed"
+        self.failures = 0
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            if self.state != "open":
+                print(f"Circuit breaker opened after {self.failures} failures")
+            self.state = "open"
+            self.opened_at = time.monotonic()
+        self._probing = False
+
+class ApiGuard:
+    """
+    The shared outbound-call policy for one API: a token-bucket rate limit,
+    retries with jittered exponential backoff (honouring Retry-After), and
+    a circuit breaker per host, so an overloaded or failing dependency
+    slows us down instead of cascading into every request.
+    """
+
+    def __init__(self, name: str, rate: float, max_attempts: int = 5, base_delay: float = 0.5,
+                 max_delay: float = 60.0, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.limiter = RateLimiter(rate)
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._stats = {"calls": 0, "retries": 0, "throttled": 0, "failures": 0, "rejected": 0}
+
+    @classmethod
+    def from_env(cls, name: str) -> "ApiGuard":
+        return cls(
+            name,
+            rate=float(os.getenv(f"RATE_LIMIT_{name.upper()}", str(DEFAULT_RATES.get(name, 10.0)))),
+            max_attempts=int(os.getenv("RETRY_MAX_ATTEMPTS", "5")),
+            base_delay=float(os.getenv("RETRY_BASE_SECONDS", "0.5")),
+            max_delay=float(os.getenv("RETRY_MAX_SECONDS", "60")),
+            failure_threshold=int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5")),
+            reset_timeout=float(os.getenv("CIRCUIT_RESET_SECONDS", "30")),
+        )
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            breaker = self._breakers[host] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+        return breaker
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given (1-based) attempt"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    async def call(self, fn: Callable[..., Awaitable[Any]], *args, host: Optional[str] = None, **kwargs) -> Any:
+        """
+        Run fn(*args, **kwargs) under the policy. fn signals transient
+        failures by raising RetryableError; anything else propagates as is.
+        """
+        breaker = self.breaker(host or self.name)
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                breaker.before_call(f"{self.name} ({host or self.name})")
+            except CircuitOpenError:
+                self._stats["rejected"] += 1
+                raise
+            await self.limiter.acquire()
+            self._stats["calls"] += 1
+            try:
+                result = await fn(*args, **kwargs)
+            except RetryableError as e:
+                if e.throttled:
+                    # Throttling means slow down, not that the host is failing
+                    self._stats["throttled"] += 1
+                    self.limiter.throttle(e.retry_after)
+                    breaker.release_probe()
+                else:
+                    self._stats["failures"] += 1
+                    breaker.record_failure()
+                if attempt >= self.max_attempts:
+                    raise
+                delay = max(e.retry_after or 0.0, self.backoff(attempt))
+                self._stats["retries"] += 1
+                print(f"{self.name} call failed ({str(e)}), retrying in {delay:.1f}s (attempt {attempt + 1})")
+                await asyncio.sleep(min(delay, self.max_delay))
+                continue
+            except asyncio.CancelledError:
+                breaker.release_probe()
+                raise
+            except Exception:
+                # Not a transient failure (e.g. a 4xx): the host itself is fine
+                breaker.record_success()
+                raise
+            breaker.record_success()
+            self.limiter.recover()
+            return result
+
+    def stats(self) -> Dict:
+        return {
+            **self._stats,
+            "rate": round(self.limiter.rate, 3),
+            "circuits": {host: breaker.state for host, breaker in self._breakers.items()},
+        }
+
+_guards: Dict[str, ApiGuard] = {}
+
+def get_api_guard(name: str) -> ApiGuard:
+    """Process-wide guard for an API, shared by every caller"""
+    guard = _guards.get(name)
+    if guard is None:
+        guard = _guards[name] = ApiGuard.from_env(name)
+    return guard
+
+def api_guard_stats() -> Dict:
+    return {name: guard.stats() for name, guard in _guards.items()}
@@ -1,49 +1,364 @@
-from sqlalchemy import create_engine, Column, String, DateTime, Integer
+from sqlalchemy import event, inspect, text, Column, String, DateTime, Float, Index, Integer, Text, JSON, LargeBinary, UniqueConstraint
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 import os
 from datetime import datetime
-from typing import List, Dict
+from typing import AsyncIterator
 
-# Initialize SQLAlchemy with SQLite for development
+# Initialize SQLAlchemy with SQLite for development (PostgreSQL in production)
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./hybrid_meeting_agent.db")
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def async_database_url(url: str) -> str:
+    """Map a plain database URL onto its async driver (aiosqlite / asyncpg)"""
+    if url.startswith("sqlite:"):
+        return "sqlite+aiosqlite:" + url[len("sqlite:"):]
+    if url.startswith("postgres://"):
+        return "postgresql+asyncpg://" + url[len("postgres://"):]
+    if url.startswith("postgresql:") or url.startswith("postgresql+psycopg2:"):
+        return "postgresql+asyncpg:" + url.split(":", 1)[1]
+    return url
+
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+
+engine = create_async_engine(
+    async_database_url(DATABASE_URL),
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=int(os.getenv("DB_POOL_SIZE", "5")),
+    max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "10")),
+    pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", "30")),
+    pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    pool_pre_ping=not IS_SQLITE,
+)
+SessionLocal = async_sessionmaker(engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
+if IS_SQLITE:
+    @event.listens_for(engine.sync_engine, "connect")
+    def _configure_sqlite(dbapi_connection, connection_record):
+        # WAL lets readers run alongside the ingestion writer; busy_timeout
+        # makes concurrent writers wait for the lock instead of failing
+        cursor = dbapi_connection.cursor()
+        if os.getenv("SQLITE_WAL", "true").lower() == "true":
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000'))}")
+        cursor.close()
+
 class Meeting(Base):
     __tablename__ = "meetings"
+    __table_args__ = (
+        # Keyset pagination of the meetings view (newest first)
+        Index("ix_meetings_created_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     meeting_id = Column(String, unique=True, index=True)
     summary = Column(String)
-    transcript = Column(String)
+    transcript = Column(LargeBinary)  # zlib-compressed transcripts.model.Transcript
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        UniqueConstraint("meeting_id", "key"),
+        # Filters of the tasks view, each ending in its (due_date, id) sort key
+        Index("ix_tasks_assignee_status_due", "assignee", "status", "due_date", "id"),
+        Index("ix_tasks_assignee_due", "assignee", "due_date", "id"),
+        Index("ix_tasks_status_due", "status", "due_date", "id"),
+        Index("ix_tasks_due", "due_date", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     meeting_id = Column(String, index=True)
+    key = Column(String)  # normalized title and assignee, stable across re-runs
     title = Column(String)
     assignee = Column(String)
+    description = Column(Text)
     due_date = Column(DateTime)
-    status = Column(String)
+    status = Column(String)  # open, done (synced from the Notion checkbox)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class NotionBlock(Base):
+    __tablename__ = "notion_blocks"
+    __table_args__ = (UniqueConstraint("meeting_id", "key"),)
+
+    id = Column(Integer, primary_key=True)
+    meeting_id = Column(String, index=True)
+    key = Column(String)  # "page", "heading:summary", "summary:0", "task:<task key>", ...
+    page_id = Column(String)
+    block_id = Column(String)
+    content_hash = Column(String)
+    task_id = Column(Integer)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(String, primary_key=True)
+    kind = Column(String, default="meeting")
+    payload = Column(JSON)
+    status = Column(String, index=True)  # queued, running, succeeded, failed
+    stage = Column(String)
+    result = Column(JSON)
+    error = Column(Text)
+    attempts = Column(Integer, default=0)
+    lease_owner = Column(String)
+    lease_expires_at = Column(DateTime)
+    not_before = Column(DateTime)  # deferred jobs are not claimed before this
+    deferrals = Column(Integer, default=0)  # times handed back because the ASR queue was full
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class ScheduledJob(Base):
+    """
+    A one-off action due at fire_at (post-meeting processing, task
+    reminders); claimed with a lease like jobs so one instance fires it
+    """
+    __tablename__ = "scheduled_jobs"
+    __table_args__ = (Index("ix_scheduled_jobs_status_fire", "status", "fire_at"),)
+
+    id = Column(String, primary_key=True)
+    kind = Column(String)
+    payload = Column(JSON)
+    fire_at = Column(DateTime)
+    status = Column(String)  # scheduled, running, done, failed, cancelled
+    attempts = Column(Integer, default=0)
+    error = Column(Text)
+    lease_owner = Column(String)
+    lease_expires_at = Column(DateTime)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class ReminderDelivery(Base):
+    """
+    Delivery state of one task's reminder on one channel, keyed on
+    channel, task and due date, so a retried digest skips what was sent
+    """
+    __tablename__ = "reminder_deliveries"
+
+    key = Column(String, primary_key=True)  # channel:task id:due date
+    channel = Column(String)
+    task_id = Column(Integer, index=True)
+    assignee = Column(String)
+    digest_id = Column(String)
+    status = Column(String)  # sending, sent, failed, unconfirmed
+    attempts = Column(Integer, default=0)
+    error = Column(Text)
+    message_id = Column(String)
+    lease_expires_at = Column(DateTime)
+    sent_at = Column(DateTime)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class Batch(Base):
+    __tablename__ = "batches"
+
+    id = Column(String, primary_key=True)
+    status = Column(String, index=True)  # queued, listing, running, completed, failed
+    params = Column(JSON)  # {"ranges": [...], "skip_existing": bool}
+    error = Column(Text)
+    lease_owner = Column(String)
+    lease_expires_at = Column(DateTime)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = Column(DateTime)
+
+class BatchItem(Base):
+    __tablename__ = "batch_items"
+    __table_args__ = (UniqueConstraint("batch_id", "platform", "meeting_id"),)
+
+    id = Column(Integer, primary_key=True)
+    batch_id = Column(String, index=True)
+    platform = Column(String)
+    meeting_id = Column(String)
+    status = Column(String, index=True)  # pending, running, succeeded, failed, skipped
+    stage = Column(String)
+    attempts = Column(Integer, default=0)
+    error = Column(Text)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+
+class SyncState(Base):
+    __tablename__ = "sync_state"
+
+    platform = Column(String, primary_key=True)
+    watermark = Column(DateTime)  # recordings before this (minus the overlap) have been listed
+    last_run_at = Column(DateTime)
+    last_error = Column(Text)
+    discovered = Column(Integer, default=0)
+    lease_owner = Column(String)
+    lease_expires_at = Column(DateTime)
+
+class SyncedMeeting(Base):
+    __tablename__ = "synced_meetings"
+    __table_args__ = (UniqueConstraint("platform", "meeting_id"),)
+
+    id = Column(Integer, primary_key=True)
+    platform = Column(String)
+    meeting_id = Column(String)
+    source = Column(String)  # sync, webhook
+    job_id = Column(String)
+    discovered_at = Column(DateTime, default=datetime.utcnow)
+
+class WebhookEvent(Base):
+    __tablename__ = "webhook_events"
+
+    key = Column(String, primary_key=True)  # platform-specific delivery identity
+    platform = Column(String)
+    event = Column(String)
+    meeting_id = Column(String)
+    call_record_id = Column(String)  # Teams: resolved to meeting_id when processed
+    status = Column(String, index=True)  # received, queued, ignored, failed
+    attempts = Column(Integer, default=0)
+    error = Column(Text)
+    received_at = Column(DateTime, default=datetime.utcnow, index=True)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+class SearchDocument(Base):
+    """
+    One searchable unit: a transcript turn, a summary or a task. The full
+    text index over body is dialect specific (see SEARCH_DDL)
+    """
+    __tablename__ = "search_documents"
+    __table_args__ = (Index("ix_search_documents_meeting_kind", "meeting_id", "kind"),)
+
+    id = Column(Integer, primary_key=True)
+    meeting_id = Column(String)
+    kind = Column(String)  # transcript, summary, task
+    ref = Column(Integer)  # segment index or task id
+    speaker = Column(String)
+    start = Column(Float)
+    body = Column(Text)
+
+class SemanticChunk(Base):
+    """
+    A transcript passage or summary embedded in the vector index; slot is
+    its row in every host's index files (see search.vectors), assigned here
+    and never reused
+    """
+    __tablename__ = "semantic_chunks"
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    slot = Column(Integer, primary_key=True)
+    meeting_id = Column(String, index=True)
+    kind = Column(String)  # transcript, summary
+    start = Column(Float)
+    content_hash = Column(String)
+    body = Column(Text)
+    vector = Column(LargeBinary)  # int8-quantized embedding, copied into the index files
+
+class SchemaVersion(Base):
+    """The schema migration (see MIGRATIONS) an existing database is at"""
+    __tablename__ = "schema_version"
+
+    version = Column(Integer, primary_key=True)
+
+class LLMCacheEntry(Base):
+    __tablename__ = "llm_cache"
+
+    key = Column(String, primary_key=True)
+    template = Column(String)
+    model = Column(String)
+    value = Column(JSON)
     created_at = Column(DateTime, default=datetime.utcnow)
+    accessed_at = Column(DateTime, default=datetime.utcnow, index=True)
+    expires_at = Column(DateTime, index=True)
+
+# Full text index over search_documents.body: an external-content FTS5
+# table kept in sync by triggers on SQLite, a generated tsvector column with
+# a GIN index on PostgreSQL
+SEARCH_DDL = {
+    "sqlite": [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5("
+        "body, content='search_documents', content_rowid='id', tokenize='porter unicode61')",
+        "CREATE TRIGGER IF NOT EXISTS search_documents_ai AFTER INSERT ON search_documents BEGIN "
+        "INSERT INTO search_fts(rowid, body) VALUES (new.id, new.body); END",
+        "CREATE TRIGGER IF NOT EXISTS search_documents_ad AFTER DELETE ON search_documents BEGIN "
+        "INSERT INTO search_fts(search_fts, rowid, body) VALUES ('delete', old.id, old.body); END",
+        "CREATE TRIGGER IF NOT EXISTS search_documents_au AFTER UPDATE ON search_documents BEGIN "
+        "INSERT INTO search_fts(search_fts, rowid, body) VALUES ('delete', old.id, old.body); "
+        "INSERT INTO search_fts(rowid, body) VALUES (new.id, new.body); END",
+    ],
+    "postgresql": [
+        "ALTER TABLE search_documents ADD COLUMN IF NOT EXISTS tsv tsvector "
+        "GENERATED ALWAYS AS (to_tsvector('english', coalesce(body, ''))) STORED",
+        "CREATE INDEX IF NOT EXISTS ix_search_documents_tsv ON search_documents USING GIN (tsv)",
+    ],
+}
+
+def _migrate_original_schema(conn):
+    """
+    Databases created before this schema: tasks gain key, description and
+    updated_at (keys computed from title and assignee, plus their indexes),
+    and meetings.transcript becomes binary. Existing plain-text transcripts
+    are kept as they are; Transcript.from_bytes parses them.
+    """
+    from transcripts.store import task_key
+
+    columns = {column["name"] for column in inspect(conn).get_columns("tasks")}
+    for name in ("key", "description", "updated_at"):
+        if name not in columns:
+            column_type = Task.__table__.c[name].type.compile(dialect=conn.dialect)
+            conn.execute(text(f"ALTER TABLE tasks ADD COLUMN {name} {column_type}"))
+
+    seen = set()
+    rows = conn.execute(text("SELECT id, meeting_id, title, assignee FROM tasks WHERE key IS NULL ORDER BY id")).all()
+    for row in rows:
+        key = task_key({"title": row.title, "assignee": row.assignee})
+        if (row.meeting_id, key) in seen:
+            key = f"{key}|{row.id}"  # duplicate task of one meeting: keep it, distinctly
+        seen.add((row.meeting_id, key))
+        conn.execute(text("UPDATE tasks SET key = :key WHERE id = :id"), {"key": key, "id": row.id})
+    conn.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS uq_tasks_meeting_id_key ON tasks (meeting_id, key)"))
+    for index in list(Task.__table__.indexes) + list(Meeting.__table__.indexes):
+        index.create(conn, checkfirst=True)
+
+    transcript = next(column for column in inspect(conn).get_columns("meetings") if column["name"] == "transcript")
+    if conn.dialect.name == "postgresql" and not isinstance(transcript["type"], LargeBinary):
+        conn.execute(text(
+            "ALTER TABLE meetings ALTER COLUMN transcript TYPE bytea USING convert_to(transcript, 'UTF8')"
+        ))
+
+# Schema changes to tables that existing databases already have, in order;
+# create_all only creates missing tables. A database is at the version of
+# the last migration applied to it, a new one at len(MIGRATIONS).
+MIGRATIONS = [
+    _migrate_original_schema,
+]
+
+def _migrate(conn, existing_tables):
+    if "meetings" not in existing_tables:
+        conn.execute(SchemaVersion.__table__.insert().values(version=len(MIGRATIONS)))
+        return
+    version = conn.execute(text("SELECT max(version) FROM schema_version")).scalar() or 0
+    for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+        print(f"Migrating database schema to version {number}")
+        migration(conn)
+        conn.execute(SchemaVersion.__table__.insert().values(version=number))
 
 async def init_db():
     """
-    Initialize the database by creating all tables
+    Initialize the database: create missing tables, then bring existing
+    ones up to date (see MIGRATIONS)
+    """
+    async with engine.begin() as conn:
+        existing_tables = await conn.run_sync(lambda sync_conn: set(inspect(sync_conn).get_table_names()))
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_migrate, existing_tables)
+        for statement in SEARCH_DDL.get(engine.dialect.name, []):
+            await conn.execute(text(statement))
+
+async def close_db():
+    """
+    Close pooled connections
     """
-    Base.metadata.create_all(bind=engine)
+    await engine.dispose()
 
-def get_db():
+async def get_db() -> AsyncIterator[AsyncSession]:
     """
-    Get database session
+    Get database session (FastAPI dependency)
     """
-    db = SessionLocal()
-    try:
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
\ No newline at end of file
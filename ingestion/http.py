@@ -0,0 +1,207 @@
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+import aiohttp
+import asyncio
+import json
+import os
+import time
+
+from core.resilience import RetryableError, get_api_guard, parse_retry_after
+
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+
+class SessionPool:
+    """
+    One connection-pooled aiohttp session per platform per process, so
+    DNS, TCP and TLS setup is paid once and connections are kept alive
+    between calls
+    """
+
+    def __init__(self):
+        self.limit = int(os.getenv("HTTP_POOL_LIMIT", "100"))
+        self.limit_per_host = int(os.getenv("HTTP_POOL_LIMIT_PER_HOST", "20"))
+        self.keepalive_timeout = float(os.getenv("HTTP_KEEPALIVE_SECONDS", "30"))
+        self.timeout = aiohttp.ClientTimeout(
+            total=float(os.getenv("HTTP_TIMEOUT_SECONDS", "60")),
+            connect=float(os.getenv("HTTP_CONNECT_TIMEOUT_SECONDS", "10"))
+        )
+        self._sessions: Dict[str, Tuple[asyncio.AbstractEventLoop, aiohttp.ClientSession]] = {}
+
+    async def get(self, platform: str) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        entry = self._sessions.get(platform)
+        if entry is not None:
+            session_loop, session = entry
+            # Sessions are bound to the loop they were created on
+            if session_loop is loop and not session.closed:
+                return session
+
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            ttl_dns_cache=300
+        )
+        session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        self._sessions[platform] = (loop, session)
+        return session
+
+    async def close(self):
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        for _, session in sessions:
+            if not session.closed:
+                await session.close()
+
+class AmbiguousRequestError(Exception):
+    """
+    A non-idempotent request failed in a way that does not tell whether the
+    server applied it (timeout, dropped connection, 5xx); it is not retried
+    """
+
+class HttpResponse:
+    """A fully read response, so it can be returned out of a retried call"""
+
+    def __init__(self, status: int, headers, body: bytes):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def json(self) -> Any:
+        return json.loads(self.body) if self.body else {}
+
+    def text(self) -> str:
+        return self.body.decode("utf-8", errors="replace")
+
+class ApiClient:
+    """
+    Outbound HTTP calls to one API over the pooled session, through the
+    shared rate limit / retry / circuit breaker policy (core.resilience).
+    429 and 5xx responses and connection errors are retried; any other
+    response is returned for the caller to interpret. Requests made with
+    idempotent=False (notifications) are only retried when the server
+    cannot have acted on them: 429 and failures to connect. Other failures
+    raise AmbiguousRequestError.
+    """
+
+    def __init__(self, api: str, sessions: Optional[SessionPool] = None):
+        self.api = api
+        self.sessions = sessions or get_session_pool()
+        self.guard = get_api_guard(api)
+
+    async def request(self, method: str, url: str, idempotent: bool = True, **kwargs) -> HttpResponse:
+        return await self.guard.call(self._send, method, url, kwargs, idempotent, host=urlsplit(url).netloc)
+
+    async def get(self, url: str, **kwargs) -> HttpResponse:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, idempotent: bool = True, **kwargs) -> HttpResponse:
+        return await self.request("POST", url, idempotent=idempotent, **kwargs)
+
+    async def _send(self, method: str, url: str, kwargs: Dict, idempotent: bool = True) -> HttpResponse:
+        session = await self.sessions.get(self.api)
+        try:
+            async with session.request(method, url, **kwargs) as response:
+                body = await response.read()
+        except aiohttp.ClientConnectorError as e:
+            # Never connected, so nothing was sent
+            raise RetryableError(f"{method} {urlsplit(url).netloc}: {type(e).__name__} {str(e)}")
+        except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError) as e:
+            if not idempotent:
+                raise AmbiguousRequestError(f"{method} {urlsplit(url).netloc}: {type(e).__name__} {str(e)}")
+            raise RetryableError(f"{method} {urlsplit(url).netloc}: {type(e).__name__} {str(e)}")
+        if response.status in RETRYABLE_STATUSES and response.status != 429 and not idempotent:
+            raise AmbiguousRequestError(f"{method} {urlsplit(url).netloc}: status {response.status}")
+        if response.status in RETRYABLE_STATUSES:
+            raise RetryableError(
+                f"{method} {urlsplit(url).netloc}: status {response.status}",
+                retry_after=parse_retry_after(response.headers.get("Retry-After")),
+                throttled=response.status == 429
+            )
+        return HttpResponse(response.status, response.headers, body)
+
+class TokenCache:
+    """
+    Process-wide cache of OAuth access tokens.
+
+    Tokens are refreshed ahead of expiry with a single in-flight refresh per
+    key, so concurrent requests share one token exchange. When
+    TOKEN_CACHE_PATH is set, tokens are also persisted (mode 0600) so a
+    restart reuses still-valid tokens instead of re-authenticating.
+    """
+
+    def __init__(self, path: Optional[str] = None, refresh_margin: Optional[int] = None):
+        self.path = path if path is not None else os.getenv("TOKEN_CACHE_PATH")
+        self.refresh_margin = refresh_margin if refresh_margin is not None else int(os.getenv("TOKEN_REFRESH_MARGIN_SECONDS", "300"))
+        self._tokens: Dict[str, Dict] = self._load()
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def _valid(self, key: str) -> Optional[str]:
+        entry = self._tokens.get(key)
+        if entry and entry["expires_at"] - self.refresh_margin > time.time():
+            return entry["token"]
+        return None
+
+    async def get(self, key: str, fetch: Callable[[], Awaitable[Tuple[str, int]]]) -> str:
+        """
+        Return a valid token for key, calling fetch() -> (token, expires_in)
+        when it is missing or about to expire
+        """
+        token = self._valid(key)
+        if token:
+            return token
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            # Another coroutine may have refreshed it while we waited
+            token = self._valid(key)
+            if token:
+                return token
+
+            token, expires_in = await fetch()
+            self._tokens[key] = {"token": token, "expires_at": time.time() + int(expires_in)}
+            self._save()
+            return token
+
+    def invalidate(self, key: str):
+        if self._tokens.pop(key, None) is not None:
+            self._save()
+
+    def _load(self) -> Dict[str, Dict]:
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path) as f:
+                tokens = json.load(f)
+            now = time.time()
+            return {key: entry for key, entry in tokens.items() if entry.get("expires_at", 0) > now}
+        except Exception as e:
+            print(f"Ignoring unreadable token cache {self.path}: {str(e)}")
+            return {}
+
+    def _save(self):
+        if not self.path:
+            return
+        try:
+            tmp_path = f"{self.path}.tmp"
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w") as f:
+                json.dump(self._tokens, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"Failed to persist token cache: {str(e)}")
+
+_session_pool: Optional[SessionPool] = None
+_token_cache: Optional[TokenCache] = None
+
+def get_session_pool() -> SessionPool:
+    global _session_pool
+    if _session_pool is None:
+        _session_pool = SessionPool()
+    return _session_pool
+
+def get_token_cache() -> TokenCache:
+    global _token_cache
+    if _token_cache is None:
+        _token_cache = TokenCache()
+    return _token_cache
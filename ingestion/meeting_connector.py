@@ -1,18 +1,27 @@
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, List
-import aiohttp
+from typing import AsyncIterator, Optional, Dict, List
+import asyncio
+import functools
 import os
-from datetime import datetime, timedelta
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from urllib.parse import quote
 import json
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 import msal
 import jwt
 import time
 from dotenv import load_dotenv
 
+from core.resilience import RetryableError, get_api_guard, parse_retry_after
+from ingestion.http import RETRYABLE_STATUSES, ApiClient, get_session_pool, get_token_cache
+
 load_dotenv()
 
 class MeetingPlatform(ABC):
@@ -28,52 +37,77 @@ class MeetingPlatform(ABC):
     async def get_transcript(self, meeting_id: str) -> str:
         pass
 
+    async def get_download_headers(self) -> Dict:
+        """Headers needed to download a URL returned by get_recording_url"""
+        return {}
+
+    async def list_meetings(self, start: datetime, end: datetime) -> AsyncIterator[Dict]:
+        """
+        Yield {"meeting_id", "platform", "start_time", "topic"} for every
+        recorded meeting in [start, end), following the platform's
+        pagination to the end
+        """
+        raise NotImplementedError(f"{type(self).__name__} cannot list meetings")
+        yield
+
+def _zoom_meeting_path(meeting_id: str) -> str:
+    """
+    Path segment for a Zoom meeting number or occurrence UUID. UUIDs that
+    start with "/" or contain "//" must be double URL-encoded.
+    """
+    if meeting_id.isdigit():
+        return meeting_id
+    if meeting_id.startswith("/") or "//" in meeting_id:
+        return quote(quote(meeting_id, safe=""), safe="")
+    return quote(meeting_id, safe="")
+
+def _utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+def _iso(value: datetime) -> str:
+    return _utc(value).strftime("%Y-%m-%dT%H:%M:%SZ")
+
 class ZoomConnector(MeetingPlatform):
     def __init__(self):
         self.client_id = os.getenv("ZOOM_CLIENT_ID")
         self.client_secret = os.getenv("ZOOM_CLIENT_SECRET")
         self.account_id = os.getenv("ZOOM_ACCOUNT_ID")
         self.base_url = "https://api.zoom.us/v2"
-        self._access_token = None
-        self._token_expiry = None
+        self.recordings_user = os.getenv("ZOOM_RECORDINGS_USER", "me")
+        self.http = ApiClient("zoom")
+        self.tokens = get_token_cache()
+        self._token_key = f"zoom:{self.account_id}:{self.client_id}"
 
     async def _get_access_token(self):
-        if self._access_token and self._token_expiry and datetime.now() < self._token_expiry:
-            return self._access_token
+        return await self.tokens.get(self._token_key, self._fetch_access_token)
 
+    async def _fetch_access_token(self):
         print("Attempting to get Zoom access token...")
         print(f"Account ID: {self.account_id}")
         print(f"Client ID: {self.client_id}")
         
-        async with aiohttp.ClientSession() as session:
-            auth_url = "https://zoom.us/oauth/token"
-            auth_string = self._get_base64_auth()
-            print(f"Base64 Auth String: {auth_string}")
+        auth_url = "https://zoom.us/oauth/token"
+        auth_headers = {
+            "Authorization": f"Basic {self._get_base64_auth()}",
+            "Content-Type": "application/x-www-form-urlencoded"
+        }
+        data = {
+            "grant_type": "account_credentials",
+            "account_id": self.account_id
+        }
+
+        try:
+            response = await self.http.post(auth_url, headers=auth_headers, data=data)
+            if response.status != 200:
+                raise Exception(f"Failed to get access token. Status: {response.status}, Response: {response.text()}")
             
-            auth_headers = {
-                "Authorization": f"Basic {auth_string}",
-                "Content-Type": "application/x-www-form-urlencoded"
-            }
-            data = {
-                "grant_type": "account_credentials",
-                "account_id": self.account_id
-            }
-
-            try:
-                async with session.post(auth_url, headers=auth_headers, data=data) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        raise Exception(f"Failed to get access token. Status: {response.status}, Response: {error_text}")
-                    
-                    token_data = await response.json()
-                    if "access_token" not in token_data:
-                        raise Exception(f"Invalid token response: {token_data}")
-                        
-                    self._access_token = token_data["access_token"]
-                    self._token_expiry = datetime.now() + timedelta(seconds=int(token_data["expires_in"]) - 300)
-                    return self._access_token
-            except Exception as e:
-                raise Exception(f"Error getting access token: {str(e)}")
+            token_data = response.json()
+            if "access_token" not in token_data:
+                raise Exception(f"Invalid token response: {token_data}")
+                
+            return token_data["access_token"], int(token_data["expires_in"])
+        except Exception as e:
+            raise Exception(f"Error getting access token: {str(e)}")
 
     def _get_base64_auth(self) -> str:
         """Generate Base64 encoded authentication string"""
@@ -84,85 +118,118 @@ class ZoomConnector(MeetingPlatform):
         auth_string = f"{client_id}:{client_secret}"
         return base64.b64encode(auth_string.encode()).decode('utf-8')
 
-    async def get_recording_url(self, meeting_id: str) -> str:
+    async def _headers(self) -> Dict:
         token = await self._get_access_token()
-        async with aiohttp.ClientSession() as session:
-            # First, verify the meeting exists
-            meeting_url = f"{self.base_url}/meetings/{meeting_id}"
-            headers = {
-                "Authorization": f"Bearer {token}",
-                "Content-Type": "application/json"
-            }
-            
-            print(f"Checking meeting {meeting_id}...")
-            async with session.get(meeting_url, headers=headers) as response:
-                if response.status != 200:
-                    error_text = await response.text()
-                    print(f"Error getting meeting: Status {response.status}, Response: {error_text}")
-                    raise Exception(f"Meeting not found or not accessible: {error_text}")
-                meeting_data = await response.json()
-                print(f"Meeting found: {meeting_data.get('topic', 'No topic')}")
-
-            # Then get the recordings
-            recordings_url = f"{self.base_url}/meetings/{meeting_id}/recordings"
-            print(f"Fetching recordings...")
-            async with session.get(recordings_url, headers=headers) as response:
-                if response.status != 200:
-                    error_text = await response.text()
-                    print(f"Error getting recordings: Status {response.status}, Response: {error_text}")
-                    raise Exception(f"Failed to get recordings: {error_text}")
-                
-                data = await response.json()
-                print(f"Recording data: {data}")
-                
-                if "recording_files" in data and data["recording_files"]:
-                    # Get the audio-only or shared screen recording
-                    for recording in data["recording_files"]:
-                        if recording["recording_type"] in ["audio_only", "shared_screen_with_speaker_view"]:
-                            print(f"Found recording: {recording['recording_type']}")
-                            return recording["download_url"]
-                    print("No suitable recording type found")
-                else:
-                    print("No recordings found for this meeting")
-                return None
+        return {
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json"
+        }
 
-    async def get_transcript(self, meeting_id: str) -> str:
+    async def get_download_headers(self) -> Dict:
         token = await self._get_access_token()
-        async with aiohttp.ClientSession() as session:
-            url = f"{self.base_url}/meetings/{meeting_id}/recordings/transcripts"
-            headers = {
-                "Authorization": f"Bearer {token}",
-                "Content-Type": "application/json"
-            }
-            
-            async with session.get(url, headers=headers) as response:
-                data = await response.json()
-                if "recording_transcripts" in data:
-                    # Get the VTT transcript URL and download it
-                    transcript_url = data["recording_transcripts"][0]["download_url"]
-                    async with session.get(transcript_url, headers=headers) as transcript_response:
-                        return await transcript_response.text()
-                return None
+        return {"Authorization": f"Bearer {token}"}
 
-    async def get_meeting_metadata(self, meeting_id: str) -> Dict:
-        token = await self._get_access_token()
-        async with aiohttp.ClientSession() as session:
-            url = f"{self.base_url}/meetings/{meeting_id}"
-            headers = {
-                "Authorization": f"Bearer {token}",
-                "Content-Type": "application/json"
-            }
-            
-            async with session.get(url, headers=headers) as response:
-                data = await response.json()
-                return {
-                    "platform": "zoom",
-                    "id": meeting_id,
-                    "topic": data.get("topic"),
-                    "start_time": data.get("start_time"),
-                    "duration": data.get("duration"),
-                    "participants": data.get("participants_count", 0)
+    async def get_recording_url(self, meeting_id: str) -> str:
+        headers = await self._headers()
+
+        # First, verify the meeting exists (a past occurrence, when given its UUID)
+        path = _zoom_meeting_path(meeting_id)
+        meeting_url = f"{self.base_url}/{'meetings' if meeting_id.isdigit() else 'past_meetings'}/{path}"
+        print(f"Checking meeting {meeting_id}...")
+        response = await self.http.get(meeting_url, headers=headers)
+        if response.status != 200:
+            error_text = response.text()
+            print(f"Error getting meeting: Status {response.status}, Response: {error_text}")
+            raise Exception(f"Meeting not found or not accessible: {error_text}")
+        meeting_data = response.json()
+        print(f"Meeting found: {meeting_data.get('topic', 'No topic')}")
+
+        # Then get the recordings
+        recordings_url = f"{self.base_url}/meetings/{path}/recordings"
+        print(f"Fetching recordings...")
+        response = await self.http.get(recordings_url, headers=headers)
+        if response.status != 200:
+            error_text = response.text()
+            print(f"Error getting recordings: Status {response.status}, Response: {error_text}")
+            raise Exception(f"Failed to get recordings: {error_text}")
+        
+        data = response.json()
+        print(f"Recording data: {data}")
+        
+        if "recording_files" in data and data["recording_files"]:
+            # Get the audio-only or shared screen recording
+            for recording in data["recording_files"]:
+                if recording["recording_type"] in ["audio_only", "shared_screen_with_speaker_view"]:
+                    print(f"Found recording: {recording['recording_type']}")
+                    return recording["download_url"]
+            print("No suitable recording type found")
+        else:
+            print("No recordings found for this meeting")
+        return None
+
+    async def get_transcript(self, meeting_id: str) -> str:
+        headers = await self._headers()
+        url = f"{self.base_url}/meetings/{_zoom_meeting_path(meeting_id)}/recordings/transcripts"
+        
+        data = (await self.http.get(url, headers=headers)).json()
+        if "recording_transcripts" in data:
+            # Get the VTT transcript URL and download it
+            transcript_url = data["recording_transcripts"][0]["download_url"]
+            return (await self.http.get(transcript_url, headers=headers)).text()
+        return None
+
+    async def list_meetings(self, start: datetime, end: datetime) -> AsyncIterator[Dict]:
+        """Cloud recordings of ZOOM_RECORDINGS_USER, paged 300 at a time"""
+        url = f"{self.base_url}/users/{self.recordings_user}/recordings"
+        start, end = _utc(start), _utc(end)
+        window_start = start
+        while window_start < end:
+            # Zoom only accepts ranges of up to one month per request
+            window_end = min(end, window_start + timedelta(days=30))
+            page_token = ""
+            while True:
+                params = {
+                    "from": window_start.strftime("%Y-%m-%d"),
+                    "to": window_end.strftime("%Y-%m-%d"),
+                    "page_size": 300,
+                    "next_page_token": page_token
                 }
+                response = await self.http.get(url, headers=await self._headers(), params=params)
+                if response.status != 200:
+                    raise Exception(f"Failed to list recordings: Status {response.status}, Response: {response.text()}")
+                data = response.json()
+                for meeting in data.get("meetings", []):
+                    started = meeting.get("start_time")
+                    # from/to are whole days; trim to the exact range
+                    if started and not (start <= datetime.fromisoformat(started.replace("Z", "+00:00")) < end):
+                        continue
+                    # The UUID identifies this occurrence; the meeting number is shared by
+                    # every occurrence of a recurring meeting
+                    yield {
+                        "meeting_id": meeting["uuid"],
+                        "platform": "zoom",
+                        "start_time": started,
+                        "topic": meeting.get("topic")
+                    }
+                page_token = data.get("next_page_token")
+                if not page_token:
+                    break
+            window_start = window_end
+
+    async def get_meeting_metadata(self, meeting_id: str) -> Dict:
+        headers = await self._headers()
+        path = _zoom_meeting_path(meeting_id)
+        url = f"{self.base_url}/{'meetings' if meeting_id.isdigit() else 'past_meetings'}/{path}"
+        
+        data = (await self.http.get(url, headers=headers)).json()
+        return {
+            "platform": "zoom",
+            "id": meeting_id,
+            "topic": data.get("topic"),
+            "start_time": data.get("start_time"),
+            "duration": data.get("duration"),
+            "participants": data.get("participants_count", 0)
+        }
 
 class TeamsConnector(MeetingPlatform):
     def __init__(self):
@@ -170,80 +237,139 @@ class TeamsConnector(MeetingPlatform):
         self.client_secret = os.getenv("TEAMS_CLIENT_SECRET")
         self.tenant_id = os.getenv("TEAMS_TENANT_ID")
         self.base_url = "https://graph.microsoft.com/v1.0"
-        self._access_token = None
-        self._token_expiry = None
+        self.http = ApiClient("teams")
+        self.tokens = get_token_cache()
+        self._token_key = f"teams:{self.tenant_id}:{self.client_id}"
+        self._msal_app = None
 
     async def _get_access_token(self):
-        if self._access_token and self._token_expiry and datetime.now() < self._token_expiry:
-            return self._access_token
+        return await self.tokens.get(self._token_key, self._fetch_access_token)
 
-        app = msal.ConfidentialClientApplication(
-            self.client_id,
-            authority=f"https://login.microsoftonline.com/{self.tenant_id}",
-            client_credential=self.client_secret
-        )
+    async def _fetch_access_token(self):
+        if self._msal_app is None:
+            self._msal_app = msal.ConfidentialClientApplication(
+                self.client_id,
+                authority=f"https://login.microsoftonline.com/{self.tenant_id}",
+                client_credential=self.client_secret
+            )
 
-        result = app.acquire_token_for_client(scopes=["https://graph.microsoft.com/.default"])
+        # msal is synchronous; keep the token exchange off the event loop
+        result = await asyncio.to_thread(
+            self._msal_app.acquire_token_for_client,
+            scopes=["https://graph.microsoft.com/.default"]
+        )
         if "access_token" in result:
-            self._access_token = result["access_token"]
-            self._token_expiry = datetime.now() + timedelta(seconds=3600)
-            return self._access_token
+            return result["access_token"], int(result.get("expires_in", 3600))
         else:
             raise Exception(f"Failed to get Teams access token: {result.get('error_description')}")
 
-    async def get_recording_url(self, meeting_id: str) -> str:
+    async def _headers(self) -> Dict:
         token = await self._get_access_token()
-        async with aiohttp.ClientSession() as session:
-            url = f"{self.base_url}/users/meetings/{meeting_id}/recordings"
-            headers = {
-                "Authorization": f"Bearer {token}",
-                "Content-Type": "application/json"
-            }
-            
-            async with session.get(url, headers=headers) as response:
-                data = await response.json()
-                if "value" in data and len(data["value"]) > 0:
-                    return data["value"][0]["accessUrl"]
-                return None
+        return {
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json"
+        }
 
-    async def get_transcript(self, meeting_id: str) -> str:
+    async def get_download_headers(self) -> Dict:
         token = await self._get_access_token()
-        async with aiohttp.ClientSession() as session:
-            url = f"{self.base_url}/users/meetings/{meeting_id}/transcripts"
-            headers = {
-                "Authorization": f"Bearer {token}",
-                "Content-Type": "application/json"
-            }
-            
-            async with session.get(url, headers=headers) as response:
-                data = await response.json()
-                if "value" in data and len(data["value"]) > 0:
-                    transcript_url = data["value"][0]["downloadUrl"]
-                    async with session.get(transcript_url, headers=headers) as transcript_response:
-                        return await transcript_response.text()
-                return None
+        return {"Authorization": f"Bearer {token}"}
+
+    async def get_recording_url(self, meeting_id: str) -> str:
+        headers = await self._headers()
+        url = f"{self.base_url}/users/meetings/{meeting_id}/recordings"
+        
+        data = (await self.http.get(url, headers=headers)).json()
+        if "value" in data and len(data["value"]) > 0:
+            return data["value"][0]["accessUrl"]
+        return None
+
+    async def get_transcript(self, meeting_id: str) -> str:
+        headers = await self._headers()
+        url = f"{self.base_url}/users/meetings/{meeting_id}/transcripts"
+        
+        data = (await self.http.get(url, headers=headers)).json()
+        if "value" in data and len(data["value"]) > 0:
+            transcript_url = data["value"][0]["downloadUrl"]
+            return (await self.http.get(transcript_url, headers=headers)).text()
+        return None
+
+    async def list_meetings(self, start: datetime, end: datetime) -> AsyncIterator[Dict]:
+        """
+        Online meetings with a call record in the range, resolved from the
+        call record's organizer and join URL (Graph paginates via
+        @odata.nextLink)
+        """
+        url = f"{self.base_url}/communications/callRecords"
+        params = {"$filter": f"startDateTime ge {_iso(start)} and startDateTime lt {_iso(end)}"}
+        while url:
+            response = await self.http.get(url, headers=await self._headers(), params=params)
+            if response.status != 200:
+                raise Exception(f"Failed to list call records: Status {response.status}, Response: {response.text()}")
+            data = response.json()
+            for record in data.get("value", []):
+                meeting_id = await self._resolve_online_meeting(record)
+                if meeting_id:
+                    yield {
+                        "meeting_id": meeting_id,
+                        "platform": "teams",
+                        "start_time": record.get("startDateTime"),
+                        "topic": None
+                    }
+            # The next link already carries the query
+            url, params = data.get("@odata.nextLink"), None
+
+    async def resolve_call_record(self, call_record_id: str) -> Optional[str]:
+        """Online meeting id of a call record (used for callRecords change notifications)"""
+        url = f"{self.base_url}/communications/callRecords/{call_record_id}"
+        response = await self.http.get(url, headers=await self._headers())
+        if response.status != 200:
+            raise Exception(f"Failed to get call record: Status {response.status}, Response: {response.text()}")
+        return await self._resolve_online_meeting(response.json())
+
+    async def _resolve_online_meeting(self, record: Dict) -> Optional[str]:
+        organizer = ((record.get("organizer") or {}).get("user") or {}).get("id")
+        join_url = record.get("joinWebUrl")
+        if not organizer or not join_url:
+            return None
+        url = f"{self.base_url}/users/{organizer}/onlineMeetings"
+        params = {"$filter": f"JoinWebUrl eq '{join_url}'"}
+        response = await self.http.get(url, headers=await self._headers(), params=params)
+        if response.status != 200:
+            return None
+        meetings = response.json().get("value", [])
+        return meetings[0]["id"] if meetings else None
 
     async def get_meeting_metadata(self, meeting_id: str) -> Dict:
-        token = await self._get_access_token()
-        async with aiohttp.ClientSession() as session:
-            url = f"{self.base_url}/users/meetings/{meeting_id}"
-            headers = {
-                "Authorization": f"Bearer {token}",
-                "Content-Type": "application/json"
-            }
-            
-            async with session.get(url, headers=headers) as response:
-                data = await response.json()
-                return {
-                    "platform": "teams",
-                    "id": meeting_id,
-                    "subject": data.get("subject"),
-                    "start_time": data.get("startDateTime"),
-                    "end_time": data.get("endDateTime"),
-                    "participants": len(data.get("participants", []))
-                }
+        headers = await self._headers()
+        url = f"{self.base_url}/users/meetings/{meeting_id}"
+        
+        data = (await self.http.get(url, headers=headers)).json()
+        return {
+            "platform": "teams",
+            "id": meeting_id,
+            "subject": data.get("subject"),
+            "start_time": data.get("startDateTime"),
+            "end_time": data.get("endDateTime"),
+            "participants": len(data.get("participants", []))
+        }
+
+# Drive file ids are long URL-safe tokens; meeting codes are short and dashed
+_DRIVE_FILE_ID = re.compile(r"^[A-Za-z0-9_-]{20,}$")
+
+def _recording_stem(name: str) -> str:
+    """Meet recording file name without the extension and " - Recording" suffix"""
+    stem = os.path.splitext(name)[0]
+    return stem[:-len(" - Recording")] if stem.endswith(" - Recording") else stem
 
 class GoogleMeetConnector(MeetingPlatform):
+    """
+    Google Drive/Calendar connector.
+
+    googleapiclient is synchronous and its HTTP objects are not thread-safe,
+    so every call runs on a small dedicated thread pool and each pool thread
+    keeps its own cached service objects (the discovery document is parsed
+    once per thread, not once per call).
+    """
     def __init__(self):
         self.credentials_path = os.getenv("GOOGLE_MEET_CREDENTIALS")
         self.token_path = os.getenv("GOOGLE_MEET_TOKEN")
@@ -252,45 +378,94 @@ class GoogleMeetConnector(MeetingPlatform):
             'https://www.googleapis.com/auth/calendar.readonly'
         ]
         self._creds = None
+        self._creds_lock = threading.Lock()
+        self._local = threading.local()
+        self._executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv("GOOGLE_API_WORKERS", "4")),
+            thread_name_prefix="google-api"
+        )
+        self.guard = get_api_guard("google")
 
     def _get_credentials(self):
-        if self._creds and self._creds.valid:
-            return self._creds
+        with self._creds_lock:
+            if self._creds and self._creds.valid:
+                return self._creds
 
-        if os.path.exists(self.token_path):
-            self._creds = Credentials.from_authorized_user_file(self.token_path, self.scopes)
+            if os.path.exists(self.token_path):
+                self._creds = Credentials.from_authorized_user_file(self.token_path, self.scopes)
 
-        if not self._creds or not self._creds.valid:
-            if self._creds and self._creds.expired and self._creds.refresh_token:
-                self._creds.refresh(Request())
-            else:
-                flow = InstalledAppFlow.from_client_secrets_file(self.credentials_path, self.scopes)
-                self._creds = flow.run_local_server(port=0)
-                with open(self.token_path, 'w') as token:
-                    token.write(self._creds.to_json())
+            if not self._creds or not self._creds.valid:
+                if self._creds and self._creds.expired and self._creds.refresh_token:
+                    self._creds.refresh(Request())
+                else:
+                    flow = InstalledAppFlow.from_client_secrets_file(self.credentials_path, self.scopes)
+                    self._creds = flow.run_local_server(port=0)
+                    with open(self.token_path, 'w') as token:
+                        token.write(self._creds.to_json())
 
-        return self._creds
+            return self._creds
 
-    async def get_recording_url(self, meeting_id: str) -> str:
+    def _service(self, api: str, version: str):
+        """Per-thread cached service object; rebuilt only when credentials change"""
         creds = self._get_credentials()
-        service = build('drive', 'v3', credentials=creds)
+        services = getattr(self._local, "services", None)
+        if services is None:
+            services = self._local.services = {}
+        cached = services.get((api, version))
+        if cached is None or cached[0] is not creds:
+            cached = (creds, build(api, version, credentials=creds, cache_discovery=False))
+            services[(api, version)] = cached
+        return cached[1]
+
+    async def _run(self, func, *args):
+        return await self.guard.call(self._run_in_executor, func, *args, host="www.googleapis.com")
+
+    async def _run_in_executor(self, func, *args):
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._executor, functools.partial(func, *args))
+        except HttpError as e:
+            status = int(e.resp.status)
+            if status in RETRYABLE_STATUSES:
+                raise RetryableError(
+                    f"Google API status {status}",
+                    retry_after=parse_retry_after(e.resp.get("retry-after")),
+                    throttled=status == 429
+                )
+            raise
+
+    @staticmethod
+    def _name_query(meeting_id: str, mime_prefix: str) -> str:
+        escaped = meeting_id.replace("\\", "\\\\").replace("'", "\\'")
+        return f"name contains '{escaped}' and mimeType contains '{mime_prefix}'"
+
+    def _find_recording(self, meeting_id: str) -> Optional[str]:
+        if _DRIVE_FILE_ID.match(meeting_id):
+            # Listed meetings are keyed by their recording's Drive file id
+            return f"https://www.googleapis.com/drive/v3/files/{meeting_id}?alt=media"
+        service = self._service('drive', 'v3')
         
         # Search for the recording in Google Drive
-        query = f"name contains '{meeting_id}' and mimeType contains 'video/'"
-        results = service.files().list(q=query, spaces='drive').execute()
+        query = self._name_query(meeting_id, 'video/')
+        results = service.files().list(q=query, spaces='drive', fields='files(id)', pageSize=1).execute()
         files = results.get('files', [])
         
         if files:
-            return f"https://drive.google.com/file/d/{files[0]['id']}/view"
+            # Media endpoint, so the recording can be downloaded with the OAuth token
+            return f"https://www.googleapis.com/drive/v3/files/{files[0]['id']}?alt=media"
         return None
 
-    async def get_transcript(self, meeting_id: str) -> str:
-        creds = self._get_credentials()
-        service = build('drive', 'v3', credentials=creds)
+    def _download_transcript(self, meeting_id: str) -> Optional[str]:
+        service = self._service('drive', 'v3')
         
-        # Search for the transcript file
-        query = f"name contains '{meeting_id}' and mimeType contains 'text/'"
-        results = service.files().list(q=query, spaces='drive').execute()
+        # Search for the transcript file; for a recording's file id, the one
+        # named after that recording ("<code> (<date>) - Transcript")
+        name = meeting_id
+        if _DRIVE_FILE_ID.match(meeting_id):
+            recording = service.files().get(fileId=meeting_id, fields='name').execute()
+            name = _recording_stem(recording['name'])
+        query = self._name_query(name, 'text/')
+        results = service.files().list(q=query, spaces='drive', fields='files(id)', pageSize=1).execute()
         files = results.get('files', [])
         
         if files:
@@ -298,9 +473,23 @@ class GoogleMeetConnector(MeetingPlatform):
             return request.execute().decode('utf-8')
         return None
 
-    async def get_meeting_metadata(self, meeting_id: str) -> Dict:
-        creds = self._get_credentials()
-        service = build('calendar', 'v3', credentials=creds)
+    def _list_recordings_page(self, start: datetime, end: datetime, page_token: Optional[str]) -> Dict:
+        service = self._service('drive', 'v3')
+        query = (
+            f"mimeType contains 'video/' and modifiedTime >= '{_iso(start)}' "
+            f"and modifiedTime < '{_iso(end)}' and trashed = false"
+        )
+        return service.files().list(
+            q=query,
+            spaces='drive',
+            fields='nextPageToken, files(id, name, createdTime, modifiedTime)',
+            orderBy='modifiedTime',
+            pageSize=100,
+            pageToken=page_token
+        ).execute()
+
+    def _fetch_event(self, meeting_id: str) -> Dict:
+        service = self._service('calendar', 'v3')
         
         event = service.events().get(calendarId='primary', eventId=meeting_id).execute()
         return {
@@ -312,6 +501,41 @@ class GoogleMeetConnector(MeetingPlatform):
             "participants": len(event.get('attendees', []))
         }
 
+    async def get_recording_url(self, meeting_id: str) -> str:
+        return await self._run(self._find_recording, meeting_id)
+
+    async def list_meetings(self, start: datetime, end: datetime) -> AsyncIterator[Dict]:
+        """Meet recordings in Drive modified in the range"""
+        page_token = None
+        while True:
+            data = await self._run(self._list_recordings_page, start, end, page_token)
+            for file in data.get('files', []):
+                # The Meet code in the name is reused by every occurrence of a
+                # recurring meeting; the Drive file id identifies this recording
+                yield {
+                    "meeting_id": file['id'],
+                    "platform": "google_meet",
+                    "start_time": file.get('createdTime'),
+                    "modified_time": file.get('modifiedTime'),
+                    "topic": file['name']
+                }
+            page_token = data.get('nextPageToken')
+            if not page_token:
+                break
+
+    async def get_download_headers(self) -> Dict:
+        creds = await self._run(self._get_credentials)
+        return {"Authorization": f"Bearer {creds.token}"}
+
+    async def get_transcript(self, meeting_id: str) -> str:
+        return await self._run(self._download_transcript, meeting_id)
+
+    async def get_meeting_metadata(self, meeting_id: str) -> Dict:
+        return await self._run(self._fetch_event, meeting_id)
+
+    async def aclose(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
 class MeetingConnector:
     def __init__(self):
         self.platforms = {
@@ -328,6 +552,14 @@ class MeetingConnector:
         connector = self.platforms[platform]
         return await connector.get_recording_url(meeting_id)
 
+    async def get_download_headers(self, platform: str) -> Dict:
+        """Get the headers needed to download a recording from the specified platform"""
+        if platform not in self.platforms:
+            raise ValueError(f"Unsupported platform: {platform}")
+        
+        connector = self.platforms[platform]
+        return await connector.get_download_headers()
+
     async def get_metadata(self, meeting_id: str, platform: str) -> Dict:
         """Get meeting metadata from specified platform"""
         if platform not in self.platforms:
@@ -342,4 +574,25 @@ class MeetingConnector:
             raise ValueError(f"Unsupported platform: {platform}")
         
         connector = self.platforms[platform]
-        return await connector.get_transcript(meeting_id)
\ No newline at end of file
+        return await connector.get_transcript(meeting_id)
+
+    async def resolve_call_record(self, call_record_id: str) -> Optional[str]:
+        """Teams online meeting id for a Graph call record"""
+        return await self.platforms["teams"].resolve_call_record(call_record_id)
+
+    async def list_meetings(self, platform: str, start: datetime, end: datetime) -> AsyncIterator[Dict]:
+        """List recorded meetings on the specified platform in [start, end)"""
+        if platform not in self.platforms:
+            raise ValueError(f"Unsupported platform: {platform}")
+
+        connector = self.platforms[platform]
+        async for meeting in connector.list_meetings(start, end):
+            yield meeting
+
+    async def aclose(self):
+        """Release connector resources and the pooled HTTP sessions"""
+        for connector in self.platforms.values():
+            close = getattr(connector, "aclose", None)
+            if close is not None:
+                await close()
+        await get_session_pool().close()
\ No newline at end of file
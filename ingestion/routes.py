@@ -0,0 +1,93 @@
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+import json
+
+from ingestion.sync import SyncEngine, get_sync_engine
+from ingestion.webhooks import GraphWebhook, WebhookVerificationError, ZoomWebhook, record_delivery
+
+router = APIRouter()
+zoom_webhook = ZoomWebhook()
+graph_webhook = GraphWebhook()
+
+@router.get("/sync")
+async def sync_state(sync: SyncEngine = Depends(get_sync_engine)):
+    """Per-platform watermark and last sync result"""
+    return {"platforms": sync.platforms, "polling": sync.interval_seconds > 0, "state": await sync.state()}
+
+@router.post("/sync/{platform}")
+async def sync_now(platform: str, sync: SyncEngine = Depends(get_sync_engine)):
+    """Run one incremental sync cycle for a platform now"""
+    try:
+        result = await sync.sync(platform)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if result is None:
+        raise HTTPException(status_code=409, detail=f"A sync of {platform} is already running")
+    return result
+
+@router.post("/webhooks/zoom")
+async def zoom_webhook_event(request: Request, sync: SyncEngine = Depends(get_sync_engine)):
+    """Zoom recording.completed / recording.transcript_completed events"""
+    body = await request.body()
+    try:
+        zoom_webhook.verify(body, request.headers.get("x-zm-request-timestamp"), request.headers.get("x-zm-signature"))
+    except WebhookVerificationError as e:
+        raise HTTPException(status_code=401, detail=str(e))
+
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid JSON body")
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=400, detail="Expected a JSON object")
+    if payload.get("event") == "endpoint.url_validation":
+        return zoom_webhook.validation_response(payload)
+
+    event = zoom_webhook.meeting_event(payload)
+    if event is None:
+        return {"status": "ignored"}
+    if not await record_delivery(event["key"], "zoom", event["event"], event["meeting_id"]):
+        return {"status": "duplicate"}
+    try:
+        job_id = await sync.process_delivery({"key": event["key"], "platform": "zoom",
+                                              "meeting_id": event["meeting_id"]})
+    except Exception:
+        # Recorded as failed; Zoom would only redeliver into the dedup check, so we retry it ourselves
+        return {"status": "deferred", "job_id": None}
+    return {"status": "queued" if job_id else "already_queued", "job_id": job_id}
+
+@router.post("/webhooks/teams", status_code=202)
+async def teams_webhook_event(request: Request, background_tasks: BackgroundTasks,
+                              sync: SyncEngine = Depends(get_sync_engine)):
+    """Microsoft Graph change notifications for meeting transcripts, recordings or call records"""
+    # Subscription validation handshake: echo the token as plain text
+    validation_token = request.query_params.get("validationToken")
+    if validation_token is not None:
+        return PlainTextResponse(validation_token, status_code=200)
+
+    try:
+        payload = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid JSON body")
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=400, detail="Expected a JSON object")
+    try:
+        notifications = graph_webhook.notifications(payload)
+    except WebhookVerificationError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+
+    queued = 0
+    for notification in notifications:
+        if not await record_delivery(notification["key"], "teams", notification["event"],
+                                     notification["meeting_id"], notification["call_record_id"]):
+            continue
+        queued += 1
+        # Graph expects an answer within seconds; resolve and enqueue after responding
+        background_tasks.add_task(_process_teams_notification, sync, notification)
+    return {"accepted": queued}
+
+async def _process_teams_notification(sync: SyncEngine, notification):
+    try:
+        await sync.process_delivery({**notification, "platform": "teams"})
+    except Exception:
+        pass  # recorded as failed and retried by the sync engine
@@ -0,0 +1,258 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from fastapi import Request
+from sqlalchemy import select, update, or_
+from sqlalchemy.exc import IntegrityError
+import asyncio
+import os
+import socket
+import uuid
+
+from db.database import SessionLocal, SyncState, SyncedMeeting, WebhookEvent
+
+class SyncEngine:
+    """
+    Incremental discovery of new platform recordings.
+
+    Each cycle lists only recordings since the platform's watermark (minus
+    an overlap for recordings that become available late) through the
+    connector's paginated list endpoint, records each meeting once in
+    synced_meetings and queues a job for the ones not seen before. The
+    watermark then advances to the cycle's start, so a cycle costs
+    O(new meetings) rather than O(all meetings). A per-platform lease keeps
+    several app instances from syncing the same platform at once.
+    """
+
+    def __init__(self, components, jobs, platforms: Optional[List[str]] = None,
+                 interval_seconds: Optional[float] = None, overlap_seconds: Optional[int] = None,
+                 initial_lookback_days: Optional[int] = None, lease_seconds: Optional[int] = None):
+        self.components = components
+        self.jobs = jobs
+        if platforms is None:
+            platforms = [p.strip() for p in os.getenv("SYNC_PLATFORMS", "").split(",") if p.strip()]
+        self.platforms = platforms
+        self.interval_seconds = interval_seconds if interval_seconds is not None else float(os.getenv("SYNC_INTERVAL_SECONDS", "900"))
+        self.overlap_seconds = overlap_seconds if overlap_seconds is not None else int(os.getenv("SYNC_OVERLAP_SECONDS", "21600"))
+        self.initial_lookback_days = initial_lookback_days if initial_lookback_days is not None else int(os.getenv("SYNC_INITIAL_LOOKBACK_DAYS", "1"))
+        self.lease_seconds = lease_seconds or int(os.getenv("SYNC_LEASE_SECONDS", "600"))
+        self.delivery_retry_seconds = float(os.getenv("WEBHOOK_RETRY_SECONDS", "300"))
+        self.delivery_max_attempts = int(os.getenv("WEBHOOK_MAX_ATTEMPTS", "5"))
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._task: Optional[asyncio.Task] = None
+        self._retry_task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """
+        Start retrying failed webhook deliveries and interval polling (no-op
+        when no platforms are configured or the interval is 0)
+        """
+        if self._retry_task is None and self.delivery_retry_seconds > 0:
+            self._retry_task = asyncio.create_task(self._retry_loop())
+        if self._task is not None or not self.platforms or self.interval_seconds <= 0:
+            return
+        print(f"Syncing {', '.join(self.platforms)} every {self.interval_seconds:.0f}s")
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        for task in (self._task, self._retry_task):
+            if task is not None:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+        self._task = None
+        self._retry_task = None
+
+    async def _loop(self):
+        while True:
+            for platform in self.platforms:
+                try:
+                    await self.sync(platform)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    print(f"Sync of {platform} failed: {str(e)}")
+            await asyncio.sleep(self.interval_seconds)
+
+    async def sync(self, platform: str) -> Optional[Dict]:
+        """
+        Run one sync cycle for a platform; returns a summary, or None if
+        another instance holds the platform's lease
+        """
+        meeting_connector = await self.components.get("meeting_connector")
+        if platform not in meeting_connector.platforms:
+            raise ValueError(f"Unsupported platform: {platform}")
+        watermark = await self._claim(platform)
+        if watermark is None:
+            return None
+
+        cycle_start = datetime.utcnow()
+        since = watermark - timedelta(seconds=self.overlap_seconds)
+        listed = 0
+        queued = []
+        try:
+            async for meeting in meeting_connector.list_meetings(platform, since, cycle_start):
+                listed += 1
+                job_id = await self.enqueue(platform, meeting["meeting_id"], source="sync")
+                if job_id:
+                    queued.append(meeting["meeting_id"])
+        except Exception as e:
+            # Keep the old watermark so the next cycle retries the same window
+            await self._release(platform, last_run_at=cycle_start, last_error=str(e))
+            raise
+
+        await self._release(platform, watermark=cycle_start, last_run_at=cycle_start, last_error=None,
+                            discovered=SyncState.discovered + len(queued))
+        print(f"Sync {platform}: listed {listed}, queued {len(queued)} new meetings")
+        return {"platform": platform, "since": since.isoformat(), "listed": listed, "queued": queued}
+
+    async def enqueue(self, platform: str, meeting_id: str, source: str) -> Optional[str]:
+        """
+        Queue a job for a meeting unless it was already discovered (by any
+        source); returns the new job id, or None for a duplicate
+        """
+        payload = {"meeting_id": meeting_id, "platform": platform}
+        # The marker and its job commit together, so a meeting is never
+        # recorded as discovered without a job to process it
+        async with SessionLocal() as db:
+            job_id = self.jobs.add(db, payload)
+            db.add(SyncedMeeting(platform=platform, meeting_id=meeting_id, source=source, job_id=job_id))
+            try:
+                await db.commit()
+            except IntegrityError:
+                # The unique constraint makes discovery idempotent across instances
+                await db.rollback()
+                return None
+
+        self.jobs.notify()
+        return job_id
+
+    async def process_delivery(self, delivery: Dict) -> Optional[str]:
+        """
+        Resolve a recorded webhook delivery to its meeting and queue it;
+        returns the job id (None for a meeting already queued). The outcome
+        is stored on the delivery, so a failure is retried later instead of
+        being lost behind the dedup record.
+        """
+        try:
+            meeting_id = delivery["meeting_id"]
+            if meeting_id is None and delivery.get("call_record_id"):
+                meeting_connector = await self.components.get("meeting_connector")
+                meeting_id = await meeting_connector.resolve_call_record(delivery["call_record_id"])
+            job_id = await self.enqueue(delivery["platform"], meeting_id, source="webhook") if meeting_id else None
+        except Exception as e:
+            print(f"Failed to enqueue {delivery['platform']} webhook delivery {delivery['key']}: {str(e)}")
+            await self._finish_delivery(delivery["key"], status="failed", error=str(e))
+            raise
+        await self._finish_delivery(delivery["key"], status="queued" if meeting_id else "ignored",
+                                    meeting_id=meeting_id, error=None)
+        return job_id
+
+    async def retry_deliveries(self) -> int:
+        """
+        Process again the webhook deliveries that failed, or were left
+        unprocessed by a process that died, up to WEBHOOK_MAX_ATTEMPTS;
+        returns how many went through
+        """
+        now = datetime.utcnow()
+        stale = now - timedelta(seconds=self.delivery_retry_seconds)
+        claimed = []
+        async with SessionLocal() as db:
+            rows = (await db.execute(
+                select(WebhookEvent)
+                .where(WebhookEvent.status.in_(("received", "failed")),
+                       WebhookEvent.attempts < self.delivery_max_attempts,
+                       WebhookEvent.updated_at < stale)
+                .order_by(WebhookEvent.received_at)
+                .limit(100)
+            )).scalars().all()
+            for row in rows:
+                # Conditional on the row being unchanged since it was read, so one instance retries it
+                won = await db.execute(
+                    update(WebhookEvent)
+                    .where(WebhookEvent.key == row.key, WebhookEvent.status == row.status,
+                           WebhookEvent.attempts == row.attempts)
+                    .values(attempts=WebhookEvent.attempts + 1, updated_at=now)
+                )
+                if won.rowcount == 1:
+                    claimed.append({"key": row.key, "platform": row.platform, "meeting_id": row.meeting_id,
+                                    "call_record_id": row.call_record_id})
+            await db.commit()
+
+        retried = 0
+        for delivery in claimed:
+            try:
+                await self.process_delivery(delivery)
+                retried += 1
+            except Exception:
+                pass
+        return retried
+
+    async def _retry_loop(self):
+        while True:
+            await asyncio.sleep(self.delivery_retry_seconds)
+            try:
+                await self.retry_deliveries()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Webhook delivery retry failed: {str(e)}")
+
+    async def _finish_delivery(self, key: str, **values):
+        async with SessionLocal() as db:
+            await db.execute(
+                update(WebhookEvent)
+                .where(WebhookEvent.key == key)
+                .values(updated_at=datetime.utcnow(), **values)
+            )
+            await db.commit()
+
+    async def state(self) -> List[Dict]:
+        async with SessionLocal() as db:
+            return [
+                {
+                    "platform": state.platform,
+                    "watermark": state.watermark.isoformat() if state.watermark else None,
+                    "last_run_at": state.last_run_at.isoformat() if state.last_run_at else None,
+                    "last_error": state.last_error,
+                    "discovered": state.discovered,
+                }
+                for state in (await db.execute(select(SyncState).order_by(SyncState.platform))).scalars()
+            ]
+
+    async def _claim(self, platform: str) -> Optional[datetime]:
+        """Take the platform's lease; returns its watermark"""
+        now = datetime.utcnow()
+        async with SessionLocal() as db:
+            if await db.get(SyncState, platform) is None:
+                db.add(SyncState(platform=platform, watermark=now - timedelta(days=self.initial_lookback_days),
+                                 discovered=0))
+                try:
+                    await db.commit()
+                except IntegrityError:
+                    await db.rollback()
+            claimed = await db.execute(
+                update(SyncState)
+                .where(
+                    SyncState.platform == platform,
+                    or_(SyncState.lease_owner.is_(None), SyncState.lease_expires_at < now)
+                )
+                .values(lease_owner=self.worker_id, lease_expires_at=now + timedelta(seconds=self.lease_seconds))
+            )
+            await db.commit()
+            if claimed.rowcount != 1:
+                return None
+            return (await db.get(SyncState, platform)).watermark
+
+    async def _release(self, platform: str, **values):
+        async with SessionLocal() as db:
+            await db.execute(
+                update(SyncState)
+                .where(SyncState.platform == platform, SyncState.lease_owner == self.worker_id)
+                .values(lease_owner=None, lease_expires_at=None, **values)
+            )
+            await db.commit()
+
+def get_sync_engine(request: Request) -> SyncEngine:
+    """
+    FastAPI dependency returning the sync engine created at startup
+    """
+    return request.app.state.sync
@@ -0,0 +1,115 @@
+from typing import Dict, List, Optional
+from sqlalchemy.exc import IntegrityError
+import hashlib
+import hmac
+import os
+import re
+import time
+
+from db.database import SessionLocal, WebhookEvent
+
+ZOOM_RECORDING_EVENTS = ("recording.completed", "recording.transcript_completed")
+
+_ONLINE_MEETING = re.compile(r"onlineMeetings\('?([^')/]+)'?\)")
+_CALL_RECORD = re.compile(r"callRecords(?:\('?|/)([^')/]+)")
+
+class WebhookVerificationError(Exception):
+    """Raised when a webhook request fails signature or client state checks"""
+
+def _hmac_hex(secret: str, message: str) -> str:
+    return hmac.new(secret.encode("utf-8"), message.encode("utf-8"), hashlib.sha256).hexdigest()
+
+class ZoomWebhook:
+    """
+    Zoom event subscriptions: x-zm-signature verification, the
+    endpoint.url_validation challenge and recording events
+    """
+
+    def __init__(self, secret_token: Optional[str] = None, tolerance_seconds: Optional[int] = None):
+        self.secret_token = secret_token or os.getenv("ZOOM_WEBHOOK_SECRET_TOKEN")
+        self.tolerance_seconds = tolerance_seconds or int(os.getenv("WEBHOOK_TOLERANCE_SECONDS", "300"))
+
+    def verify(self, body: bytes, timestamp: Optional[str], signature: Optional[str]):
+        if not self.secret_token:
+            raise WebhookVerificationError("ZOOM_WEBHOOK_SECRET_TOKEN is not configured")
+        if not timestamp or not signature:
+            raise WebhookVerificationError("Missing Zoom signature headers")
+        try:
+            age = abs(time.time() - int(timestamp))
+        except ValueError:
+            raise WebhookVerificationError("Invalid Zoom request timestamp")
+        # Reject replays of old (validly signed) deliveries
+        if age > self.tolerance_seconds:
+            raise WebhookVerificationError("Zoom request timestamp outside tolerance")
+        expected = "v0=" + _hmac_hex(self.secret_token, f"v0:{timestamp}:{body.decode('utf-8')}")
+        if not hmac.compare_digest(expected, signature):
+            raise WebhookVerificationError("Invalid Zoom signature")
+
+    def validation_response(self, payload: Dict) -> Dict:
+        plain_token = payload["payload"]["plainToken"]
+        return {"plainToken": plain_token, "encryptedToken": _hmac_hex(self.secret_token, plain_token)}
+
+    @staticmethod
+    def meeting_event(payload: Dict) -> Optional[Dict]:
+        """The recording event's dedup key and occurrence id, or None for other events"""
+        event = payload.get("event")
+        if event not in ZOOM_RECORDING_EVENTS:
+            return None
+        meeting = (payload.get("payload") or {}).get("object") or {}
+        if "id" not in meeting:
+            return None
+        # The occurrence UUID, not the meeting number shared by every occurrence
+        # of a recurring meeting (the same id the Zoom sync lists)
+        meeting_id = meeting.get("uuid") or str(meeting["id"])
+        return {
+            "key": f"zoom:{event}:{meeting_id}",
+            "event": event,
+            "meeting_id": meeting_id,
+        }
+
+class GraphWebhook:
+    """
+    Microsoft Graph change notifications (onlineMeeting transcripts or
+    recordings, or callRecords): the validationToken handshake and
+    clientState verification
+    """
+
+    def __init__(self, client_state: Optional[str] = None):
+        self.client_state = client_state or os.getenv("TEAMS_WEBHOOK_CLIENT_STATE")
+
+    def notifications(self, payload: Dict) -> List[Dict]:
+        """Verified notifications with their dedup key and referenced resource ids"""
+        if not self.client_state:
+            raise WebhookVerificationError("TEAMS_WEBHOOK_CLIENT_STATE is not configured")
+        notifications = []
+        for notification in payload.get("value", []):
+            if not hmac.compare_digest(str(notification.get("clientState") or ""), self.client_state):
+                raise WebhookVerificationError("Invalid Graph clientState")
+            resource = notification.get("resource") or ""
+            online_meeting = _ONLINE_MEETING.search(resource)
+            call_record = _CALL_RECORD.search(resource)
+            notifications.append({
+                "key": f"teams:{notification.get('subscriptionId')}:{notification.get('changeType')}:{resource}",
+                "event": notification.get("changeType"),
+                "meeting_id": online_meeting.group(1) if online_meeting else None,
+                "call_record_id": call_record.group(1) if call_record and not online_meeting else None,
+            })
+        return notifications
+
+async def record_delivery(key: str, platform: str, event: str, meeting_id: Optional[str] = None,
+                          call_record_id: Optional[str] = None) -> bool:
+    """
+    Remember a webhook delivery before processing it; False if it was
+    already received (platforms redeliver on timeouts, so handlers must be
+    idempotent). A delivery whose processing fails stays recorded and is
+    retried by SyncEngine.retry_deliveries.
+    """
+    async with SessionLocal() as db:
+        db.add(WebhookEvent(key=key, platform=platform, event=event, meeting_id=meeting_id,
+                            call_record_id=call_record_id, status="received", attempts=1))
+        try:
+            await db.commit()
+            return True
+        except IntegrityError:
+            await db.rollback()
+            return False
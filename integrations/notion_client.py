@@ -1,54 +1,338 @@
-from notion_client import Client
-from typing import List, Dict
+from notion_client import AsyncClient
+from notion_client.errors import APIResponseError, RequestTimeoutError
+from typing import List, Dict, Optional, Tuple
+import asyncio
+import hashlib
+import json
 import os
 from dotenv import load_dotenv
 
+from core.resilience import CircuitOpenError, RetryableError, get_api_guard, parse_retry_after
+from ingestion.http import RETRYABLE_STATUSES
+from integrations.notion_store import NotionPageStore
+from transcripts.store import task_key
+
 load_dotenv()
 
+# Notion API limits: characters per rich text object, blocks per request
+TEXT_LIMIT = 2000
+CHILDREN_LIMIT = 100
+
+def split_text(text: str, limit: int = TEXT_LIMIT) -> List[str]:
+    """
+    Split text into pieces of at most `limit` characters, preferring to
+    break at line ends, then at spaces
+    """
+    text = text or ""
+    pieces = []
+    while len(text) > limit:
+        cut = text.rfind("\n", 0, limit + 1)
+        if cut <= 0:
+            cut = text.rfind(" ", 0, limit + 1)
+        if cut <= 0:
+            cut = limit
+        pieces.append(text[:cut])
+        text = text[cut:].lstrip("\n ")
+    if text or not pieces:
+        pieces.append(text)
+    return pieces
+
+def _content_hash(block: Dict) -> str:
+    # The checkbox is owned by Notion once the block exists, so it is not content
+    content = dict(block[block["type"]])
+    content.pop("checked", None)
+    return hashlib.sha256(json.dumps(content, sort_keys=True).encode("utf-8")).hexdigest()
+
+def _rich_text(text: str) -> List[Dict]:
+    return [{"type": "text", "text": {"content": piece}} for piece in split_text(text)]
+
 class NotionClient:
+    """
+    Async Notion writer.
+
+    Calls go through the shared Notion ApiGuard (3 req/s by default, with
+    retries on 429/5xx). Blocks are appended in batches of 100; appends to
+    the same page are queued and coalesced, so concurrent writers share
+    requests and a page's blocks land in order. Pages are upserted: the
+    NotionPageStore maps each meeting's page and blocks to Notion ids and
+    content hashes, so re-runs only write what changed.
+    """
+
     def __init__(self):
-        self.client = Client(auth=os.getenv("NOTION_TOKEN"))
+        self.client = AsyncClient(auth=os.getenv("NOTION_TOKEN"))
         self.database_id = os.getenv("NOTION_DATABASE_ID")
+        self.guard = get_api_guard("notion")
+        self.store = NotionPageStore()
+        self._pending: Dict[str, List[Tuple[List[Dict], asyncio.Future]]] = {}
+        self._flushers: Dict[str, asyncio.Task] = {}
+
+    async def _call(self, method, **kwargs):
+        """Run a notion_client call under the shared Notion rate limit"""
+        return await self.guard.call(self._call_once, method, kwargs, host="api.notion.com")
+
+    async def _call_once(self, method, kwargs):
+        try:
+            return await method(**kwargs)
+        except RequestTimeoutError as e:
+            raise RetryableError(f"Notion request timed out: {str(e)}")
+        except APIResponseError as e:
+            if e.status in RETRYABLE_STATUSES:
+                headers = getattr(e, "headers", None) or {}
+                raise RetryableError(
+                    f"Notion status {e.status}",
+                    retry_after=parse_retry_after(headers.get("retry-after")),
+                    throttled=e.status == 429
+                )
+            raise
 
     async def create_meeting_page(self, meeting_id: str, summary: str, tasks: List[Dict]) -> str:
         """
-        Create a Notion page for the meeting with summary and tasks
+        Create or update the Notion page for the meeting with summary and
+        tasks; returns the page id. The tasks must already be stored
+        (TranscriptStore.save): their ids and status are read back, not
+        written again.
+
+        Re-runs reuse the page recorded for the meeting and only write the
+        blocks whose content hash changed: new blocks are inserted in place,
+        changed ones updated (task checkboxes are left as the user set
+        them) and blocks no longer produced are deleted.
         """
+        tasks = [task.dict() if hasattr(task, "dict") else task for task in tasks]
         try:
-            page = self.client.pages.create(
-        parent={"database_id": self.database_id},
-        properties={
-            "Name": {"title": [{"text": {"content": meeting_id}}]}
-        },
-        children=[
-            {
-                "object": "block",
-                "type": "heading_2",
-                "heading_2": {
-                    "rich_text": [{"type": "text", "text": {"content": "Summary"}}]
-                }
-            },
-            {
-                "object": "block",
-                "type": "paragraph",
-                "paragraph": {
-                    "rich_text": [{"type": "text", "text": {"content": summary}}]
-                }
-            },
-            {
-                "object": "block",
-                "type": "heading_2",
-                "heading_2": {
-                    "rich_text": [{"type": "text", "text": {"content": "Tasks"}}]
-                }
-            },
-            *[self._create_task_block(task) for task in tasks]
-        ]
-    )
-            return page["id"]
+            mapping = await self.store.load(meeting_id)
+            page = mapping.pop("page", None)
+            known = set(mapping)
+            page_id = page["block_id"] if page else None
+            if page_id is not None:
+                # Checkboxes ticked since the last run become the tasks' status first
+                page_id = await self._pull_task_status(page_id, mapping)
+            saved_tasks = await self.store.load_tasks(meeting_id)
+            if page_id is None:
+                mapping, known = {}, set()
+                await self.store.forget(meeting_id)
+                page = await self._call(
+                    self.client.pages.create,
+                    parent={"database_id": self.database_id},
+                    properties={
+                        "Name": {"title": _rich_text(meeting_id)}
+                    }
+                )
+                page_id = page["id"]
+                await self.store.save_blocks(meeting_id, page_id, [{"key": "page", "block_id": page_id}], [])
+
+            desired = self._meeting_blocks(summary, tasks, saved_tasks)
+            written = await self._apply_diff(page_id, desired, mapping)
+            keys = {block["key"] for block in desired}
+            removed = [key for key in known if key not in keys]
+            await asyncio.gather(*(self._call(self.client.blocks.delete, block_id=mapping[key]["block_id"])
+                                   for key in removed if key in mapping))
+            await self.store.save_blocks(meeting_id, page_id, written, removed)
+            print(f"Notion page for {meeting_id}: {len(written)} blocks written, {len(removed)} removed")
+            return page_id
+        except (CircuitOpenError, RetryableError):
+            # Left as is so callers can tell a transient failure from a real one
+            raise
         except Exception as e:
             raise Exception(f"Failed to create Notion page: {str(e)}")
 
+    async def refresh_task_status(self, meeting_id: str) -> bool:
+        """
+        Copy the meeting's task checkbox state from Notion into Task.status;
+        False if the meeting has no (live) Notion page
+        """
+        mapping = await self.store.load(meeting_id)
+        page = mapping.pop("page", None)
+        if page is None:
+            return False
+        return await self._pull_task_status(page["block_id"], mapping) is not None
+
+    async def _pull_task_status(self, page_id: str, mapping: Dict[str, Dict]) -> Optional[str]:
+        """
+        Read the page's blocks (100 per request), sync task checkboxes into
+        the tasks table and drop mapping entries whose block was deleted in
+        Notion so they are written again. Returns None if the page is gone.
+        """
+        children = {}
+        cursor = None
+        try:
+            while True:
+                kwargs = {"block_id": page_id, "page_size": CHILDREN_LIMIT}
+                if cursor:
+                    kwargs["start_cursor"] = cursor
+                response = await self._call(self.client.blocks.children.list, **kwargs)
+                for block in response["results"]:
+                    if not block.get("archived") and not block.get("in_trash"):
+                        children[block["id"]] = block
+                if not response.get("has_more"):
+                    break
+                cursor = response["next_cursor"]
+        except APIResponseError as e:
+            if e.status == 404:
+                return None
+            raise
+
+        statuses = {}
+        for key, entry in list(mapping.items()):
+            block = children.get(entry["block_id"])
+            if block is None:
+                del mapping[key]
+            elif entry["task_id"] is not None and block.get("type") == "to_do":
+                statuses[entry["task_id"]] = "done" if block["to_do"].get("checked") else "open"
+        await self.store.set_task_status(statuses)
+        return page_id
+
+    async def _apply_diff(self, page_id: str, desired: List[Dict], mapping: Dict[str, Dict]) -> List[Dict]:
+        """
+        Write the desired blocks that are new or changed; returns them with
+        their block ids
+        """
+        for block in desired:
+            if block["key"] in mapping:
+                block["block_id"] = mapping[block["key"]]["block_id"]
+        changed = [block for block in desired
+                   if block.get("block_id") and mapping[block["key"]]["hash"] != block["hash"]]
+
+        # Runs of new blocks go right after the existing block preceding
+        # them; a run at the end of the page is a plain (coalesced) append
+        inserts = []
+        index = 0
+        while index < len(desired):
+            if desired[index].get("block_id"):
+                index += 1
+                continue
+            end = index
+            while end < len(desired) and not desired[end].get("block_id"):
+                end += 1
+            after = desired[index - 1]["block_id"] if index > 0 and end < len(desired) else None
+            inserts.append((desired[index:end], after))
+            index = end
+
+        async def _insert(run: List[Dict], after: Optional[str]):
+            ids = await self.append_blocks(page_id, [block["content"] for block in run], after=after)
+            for block, block_id in zip(run, ids):
+                block["block_id"] = block_id
+
+        await asyncio.gather(
+            *(self._update_block(block) for block in changed),
+            *(_insert(run, after) for run, after in inserts)
+        )
+        return changed + [block for run, _ in inserts for block in run]
+
+    async def _update_block(self, block: Dict):
+        block_type = block["content"]["type"]
+        # Leave to-do checkboxes as the user set them in Notion
+        content = {k: v for k, v in block["content"][block_type].items() if k != "checked"}
+        await self._call(self.client.blocks.update, block_id=block["block_id"], **{block_type: content})
+
+    def _meeting_blocks(self, summary: str, tasks: List[Dict], saved_tasks: Dict[str, Tuple[int, str]]) -> List[Dict]:
+        """The page's blocks in order, keyed and hashed for diffing"""
+        blocks = [("heading:summary", self._heading("Summary"), None)]
+        blocks += [(f"summary:{i}", self._paragraph(piece), None) for i, piece in enumerate(split_text(summary))]
+        blocks.append(("heading:tasks", self._heading("Tasks"), None))
+        for task in tasks:
+            key = task_key(task)
+            if f"task:{key}" in {block[0] for block in blocks}:
+                continue
+            task_id, status = saved_tasks[key]
+            content = self._create_task_block(task)
+            content["to_do"]["checked"] = status == "done"
+            blocks.append((f"task:{key}", content, task_id))
+        return [{"key": key, "content": content, "hash": _content_hash(content), "task_id": task_id}
+                for key, content, task_id in blocks]
+
+    async def append_blocks(self, block_id: str, blocks: List[Dict], after: Optional[str] = None) -> List[str]:
+        """
+        Append blocks to a page (or block) and return their ids once they
+        are written. Writes queued for the same page meanwhile are sent
+        together; inserts after a given block are sent directly.
+        """
+        if not blocks:
+            return []
+        if after is not None:
+            ids = []
+            for start in range(0, len(blocks), CHILDREN_LIMIT):
+                response = await self._call(
+                    self.client.blocks.children.append,
+                    block_id=block_id,
+                    children=blocks[start:start + CHILDREN_LIMIT],
+                    after=after
+                )
+                ids += [block["id"] for block in response["results"]]
+                after = ids[-1]
+            return ids
+        future = asyncio.get_running_loop().create_future()
+        self._pending.setdefault(block_id, []).append((list(blocks), future))
+        if block_id not in self._flushers:
+            self._flushers[block_id] = asyncio.create_task(self._flush(block_id))
+        return await future
+
+    async def _flush(self, block_id: str):
+        writes = []
+        try:
+            while self._pending.get(block_id):
+                writes = self._pending.pop(block_id)
+                blocks = [block for write_blocks, _ in writes for block in write_blocks]
+                ids = []
+                try:
+                    for start in range(0, len(blocks), CHILDREN_LIMIT):
+                        response = await self._call(
+                            self.client.blocks.children.append,
+                            block_id=block_id,
+                            children=blocks[start:start + CHILDREN_LIMIT]
+                        )
+                        ids += [block["id"] for block in response["results"]]
+                except Exception as e:
+                    self._settle(writes, error=e)
+                else:
+                    self._settle(writes, ids=ids)
+                writes = []
+        except asyncio.CancelledError as e:
+            self._settle(writes + self._pending.pop(block_id, []), error=e)
+            raise
+        finally:
+            self._flushers.pop(block_id, None)
+
+    @staticmethod
+    def _settle(writes, ids: Optional[List[str]] = None, error: Optional[BaseException] = None):
+        """Resolve each queued write with the ids of its own blocks (or the error)"""
+        offset = 0
+        for write_blocks, future in writes:
+            count = len(write_blocks)
+            if not future.done():
+                if error is None:
+                    future.set_result(ids[offset:offset + count])
+                elif isinstance(error, asyncio.CancelledError):
+                    future.cancel()
+                else:
+                    future.set_exception(error)
+            offset += count
+
+    async def aclose(self):
+        """Finish queued writes, then close the HTTP client"""
+        if self._flushers:
+            await asyncio.gather(*self._flushers.values(), return_exceptions=True)
+        await self.client.aclose()
+
+    @staticmethod
+    def _heading(text: str) -> Dict:
+        return {
+            "object": "block",
+            "type": "heading_2",
+            "heading_2": {
+                "rich_text": _rich_text(text)
+            }
+        }
+
+    @staticmethod
+    def _paragraph(text: str) -> Dict:
+        return {
+            "object": "block",
+            "type": "paragraph",
+            "paragraph": {
+                "rich_text": _rich_text(text)
+            }
+        }
+
     def _create_task_block(self, task) -> Dict:
         """
         Create a task block for Notion
@@ -60,7 +344,7 @@ class NotionClient:
             "object": "block",
             "type": "to_do",
             "to_do": {
-                "rich_text": [{"type": "text", "text": {"content": f"{task_dict['title']} - Assigned to: {task_dict['assignee']} (Due: {task_dict['due_date']})"}}],
+                "rich_text": _rich_text(f"{task_dict['title']} - Assigned to: {task_dict['assignee']} (Due: {task_dict['due_date']})"),
                 "checked": False
             }
-        }
\ No newline at end of file
+        }
@@ -0,0 +1,63 @@
+from typing import Dict, List, Tuple
+from sqlalchemy import delete, select, update
+
+from db.database import SessionLocal, NotionBlock, Task
+
+class NotionPageStore:
+    """
+    Persists the mapping from a meeting's Notion page and blocks to their
+    Notion ids and content hashes, so re-runs only touch the blocks that
+    changed, and the task status synced back from Notion
+    """
+
+    async def load_tasks(self, meeting_id: str) -> Dict[str, Tuple[int, str]]:
+        """The meeting's stored tasks as key -> (task id, status)"""
+        async with SessionLocal() as db:
+            return {
+                row.key: (row.id, row.status)
+                for row in (await db.execute(
+                    select(Task.key, Task.id, Task.status).where(Task.meeting_id == meeting_id)
+                )).all()
+            }
+
+    async def load(self, meeting_id: str) -> Dict[str, Dict]:
+        """Mapping of the meeting's block keys to {"block_id", "hash", "task_id"}"""
+        async with SessionLocal() as db:
+            return {
+                block.key: {"block_id": block.block_id, "hash": block.content_hash, "task_id": block.task_id}
+                for block in (await db.execute(select(NotionBlock).where(NotionBlock.meeting_id == meeting_id))).scalars()
+            }
+
+    async def save_blocks(self, meeting_id: str, page_id: str, blocks: List[Dict], removed: List[str]):
+        """Record written blocks ({"key", "block_id", "hash", "task_id"}) and forget removed keys"""
+        async with SessionLocal() as db:
+            existing = {
+                block.key: block
+                for block in (await db.execute(select(NotionBlock).where(NotionBlock.meeting_id == meeting_id))).scalars()
+            }
+            for block in blocks:
+                row = existing.get(block["key"])
+                if row is None:
+                    row = NotionBlock(meeting_id=meeting_id, key=block["key"])
+                    db.add(row)
+                row.page_id = page_id
+                row.block_id = block["block_id"]
+                row.content_hash = block.get("hash")
+                row.task_id = block.get("task_id")
+            if removed:
+                await db.execute(delete(NotionBlock).where(NotionBlock.meeting_id == meeting_id, NotionBlock.key.in_(removed)))
+            await db.commit()
+
+    async def forget(self, meeting_id: str):
+        """Drop the meeting's mapping (its page was deleted in Notion)"""
+        async with SessionLocal() as db:
+            await db.execute(delete(NotionBlock).where(NotionBlock.meeting_id == meeting_id))
+            await db.commit()
+
+    async def set_task_status(self, statuses: Dict[int, str]):
+        if not statuses:
+            return
+        async with SessionLocal() as db:
+            for task_id, status in statuses.items():
+                await db.execute(update(Task).where(Task.id == task_id, Task.status != status).values(status=status))
+            await db.commit()
@@ -0,0 +1,388 @@
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from fastapi import Request
+from pydantic import BaseModel
+from sqlalchemy import select, update, func, or_
+import asyncio
+import os
+import socket
+import time
+import uuid
+
+from asr.engine import TranscriptionQueueFull
+from core.ratelimit import platform_rate_limiters
+from core.resilience import CircuitOpenError
+from db.database import SessionLocal, Batch, BatchItem, Meeting
+from pipeline.meeting_pipeline import MeetingContentError, MeetingInput, MeetingPipeline, StageLimits
+
+ACTIVE_BATCH_STATUSES = ("queued", "listing", "running")
+
+class MeetingRef(BaseModel):
+    meeting_id: str
+    platform: str = "zoom"
+
+class DateRange(BaseModel):
+    platform: str
+    start: datetime
+    end: datetime
+
+class BatchRequest(BaseModel):
+    meetings: List[MeetingRef] = []
+    ranges: List[DateRange] = []
+    skip_existing: bool = True  # skip meetings that already have a summary
+
+class BatchRunner:
+    """
+    Backfills many meetings through the pipeline.
+
+    Every meeting of a batch is a row in batch_items whose status is
+    written as soon as it finishes, so an interrupted batch (Ctrl-C,
+    restart, crash) resumes with only the meetings that are not done yet.
+    Date ranges are expanded into meetings through the connectors' list
+    endpoints when the batch first runs. Meetings run `concurrency` at a
+    time, through the shared per-stage limits, and each platform has its
+    own rate limit on how many meetings are started per second.
+    """
+
+    def __init__(self, components, limits: Optional[StageLimits] = None, concurrency: Optional[int] = None,
+                 max_attempts: Optional[int] = None, lease_seconds: Optional[int] = None):
+        self.components = components
+        self.limits = limits or StageLimits.from_env()
+        self.concurrency = concurrency or int(os.getenv("BATCH_CONCURRENCY", "8"))
+        self.max_attempts = max_attempts or int(os.getenv("BATCH_MAX_ATTEMPTS", "2"))
+        self.lease_seconds = lease_seconds or int(os.getenv("BATCH_LEASE_SECONDS", "300"))
+        self.rate_limiters = platform_rate_limiters("BATCH_RATE_LIMIT_", 1.0)
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.pipeline = MeetingPipeline(components, self.limits)
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._live: Dict[str, Dict] = {}
+
+    async def create(self, request: BatchRequest) -> str:
+        """Persist a new batch; returns its id"""
+        batch_id = uuid.uuid4().hex
+        params = {
+            "ranges": [
+                {"platform": r.platform, "start": r.start.isoformat(), "end": r.end.isoformat()}
+                for r in request.ranges
+            ],
+            "skip_existing": request.skip_existing,
+        }
+
+        async with SessionLocal() as db:
+            db.add(Batch(id=batch_id, status="queued", params=params))
+            seen = set()
+            for ref in request.meetings:
+                key = (ref.platform, ref.meeting_id)
+                if key in seen:
+                    continue
+                seen.add(key)
+                db.add(BatchItem(batch_id=batch_id, platform=ref.platform, meeting_id=ref.meeting_id,
+                                 status="pending", attempts=0))
+            await db.commit()
+        return batch_id
+
+    def start(self, batch_id: str) -> asyncio.Task:
+        """Run a batch in the background of this process"""
+        task = self._tasks.get(batch_id)
+        if task is None or task.done():
+            task = asyncio.create_task(self.run(batch_id))
+            self._tasks[batch_id] = task
+            task.add_done_callback(lambda _: self._tasks.pop(batch_id, None))
+        return task
+
+    async def resume_interrupted(self) -> List[str]:
+        """Start every unfinished batch no live process holds a lease on"""
+        async with SessionLocal() as db:
+            batch_ids = (await db.execute(
+                select(Batch.id).where(Batch.status.in_(ACTIVE_BATCH_STATUSES), self._claimable(datetime.utcnow()))
+            )).scalars().all()
+        for batch_id in batch_ids:
+            print(f"Resuming batch {batch_id}")
+            self.start(batch_id)
+        return batch_ids
+
+    async def stop(self):
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def run(self, batch_id: str) -> bool:
+        """
+        Process a batch to completion. Returns False if the batch does not
+        exist, is finished, or is being run by another process.
+        """
+        if not await self._claim(batch_id):
+            return False
+
+        self._live[batch_id] = {"started": time.monotonic(), "processed": 0, "stages": Counter()}
+        heartbeat = asyncio.create_task(self._heartbeat(batch_id))
+        try:
+            await self._expand_ranges(batch_id)
+            items = await self._pending_items(batch_id)
+            await self._set_status(batch_id, "running")
+            print(f"Batch {batch_id}: {len(items)} meetings to process")
+
+            queue: asyncio.Queue = asyncio.Queue()
+            for item in items:
+                queue.put_nowait(item)
+            workers = [
+                asyncio.create_task(self._worker(batch_id, queue))
+                for _ in range(min(self.concurrency, len(items)) or 1)
+            ]
+            try:
+                await queue.join()
+            finally:
+                for worker in workers:
+                    worker.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+
+            await self._set_status(batch_id, "completed", finished_at=datetime.utcnow(), lease_owner=None,
+                                   lease_expires_at=None)
+            print(f"Batch {batch_id} completed: {await self.progress(batch_id)}")
+            return True
+        except asyncio.CancelledError:
+            # Checkpointed items stay done; release the batch so it resumes right away
+            await self._release(batch_id)
+            raise
+        except Exception as e:
+            print(f"Batch {batch_id} failed: {str(e)}")
+            await self._set_status(batch_id, "failed", error=str(e), lease_owner=None, lease_expires_at=None)
+            return True
+        finally:
+            heartbeat.cancel()
+
+    async def progress(self, batch_id: str) -> Optional[Dict]:
+        """Item counts plus, while it runs in this process, throughput and ETA"""
+        async with SessionLocal() as db:
+            batch = await db.get(Batch, batch_id)
+            if batch is None:
+                return None
+            counts = dict((await db.execute(
+                select(BatchItem.status, func.count()).where(BatchItem.batch_id == batch_id).group_by(BatchItem.status)
+            )).all())
+        progress = {
+            "id": batch.id,
+            "status": batch.status,
+            "error": batch.error,
+            "created_at": batch.created_at.isoformat() if batch.created_at else None,
+            "finished_at": batch.finished_at.isoformat() if batch.finished_at else None,
+            "counts": counts,
+        }
+        counts = progress["counts"]
+        progress["total"] = sum(counts.values())
+        progress["done"] = sum(counts.get(status, 0) for status in ("succeeded", "failed", "skipped"))
+
+        live = self._live.get(batch_id)
+        if live is not None and progress["status"] in ACTIVE_BATCH_STATUSES:
+            elapsed = time.monotonic() - live["started"]
+            rate = live["processed"] / elapsed if elapsed > 0 else 0.0
+            remaining = counts.get("pending", 0) + counts.get("running", 0)
+            progress["elapsed_seconds"] = round(elapsed, 1)
+            progress["meetings_per_minute"] = round(rate * 60, 2)
+            progress["eta_seconds"] = round(remaining / rate) if rate else None
+            progress["in_flight"] = {stage: n for stage, n in live["stages"].items() if n}
+        return progress
+
+    # --- Processing --------------------------------------------------------
+
+    async def _worker(self, batch_id: str, queue: asyncio.Queue):
+        while True:
+            item = await queue.get()
+            try:
+                retry = await self._process(batch_id, item)
+                if retry:
+                    queue.put_nowait(item)
+            finally:
+                queue.task_done()
+
+    async def _process(self, batch_id: str, item: Dict) -> bool:
+        """Run one meeting; returns True when it should be retried"""
+        live = self._live[batch_id]
+        limiter = self.rate_limiters.get(item["platform"])
+        if limiter is not None:
+            await limiter.acquire()
+
+        item["attempts"] += 1
+        await self._update_item(item["id"], status="running", stage="fetch", attempts=item["attempts"],
+                                started_at=datetime.utcnow(), error=None)
+        current = {"stage": None}
+
+        async def on_stage(stage: str):
+            if current["stage"]:
+                live["stages"][current["stage"]] -= 1
+            live["stages"][stage] += 1
+            current["stage"] = stage
+            await self._update_item(item["id"], stage=stage)
+
+        try:
+            await self.pipeline.run(MeetingInput(meeting_id=item["meeting_id"], platform=item["platform"]),
+                                    on_stage=on_stage)
+            await self._finish_item(item, "succeeded")
+            return False
+        except asyncio.CancelledError:
+            await self._update_item(item["id"], status="pending", stage=None, attempts=item["attempts"] - 1)
+            raise
+        except TranscriptionQueueFull:
+            # Backpressure: wait for the ASR queue to drain without using up an attempt
+            item["attempts"] -= 1
+            await self._update_item(item["id"], status="pending", stage=None, attempts=item["attempts"])
+            await asyncio.sleep(30)
+            return True
+        except CircuitOpenError as e:
+            # The platform (or Gemini/Notion) is failing: wait out the breaker, no attempt used
+            item["attempts"] -= 1
+            await self._update_item(item["id"], status="pending", stage=None, attempts=item["attempts"])
+            await asyncio.sleep(e.retry_after)
+            return True
+        except MeetingContentError as e:
+            await self._finish_item(item, "failed", error=str(e))
+            return False
+        except Exception as e:
+            if item["attempts"] < self.max_attempts:
+                print(f"Batch meeting {item['platform']}/{item['meeting_id']} failed, retrying: {str(e)}")
+                await self._update_item(item["id"], status="pending", stage=None, error=str(e))
+                return True
+            await self._finish_item(item, "failed", error=str(e))
+            return False
+        finally:
+            if current["stage"]:
+                live["stages"][current["stage"]] -= 1
+
+    async def _finish_item(self, item: Dict, status: str, error: Optional[str] = None):
+        await self._update_item(item["id"], status=status, stage="done", error=error, finished_at=datetime.utcnow())
+        self._live[item["batch_id"]]["processed"] += 1
+        print(f"Batch meeting {item['platform']}/{item['meeting_id']}: {status}")
+
+    async def _expand_ranges(self, batch_id: str):
+        """Turn the batch's date ranges into items (once; checkpointed)"""
+        async with SessionLocal() as db:
+            batch = await db.get(Batch, batch_id)
+            params = dict(batch.params or {})
+        if not params.get("ranges") or params.get("expanded"):
+            return
+
+        await self._set_status(batch_id, "listing")
+        meeting_connector = await self.components.get("meeting_connector")
+        found = []
+        for date_range in params["ranges"]:
+            start = datetime.fromisoformat(date_range["start"])
+            end = datetime.fromisoformat(date_range["end"])
+            async for meeting in meeting_connector.list_meetings(date_range["platform"], start, end):
+                found.append((meeting["platform"], meeting["meeting_id"]))
+        print(f"Batch {batch_id}: found {len(found)} recorded meetings")
+
+        async with SessionLocal() as db:
+            existing = set((await db.execute(
+                select(BatchItem.platform, BatchItem.meeting_id).where(BatchItem.batch_id == batch_id)
+            )).all())
+            for key in found:
+                if key in existing:
+                    continue
+                existing.add(key)
+                db.add(BatchItem(batch_id=batch_id, platform=key[0], meeting_id=key[1], status="pending", attempts=0))
+            batch = await db.get(Batch, batch_id)
+            batch.params = {**params, "expanded": True}
+            await db.commit()
+
+    async def _pending_items(self, batch_id: str) -> List[Dict]:
+        async with SessionLocal() as db:
+            batch = await db.get(Batch, batch_id)
+            skip_existing = (batch.params or {}).get("skip_existing", True)
+            # Items left running by an interrupted run start over
+            await db.execute(
+                update(BatchItem)
+                .where(BatchItem.batch_id == batch_id, BatchItem.status == "running")
+                .values(status="pending", stage=None)
+            )
+            items = (await db.execute(
+                select(BatchItem)
+                .where(BatchItem.batch_id == batch_id, BatchItem.status == "pending",
+                       BatchItem.attempts < self.max_attempts)
+                .order_by(BatchItem.id)
+            )).scalars().all()
+
+            done = set()
+            if skip_existing and items:
+                done = set((await db.execute(
+                    select(Meeting.meeting_id).where(
+                        Meeting.meeting_id.in_([item.meeting_id for item in items]),
+                        Meeting.summary.isnot(None)
+                    )
+                )).scalars().all())
+
+            pending = []
+            for item in items:
+                if item.meeting_id in done:
+                    item.status = "skipped"
+                    item.finished_at = datetime.utcnow()
+                else:
+                    pending.append({
+                        "id": item.id,
+                        "batch_id": batch_id,
+                        "platform": item.platform,
+                        "meeting_id": item.meeting_id,
+                        "attempts": item.attempts or 0,
+                    })
+            # Items out of attempts from an earlier run are failed for good
+            await db.execute(
+                update(BatchItem)
+                .where(BatchItem.batch_id == batch_id, BatchItem.status == "pending",
+                       BatchItem.attempts >= self.max_attempts)
+                .values(status="failed", finished_at=datetime.utcnow())
+            )
+            await db.commit()
+            return pending
+
+    # --- Leases and bookkeeping --------------------------------------------
+
+    def _claimable(self, now: datetime):
+        return or_(Batch.lease_owner.is_(None), Batch.lease_expires_at < now, Batch.lease_owner == self.worker_id)
+
+    async def _claim(self, batch_id: str) -> bool:
+        now = datetime.utcnow()
+        async with SessionLocal() as db:
+            claimed = await db.execute(
+                update(Batch)
+                .where(Batch.id == batch_id, Batch.status.in_(ACTIVE_BATCH_STATUSES), self._claimable(now))
+                .values(lease_owner=self.worker_id, lease_expires_at=now + timedelta(seconds=self.lease_seconds),
+                        updated_at=now)
+            )
+            await db.commit()
+            return claimed.rowcount == 1
+
+    async def _heartbeat(self, batch_id: str):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            await self._set_status(batch_id, None,
+                                   lease_expires_at=datetime.utcnow() + timedelta(seconds=self.lease_seconds))
+
+    async def _release(self, batch_id: str):
+        try:
+            await self._set_status(batch_id, None, lease_owner=None, lease_expires_at=None)
+        except Exception as e:
+            print(f"Failed to release batch {batch_id}: {str(e)}")
+
+    async def _set_status(self, batch_id: str, status: Optional[str], **values):
+        if status is not None:
+            values["status"] = status
+
+        async with SessionLocal() as db:
+            await db.execute(
+                update(Batch)
+                .where(Batch.id == batch_id, Batch.lease_owner == self.worker_id)
+                .values(updated_at=datetime.utcnow(), **values)
+            )
+            await db.commit()
+
+    async def _update_item(self, item_id: int, **values):
+        async with SessionLocal() as db:
+            await db.execute(update(BatchItem).where(BatchItem.id == item_id).values(**values))
+            await db.commit()
+
+def get_batch_runner(request: Request) -> BatchRunner:
+    """
+    FastAPI dependency returning the batch runner created at startup
+    """
+    return request.app.state.batches
@@ -0,0 +1,262 @@
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, List, Optional
+from fastapi import Request
+from sqlalchemy import select, update, or_, and_
+import asyncio
+import os
+import socket
+import time
+import uuid
+
+from asr.engine import TranscriptionQueueFull
+from core.resilience import CircuitOpenError
+from db.database import SessionLocal, Job
+from pipeline.meeting_pipeline import MeetingInput, MeetingPipeline, StageLimits
+
+TERMINAL_STATUSES = ("succeeded", "failed")
+
+def _job_to_dict(job: Job) -> Dict:
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "stage": job.stage,
+        "result": job.result,
+        "error": job.error,
+        "attempts": job.attempts,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "updated_at": job.updated_at.isoformat() if job.updated_at else None,
+    }
+
+class JobQueue:
+    """
+    Database-backed queue of meeting processing jobs drained by a bounded
+    pool of worker tasks.
+
+    Jobs are claimed with a lease; a job whose worker died (e.g. the process
+    restarted) becomes claimable again once its lease expires, so queued and
+    in-flight work survives restarts.
+    """
+
+    def __init__(self, components, workers: Optional[int] = None, limits: Optional[StageLimits] = None,
+                 lease_seconds: Optional[int] = None, max_attempts: Optional[int] = None,
+                 poll_interval: Optional[float] = None):
+        self.components = components
+        self.workers = workers if workers is not None else int(os.getenv("JOB_WORKERS", "4"))
+        self.limits = limits or StageLimits.from_env()
+        self.lease_seconds = lease_seconds or int(os.getenv("JOB_LEASE_SECONDS", "300"))
+        self.max_attempts = max_attempts or int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+        self.poll_interval = poll_interval or float(os.getenv("JOB_POLL_INTERVAL", "5"))
+        self.defer_seconds = float(os.getenv("JOB_DEFER_SECONDS", "30"))
+        self.max_defer_seconds = float(os.getenv("JOB_MAX_DEFER_SECONDS", "600"))
+        self.max_deferrals = int(os.getenv("JOB_MAX_DEFERRALS", "20"))
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.pipeline = MeetingPipeline(components, self.limits)
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        self._swept_at = 0.0
+
+    async def start(self):
+        if self._tasks:
+            return
+        print(f"Starting {self.workers} job workers ({self.worker_id})")
+        self._tasks = [asyncio.create_task(self._worker_loop(n)) for n in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, payload: Dict, kind: str = "meeting") -> str:
+        """
+        Persist a new job and wake an idle worker; returns the job id
+        """
+        async with SessionLocal() as db:
+            job_id = self.add(db, payload, kind=kind)
+            await db.commit()
+        self.notify()
+        return job_id
+
+    @staticmethod
+    def add(db, payload: Dict, kind: str = "meeting") -> str:
+        """
+        Add a new job to the caller's session, so it commits atomically with
+        the caller's own rows; call notify() after the commit
+        """
+        job_id = uuid.uuid4().hex
+        db.add(Job(id=job_id, kind=kind, payload=payload, status="queued", stage="queued", attempts=0, deferrals=0))
+        return job_id
+
+    def notify(self):
+        """Wake an idle worker"""
+        self._wakeup.set()
+
+    async def get(self, job_id: str) -> Optional[Dict]:
+        async with SessionLocal() as db:
+            job = await db.get(Job, job_id)
+            return _job_to_dict(job) if job else None
+
+    async def events(self, job_id: str) -> AsyncIterator[Dict]:
+        """
+        Yield the job state each time its stage or status changes, until it
+        reaches a terminal status. Polls the database, so it also follows
+        jobs being processed by other workers.
+        """
+        last = None
+        interval = float(os.getenv("JOB_EVENTS_POLL_INTERVAL", "1"))
+        while True:
+            job = await self.get(job_id)
+            if job is None:
+                return
+            marker = (job["status"], job["stage"])
+            if marker != last:
+                last = marker
+                yield job
+            if job["status"] in TERMINAL_STATUSES:
+                return
+            await asyncio.sleep(interval)
+
+    async def _worker_loop(self, n: int):
+        while True:
+            try:
+                job = await self._claim()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Job worker {n} failed to claim a job: {str(e)}")
+                job = None
+
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self._run(job)
+
+    async def _fail_abandoned(self, now: datetime):
+        """
+        Fail jobs whose worker died during their last attempt; they can no
+        longer be claimed, so they would otherwise stay "running" forever
+        """
+        async with SessionLocal() as db:
+            abandoned = await db.execute(
+                update(Job)
+                .where(Job.status == "running", Job.lease_expires_at < now, Job.attempts >= self.max_attempts)
+                .values(status="failed", error=f"Lease expired after {self.max_attempts} attempts",
+                        lease_expires_at=None, updated_at=now)
+            )
+            await db.commit()
+        if abandoned.rowcount:
+            print(f"Failed {abandoned.rowcount} jobs abandoned on their last attempt")
+
+    async def _claim(self) -> Optional[Dict]:
+        now = datetime.utcnow()
+        # Once per poll interval per process is enough: leases expire slowly
+        if time.monotonic() - self._swept_at >= self.poll_interval:
+            self._swept_at = time.monotonic()
+            await self._fail_abandoned(now)
+        claimable = and_(
+            Job.attempts < self.max_attempts,
+            or_(
+                and_(Job.status == "queued", or_(Job.not_before.is_(None), Job.not_before <= now)),
+                and_(Job.status == "running", Job.lease_expires_at < now)
+            )
+        )
+        async with SessionLocal() as db:
+            candidates = (await db.execute(
+                select(Job.id).where(claimable).order_by(Job.created_at).limit(5)
+            )).scalars().all()
+            for job_id in candidates:
+                # Conditional update so only one worker (in any process) wins the job
+                claimed = await db.execute(
+                    update(Job)
+                    .where(Job.id == job_id, claimable)
+                    .values(
+                        status="running",
+                        lease_owner=self.worker_id,
+                        lease_expires_at=now + timedelta(seconds=self.lease_seconds),
+                        attempts=Job.attempts + 1,
+                        updated_at=now
+                    )
+                )
+                await db.commit()
+                if claimed.rowcount == 1:
+                    job = await db.get(Job, job_id)
+                    return {"id": job.id, "kind": job.kind, "payload": job.payload, "deferrals": job.deferrals or 0}
+            return None
+
+    async def _update(self, job_id: str, **values):
+        async with SessionLocal() as db:
+            await db.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.lease_owner == self.worker_id)
+                .values(updated_at=datetime.utcnow(), **values)
+            )
+            await db.commit()
+
+    async def _heartbeat(self, job_id: str):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                await self._update(job_id, lease_expires_at=datetime.utcnow() + timedelta(seconds=self.lease_seconds))
+            except Exception as e:
+                # e.g. SQLite busy: the next beat renews the lease before it runs out
+                print(f"Heartbeat for job {job_id} failed: {str(e)}")
+
+    async def _run(self, job: Dict):
+        job_id = job["id"]
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+
+        async def on_stage(stage: str):
+            print(f"Job {job_id}: {stage}")
+            await self._update(job_id, stage=stage)
+
+        try:
+            meeting_input = MeetingInput(**job["payload"])
+            result = await self.pipeline.run(meeting_input, on_stage=on_stage)
+            result["tasks"] = [task.dict() if hasattr(task, "dict") else task for task in result["tasks"]]
+            await self._update(job_id, status="succeeded", stage="done", result=result, error=None, lease_expires_at=None)
+        except asyncio.CancelledError:
+            # Shutting down: hand the job back so the next worker picks it up
+            # right away (if this write fails the lease simply expires)
+            try:
+                await self._update(job_id, status="queued", stage="queued", lease_owner=None,
+                                   lease_expires_at=None, attempts=Job.attempts - 1)
+            except Exception as e:
+                print(f"Failed to release job {job_id}: {str(e)}")
+            raise
+        except TranscriptionQueueFull as e:
+            # Backpressure, not a failure: put the job back without using up an
+            # attempt, backing off further each time, up to JOB_MAX_DEFERRALS
+            deferrals = job["deferrals"] + 1
+            if deferrals > self.max_deferrals:
+                print(f"Job {job_id} failed after {deferrals - 1} deferrals: {str(e)}")
+                await self._update(job_id, status="failed", error=f"Deferred {deferrals - 1} times: {str(e)}",
+                                   lease_expires_at=None)
+                return
+            delay = min(self.defer_seconds * 2 ** (deferrals - 1), self.max_defer_seconds)
+            print(f"Job {job_id} deferred for {delay:.0f}s: {str(e)}")
+            await self._update(job_id, status="queued", stage="queued", lease_owner=None,
+                               lease_expires_at=None, attempts=Job.attempts - 1, deferrals=deferrals,
+                               not_before=datetime.utcnow() + timedelta(seconds=delay))
+        except CircuitOpenError as e:
+            # A dependency is down: hand the job back untouched, claimable once the breaker may close
+            print(f"Job {job_id} deferred for {e.retry_after:.0f}s: {str(e)}")
+            await self._update(job_id, status="queued", stage="queued", lease_owner=None,
+                               lease_expires_at=None, attempts=Job.attempts - 1,
+                               not_before=datetime.utcnow() + timedelta(seconds=e.retry_after))
+        except Exception as e:
+            print(f"Job {job_id} failed: {str(e)}")
+            await self._update(job_id, status="failed", error=str(e), lease_expires_at=None)
+        finally:
+            heartbeat.cancel()
+
+def get_job_queue(request: Request) -> JobQueue:
+    """
+    FastAPI dependency returning the job queue created at startup
+    """
+    return request.app.state.jobs
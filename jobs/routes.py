@@ -0,0 +1,65 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+import json
+
+from jobs.batch import BatchRequest, BatchRunner, get_batch_runner
+from jobs.queue import JobQueue, get_job_queue
+from pipeline.meeting_pipeline import MeetingInput
+
+router = APIRouter()
+
+@router.post("/jobs", status_code=202)
+async def submit_job(meeting_input: MeetingInput, jobs: JobQueue = Depends(get_job_queue)):
+    """Queue a meeting for processing and return immediately"""
+    job_id = await jobs.submit(meeting_input.dict())
+    return {
+        "job_id": job_id,
+        "status": "queued",
+        "status_url": f"/jobs/{job_id}",
+        "events_url": f"/jobs/{job_id}/events"
+    }
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str, jobs: JobQueue = Depends(get_job_queue)):
+    """Current status, stage and (once finished) result of a job"""
+    job = await jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.get("/jobs/{job_id}/events")
+async def job_events(job_id: str, jobs: JobQueue = Depends(get_job_queue)):
+    """Server-sent events stream of the job's stage transitions"""
+    if await jobs.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def stream():
+        async for job in jobs.events(job_id):
+            yield f"event: {job['status']}\ndata: {json.dumps(job)}\n\n"
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/meetings/batch", status_code=202)
+async def submit_batch(batch_request: BatchRequest, batches: BatchRunner = Depends(get_batch_runner)):
+    """Backfill many meetings (explicit ids and/or date ranges per platform) in the background"""
+    if not batch_request.meetings and not batch_request.ranges:
+        raise HTTPException(status_code=400, detail="Provide meetings or date ranges")
+    batch_id = await batches.create(batch_request)
+    batches.start(batch_id)
+    return {
+        "batch_id": batch_id,
+        "status": "queued",
+        "status_url": f"/meetings/batch/{batch_id}"
+    }
+
+@router.get("/meetings/batch/{batch_id}")
+async def get_batch(batch_id: str, batches: BatchRunner = Depends(get_batch_runner)):
+    """Progress of a batch: item counts, throughput and ETA"""
+    progress = await batches.progress(batch_id)
+    if progress is None:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return progress
@@ -1,101 +1,115 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Depends
+from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel
-from typing import Optional
+import asyncio
 import uvicorn
 from ui.routes import router as ui_router
+from jobs.routes import router as jobs_router
+from asr.routes import router as asr_router
+from ingestion.routes import router as ingestion_router
+from search.routes import router as search_router
+from scheduler.routes import router as scheduler_router
 
-from ingestion.meeting_connector import MeetingConnector
-from asr.transcription import Transcriber
-from nlu.agents import SummarizerAgent, TaskAgent, IntegratorAgent
-from integrations.notion_client import NotionClient
-from scheduler.meeting_scheduler import MeetingScheduler
-from db.database import init_db
+from core.components import ComponentRegistry, get_components, prewarm_components_from_env
+from asr.engine import TranscriptionQueueFull
+from core.resilience import CircuitOpenError, RetryableError, api_guard_stats
+from jobs.batch import BatchRunner
+from jobs.queue import JobQueue
+from ingestion.sync import SyncEngine
+from pipeline.meeting_pipeline import MeetingInput, MeetingPipeline, MeetingContentError, StageLimits
+from db.database import init_db, close_db
+from search.index import ensure_search_index
+from search.semantic import ensure_semantic_index, semantic_index_enabled
+from nlu.cache import get_llm_cache
 
 app = FastAPI(title="Hybrid Meeting Agent")
 
 # Mount UI routes
 app.include_router(ui_router)
+app.include_router(jobs_router)
+app.include_router(asr_router)
+app.include_router(ingestion_router)
+app.include_router(search_router)
+app.include_router(scheduler_router)
 app.mount("/static", StaticFiles(directory="ui/static"), name="static")
 
-class MeetingInput(BaseModel):
-    meeting_id: str
-    platform: str = "zoom"  # Default to zoom
-    audio_url: Optional[str] = None
-    transcript: Optional[str] = None
-
 @app.on_event("startup")
 async def startup_event():
     await init_db()
+    # One-off backfill of the search index for meetings stored before it existed
+    app.state.search_backfill = asyncio.create_task(ensure_search_index())
+    app.state.components = ComponentRegistry()
+    prewarm = prewarm_components_from_env()
+    if prewarm:
+        print(f"Pre-warming components: {', '.join(prewarm)}")
+        await app.state.components.warm_up(prewarm)
+    app.state.semantic_backfill = None
+    if semantic_index_enabled():
+        app.state.semantic_backfill = asyncio.create_task(ensure_semantic_index(app.state.components))
+
+    # Stage limits are shared by synchronous requests and background jobs
+    app.state.stage_limits = StageLimits.from_env()
+    app.state.jobs = JobQueue(app.state.components, limits=app.state.stage_limits)
+    await app.state.jobs.start()
+
+    # Backfills interrupted by a restart pick up where they stopped
+    app.state.batches = BatchRunner(app.state.components, limits=app.state.stage_limits)
+    await app.state.batches.resume_interrupted()
+
+    # Incremental discovery of new recordings (SYNC_PLATFORMS)
+    app.state.sync = SyncEngine(app.state.components, app.state.jobs)
+    await app.state.sync.start()
+
+    # Persisted post-processing and reminder schedule, shared by all instances
+    app.state.scheduler = await app.state.components.get("scheduler")
+    await app.state.scheduler.start(app.state.jobs)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    app.state.search_backfill.cancel()
+    if app.state.semantic_backfill is not None:
+        app.state.semantic_backfill.cancel()
+    await app.state.scheduler.stop()
+    await app.state.sync.stop()
+    await app.state.batches.stop()
+    await app.state.jobs.stop()
+    await app.state.components.shutdown()
+    await close_db()
 
 @app.post("/meeting/summary")
-async def process_meeting(meeting_input: MeetingInput):
+async def process_meeting(meeting_input: MeetingInput, components: ComponentRegistry = Depends(get_components)):
     try:
-        print(f"\nProcessing meeting {meeting_input.meeting_id} from {meeting_input.platform}")
-        
-        # Initialize components
-        meeting_connector = MeetingConnector()
-        transcriber = Transcriber()
-        summarizer = SummarizerAgent()
-        task_agent = TaskAgent()
-        integrator = IntegratorAgent()
-        notion = NotionClient()
-        
-        # Get meeting content from platform
-        try:
-            print("Attempting to get transcript...")
-            # First try to get direct transcript
-            transcript = await meeting_connector.get_transcript(meeting_input.meeting_id, meeting_input.platform)
-            if transcript:
-                print("Got transcript directly from platform")
-            
-            # If no transcript, try getting recording and transcribe it
-            if not transcript:
-                print("No direct transcript, trying to get recording...")
-                recording_url = await meeting_connector.get_recording(meeting_input.meeting_id, meeting_input.platform)
-                if recording_url:
-                    print(f"Got recording URL: {recording_url}")
-                    transcript = await transcriber.transcribe(recording_url)
-                    print("Successfully transcribed recording")
-                else:
-                    print("No recording found")
-                
-            # If still no transcript, fall back to provided input
-            if not transcript:
-                print("No platform content, checking provided input...")
-                if meeting_input.audio_url:
-                    print(f"Using provided audio URL: {meeting_input.audio_url}")
-                    transcript = await transcriber.transcribe(meeting_input.audio_url)
-                elif meeting_input.transcript:
-                    print("Using provided transcript")
-                    transcript = meeting_input.transcript
-                else:
-                    print("No content available")
-                    raise HTTPException(status_code=400, detail="Could not retrieve meeting content and no transcript provided")
-        
-        except Exception as e:
-            if meeting_input.audio_url:
-                transcript = await transcriber.transcribe(meeting_input.audio_url)
-            elif meeting_input.transcript:
-                transcript = meeting_input.transcript
-            else:
-                raise HTTPException(status_code=400, detail=f"Failed to retrieve meeting content: {str(e)}")
-        
-        # Process meeting content
-        summary = await summarizer.generate_summary(transcript)
-        tasks = await task_agent.extract_tasks(transcript)
-        
-        # Integrate with Notion
-        await integrator.dispatch_tasks(tasks)
-        await notion.create_meeting_page(meeting_input.meeting_id, summary, tasks)
-        
-        return {
-            "meeting_id": meeting_input.meeting_id,
-            "summary": summary,
-            "tasks": tasks
-        }
+        pipeline = MeetingPipeline(components, app.state.stage_limits)
+        return await pipeline.run(meeting_input)
+    except MeetingContentError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except TranscriptionQueueFull as e:
+        return JSONResponse(status_code=503, content={"detail": str(e)}, headers={"Retry-After": "60"})
+    except CircuitOpenError as e:
+        return JSONResponse(status_code=503, content={"detail": str(e)}, headers={"Retry-After": str(int(e.retry_after))})
+    except RetryableError as e:
+        # Retries exhausted against a throttled or failing dependency
+        return JSONResponse(status_code=503, content={"detail": str(e)}, headers={"Retry-After": str(int(e.retry_after or 30))})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/meetings/{meeting_id}/tasks/refresh")
+async def refresh_task_status(meeting_id: str, components: ComponentRegistry = Depends(get_components)):
+    """Pull task checkbox state from the meeting's Notion page into the tasks table"""
+    notion = await components.get("notion")
+    if not await notion.refresh_task_status(meeting_id):
+        raise HTTPException(status_code=404, detail="Meeting has no Notion page")
+    return {"meeting_id": meeting_id, "refreshed": True}
+
+@app.get("/stats/outbound")
+async def outbound_stats():
+    """Per-API call, retry and throttling counters, current rate and circuit states"""
+    return api_guard_stats()
+
+@app.get("/stats/llm-cache")
+async def llm_cache_stats():
+    cache = get_llm_cache()
+    return cache.stats() if cache else {"enabled": False}
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
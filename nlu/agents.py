@@ -1,46 +1,66 @@
 import google.generativeai as genai
-from typing import List, Dict
+from google.api_core import exceptions as google_exceptions
+from typing import Any, Awaitable, Callable, List, Dict, Tuple
 from pydantic import BaseModel, Field
 import os
+import re
 import asyncio
+import json
 from dotenv import load_dotenv
 
+from core.resilience import RetryableError, get_api_guard
+from nlu.cache import get_llm_cache
+from nlu.chunking import chunk_transcript, estimate_tokens
+
 # Load environment variables
 load_dotenv()
 
 # Configure Gemini
 genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
 
+MODEL_NAME = os.getenv("GEMINI_MODEL", "gemini-pro-latest")
+GEMINI_HOST = "generativelanguage.googleapis.com"
+
+# Gemini errors that are worth retrying
+_THROTTLED_ERRORS = (google_exceptions.ResourceExhausted, google_exceptions.TooManyRequests)
+_TRANSIENT_ERRORS = (
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.InternalServerError,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.BadGateway,
+)
+
+class TaskParseError(Exception):
+    """Raised when Gemini's task list cannot be parsed"""
+
 class Task(BaseModel):
     title: str = Field(description="The title of the task")
     assignee: str = Field(description="The person assigned to the task")
     due_date: str = Field(description="The due date for the task")
     description: str = Field(description="Detailed description of the task")
 
-class SummarizerAgent:
-    def __init__(self):
-        self.model = genai.GenerativeModel('gemini-pro-latest')
-
-    async def generate_summary(self, transcript: str) -> str:
-        prompt = """You are a professional meeting summarizer. Create a concise summary with key points from the following transcript:
+SUMMARY_PROMPT = """You are a professional meeting summarizer. Create a concise summary with key points from the following transcript:
 
         Transcript:
         {transcript}
-        
+
         Please provide a clear and structured summary."""
-        
-        response = await asyncio.to_thread(
-            self.model.generate_content,
-            prompt.format(transcript=transcript)
-        )
-        return response.text
 
-class TaskAgent:
-    def __init__(self):
-        self.model = genai.GenerativeModel('gemini-pro-latest')
+CHUNK_SUMMARY_PROMPT = """You are a professional meeting summarizer. The following is part {part} of {total} of a long meeting transcript. Summarize the key points, decisions and open questions discussed in this part:
 
-    async def extract_tasks(self, transcript: str) -> List[Task]:
-        prompt = """Extract actionable tasks from the meeting transcript and format them as a JSON array.
+        Transcript part:
+        {transcript}
+
+        Please provide a concise bullet-point summary of this part only."""
+
+REDUCE_SUMMARY_PROMPT = """You are a professional meeting summarizer. The following are summaries of consecutive parts of one long meeting, in order. Merge them into a single concise summary with key points, removing repetition:
+
+        Partial summaries:
+        {summaries}
+
+        Please provide a clear and structured summary of the whole meeting."""
+
+TASKS_PROMPT = """Extract actionable tasks from the meeting transcript and format them as a JSON array.
 
         Here is the transcript:
         {transcript}
@@ -63,33 +83,260 @@ class TaskAgent:
 
         Return only the JSON array, no additional text or markdown formatting."""
 
-        response = await asyncio.to_thread(
-            self.model.generate_content,
-            prompt.format(transcript=transcript)
+ANALYSIS_PROMPT = """You are a professional meeting assistant. From the meeting transcript below, produce a concise structured summary with key points and the list of actionable tasks.
+
+        Transcript:
+        {transcript}
+
+        Format your response as a JSON object with these fields:
+        - summary (string): A clear and structured summary of the meeting
+        - tasks (array): Actionable tasks, where each task has these fields:
+          - title (string): A clear task title
+          - assignee (string): The person assigned to the task
+          - due_date (string): The due date in YYYY-MM-DD format
+          - description (string): A detailed description of what needs to be done
+
+        Return only the JSON object, no additional text or markdown formatting."""
+
+QA_PROMPT = """You are a meeting assistant answering questions about past meetings. Answer the question using only the numbered meeting excerpts below, citing the excerpts you relied on as [1], [2], etc. If the excerpts do not contain the answer, say that you could not find it in the meetings.
+
+        Excerpts:
+        {context}
+
+        Question: {question}"""
+
+# Bump a template's version whenever its prompt or output format changes so
+# cached results produced by the old prompt are no longer used
+PROMPT_VERSIONS = {
+    "summary": "1",
+    "chunk_summary": "1",
+    "reduce_summary": "1",
+    "tasks": "1",
+    "analysis": "1",
+    "qa": "1",
+}
+
+def _parse_json_response(text: str):
+    """
+    Parse a JSON model response, tolerating markdown code fences
+    """
+    # Remove any leading/trailing non-JSON content
+    text = text.strip()
+    if text.startswith('```json'):
+        text = text[7:]
+    if text.startswith('```'):
+        text = text[3:]
+    if text.endswith('```'):
+        text = text[:-3]
+    return json.loads(text.strip())
+
+def _task_key(task: Task) -> Tuple[str, str]:
+    normalize = lambda value: re.sub(r"[^a-z0-9]+", " ", (value or "").lower()).strip()
+    return normalize(task.title), normalize(task.assignee)
+
+def deduplicate_tasks(tasks: List[Task]) -> List[Task]:
+    """
+    Merge tasks extracted from overlapping chunks: tasks with the same
+    normalized title and assignee are kept once, with the most detailed
+    description
+    """
+    merged: Dict[Tuple[str, str], Task] = {}
+    for task in tasks:
+        key = _task_key(task)
+        existing = merged.get(key)
+        if existing is None:
+            merged[key] = task
+        elif len(task.description or "") > len(existing.description or ""):
+            merged[key] = existing.copy(update={"description": task.description})
+    return list(merged.values())
+
+class GeminiAgent:
+    """
+    Shared plumbing for the Gemini-backed agents: model setup, bounded
+    concurrency for fan-out calls and the chunking configuration used for
+    map-reduce over long transcripts
+    """
+    def __init__(self):
+        self.model_name = MODEL_NAME
+        self.model = genai.GenerativeModel(self.model_name)
+        self.chunk_tokens = int(os.getenv("NLU_CHUNK_TOKENS", "6000"))
+        self.chunk_overlap_turns = int(os.getenv("NLU_CHUNK_OVERLAP_TURNS", "1"))
+        self._semaphore = asyncio.Semaphore(int(os.getenv("NLU_MAX_CONCURRENCY", "4")))
+        self.guard = get_api_guard("gemini")
+        self.cache = get_llm_cache()
+
+    async def _cached(self, template: str, content: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return the cached result of a prompt template applied to content, or
+        compute and store it. Results must be JSON-serializable; exceptions
+        raised by compute are not cached.
+        """
+        if self.cache is None:
+            return await compute()
+
+        key = self.cache.make_key(template, PROMPT_VERSIONS[template], self.model_name, content)
+        value = await self.cache.get(key)
+        if value is not None:
+            return value
+
+        value = await compute()
+        await self.cache.set(key, value, template=template, model=self.model_name)
+        return value
+
+    async def _generate(self, prompt: str) -> str:
+        async with self._semaphore:
+            response = await self.guard.call(self._generate_once, prompt, host=GEMINI_HOST)
+        return response.text
+
+    async def _generate_once(self, prompt: str):
+        try:
+            return await asyncio.to_thread(self.model.generate_content, prompt)
+        except _THROTTLED_ERRORS as e:
+            raise RetryableError(f"Gemini throttled: {str(e)}", throttled=True)
+        except _TRANSIENT_ERRORS as e:
+            raise RetryableError(f"Gemini unavailable: {str(e)}")
+
+    def _chunks(self, transcript: str) -> List[str]:
+        if estimate_tokens(transcript) <= self.chunk_tokens:
+            return [transcript]
+        return chunk_transcript(transcript, self.chunk_tokens, self.chunk_overlap_turns)
+
+    async def _reduce_summaries(self, summaries: List[str]) -> str:
+        """
+        Merge partial summaries, in rounds if they do not fit one prompt
+        """
+        while len(summaries) > 1:
+            groups, current = [], []
+            for summary in summaries:
+                if current and estimate_tokens("\n\n".join(current + [summary])) > self.chunk_tokens:
+                    groups.append(current)
+                    current = []
+                current.append(summary)
+            groups.append(current)
+            if len(groups) == len(summaries):
+                # Every summary is as large as the budget; merge pairwise to make progress
+                groups = [summaries[i:i + 2] for i in range(0, len(summaries), 2)]
+
+            summaries = await asyncio.gather(*(self._reduce_group(group) for group in groups))
+        return summaries[0]
+
+    async def _reduce_group(self, summaries: List[str]) -> str:
+        content = "\n\n".join(f"Part {i + 1}:\n{summary}" for i, summary in enumerate(summaries))
+        return await self._cached(
+            "reduce_summary", content,
+            lambda: self._generate(REDUCE_SUMMARY_PROMPT.format(summaries=content))
         )
-        
+
+class SummarizerAgent(GeminiAgent):
+    async def generate_summary(self, transcript: str) -> str:
+        chunks = self._chunks(transcript)
+        if len(chunks) == 1:
+            return await self._cached(
+                "summary", transcript,
+                lambda: self._generate(SUMMARY_PROMPT.format(transcript=transcript))
+            )
+
+        print(f"Summarizing long transcript in {len(chunks)} chunks")
+        partials = await asyncio.gather(*(
+            self._summarize_chunk(chunk, i + 1, len(chunks))
+            for i, chunk in enumerate(chunks)
+        ))
+        return await self._reduce_summaries(list(partials))
+
+    async def _summarize_chunk(self, chunk: str, part: int, total: int) -> str:
+        return await self._cached(
+            "chunk_summary", f"{part}/{total}\n{chunk}",
+            lambda: self._generate(CHUNK_SUMMARY_PROMPT.format(part=part, total=total, transcript=chunk))
+        )
+
+class TaskAgent(GeminiAgent):
+    async def extract_tasks(self, transcript: str) -> List[Task]:
+        chunks = self._chunks(transcript)
+        if len(chunks) > 1:
+            print(f"Extracting tasks from long transcript in {len(chunks)} chunks")
+        results = await asyncio.gather(*(self._extract_chunk(chunk) for chunk in chunks))
+        return deduplicate_tasks([task for tasks in results for task in tasks])
+
+    async def _extract_chunk(self, transcript: str) -> List[Task]:
+        try:
+            # Cached entries hold already-validated task dicts
+            tasks_data = await self._cached("tasks", transcript, lambda: self._request_tasks(transcript))
+        except TaskParseError as e:
+            # Only an unusable answer degrades to no tasks; API errors (throttling,
+            # an open breaker) propagate so the meeting is retried instead of
+            # publishing an empty task list over the stored one
+            print(f"Error extracting tasks: {str(e)}")
+            return []
+        return [Task(**task) for task in tasks_data]
+
+    async def _request_tasks(self, transcript: str) -> List[Dict]:
+        text = await self._generate(TASKS_PROMPT.format(transcript=transcript))
+
         # Parse the response into Task objects
-        import json
         try:
-            # Remove any leading/trailing non-JSON content
-            text = response.text.strip()
-            if text.startswith('```json'):
-                text = text[7:]
-            if text.startswith('```'):
-                text = text[3:]
-            if text.endswith('```'):
-                text = text[:-3]
-            text = text.strip()
-            
-            tasks_data = json.loads(text)
+            tasks_data = _parse_json_response(text)
             if not isinstance(tasks_data, list):
                 tasks_data = [tasks_data]
-            
-            return [Task(**task) for task in tasks_data]
+
+            return [Task(**task).dict() for task in tasks_data]
         except Exception as e:
-            print(f"Error parsing tasks: {str(e)}")
-            print(f"Raw response: {response.text}")
-            return []
+            print(f"Raw response: {text}")
+            raise TaskParseError(f"Error parsing tasks: {str(e)}")
+
+class MeetingAnalystAgent(GeminiAgent):
+    """
+    Produces the summary and the task list in a single Gemini call, so the
+    transcript is only sent (and billed) once
+    """
+    async def analyze(self, transcript: str) -> Tuple[str, List[Task]]:
+        chunks = self._chunks(transcript)
+        results = await asyncio.gather(*(self._analyze_chunk(chunk) for chunk in chunks))
+
+        summaries = [summary for summary, _ in results]
+        tasks = deduplicate_tasks([task for _, chunk_tasks in results for task in chunk_tasks])
+        summary = summaries[0] if len(summaries) == 1 else await self._reduce_summaries(summaries)
+        return summary, tasks
+
+    async def _analyze_chunk(self, transcript: str) -> Tuple[str, List[Task]]:
+        data = await self._cached("analysis", transcript, lambda: self._request_analysis(transcript))
+        return data["summary"], [Task(**task) for task in data["tasks"]]
+
+    async def _request_analysis(self, transcript: str) -> Dict:
+        text = await self._generate(ANALYSIS_PROMPT.format(transcript=transcript))
+
+        try:
+            data = _parse_json_response(text)
+        except Exception as e:
+            raise Exception(f"Failed to parse meeting analysis: {str(e)}")
+
+        tasks = []
+        for task in data.get("tasks") or []:
+            try:
+                tasks.append(Task(**task).dict())
+            except Exception as e:
+                print(f"Skipping malformed task {task}: {str(e)}")
+        return {"summary": data.get("summary", ""), "tasks": tasks}
+
+def _at(start) -> str:
+    if start is None:
+        return ""
+    minutes, seconds = divmod(int(start), 60)
+    return f" at {minutes:02d}:{seconds:02d}"
+
+class QAAgent(GeminiAgent):
+    """
+    Answers questions across meetings from retrieved excerpts; only those
+    excerpts, never whole transcripts, are sent to Gemini
+    """
+    async def answer(self, question: str, passages: List[Dict]) -> str:
+        context = "\n\n".join(
+            f"[{i + 1}] Meeting {passage['meeting_id']}{_at(passage.get('start'))}:\n{passage['text']}"
+            for i, passage in enumerate(passages)
+        )
+        return await self._cached(
+            "qa", f"{question}\n\n{context}",
+            lambda: self._generate(QA_PROMPT.format(context=context, question=question))
+        )
 
 class IntegratorAgent:
     async def dispatch_tasks(self, tasks: List[Task]) -> None:
@@ -97,4 +344,4 @@ class IntegratorAgent:
         Dispatch tasks to various integration endpoints (Notion, etc.)
         """
         # Implementation for task dispatch logic
-        pass
\ No newline at end of file
+        pass
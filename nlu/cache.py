@@ -0,0 +1,162 @@
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+from sqlalchemy import select, delete, func
+import hashlib
+import os
+import time
+
+from db.database import SessionLocal, LLMCacheEntry
+
+_MISSING = object()
+
+def normalize_text(text: str) -> str:
+    """Whitespace-insensitive form of a transcript used for cache keys"""
+    return " ".join((text or "").split())
+
+class LLMCache:
+    """
+    Two-tier cache for LLM results keyed on the normalized input, prompt
+    template version and model name.
+
+    The memory tier is a per-process LRU; the persistent tier is a table in
+    the application database, shared by all workers and kept across
+    restarts. Both tiers honour the TTL and are bounded in size; the
+    database tier is trimmed every LLM_CACHE_EVICT_EVERY writes, and its
+    recency is only refreshed once per LLM_CACHE_TOUCH_SECONDS, so a hit
+    does not cost a write.
+    """
+
+    def __init__(self, ttl_seconds: Optional[int] = None, memory_entries: Optional[int] = None,
+                 db_max_entries: Optional[int] = None, persistent: Optional[bool] = None,
+                 evict_every: Optional[int] = None, touch_seconds: Optional[int] = None):
+        self.ttl_seconds = ttl_seconds or int(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+        self.memory_entries = memory_entries or int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "512"))
+        self.db_max_entries = db_max_entries or int(os.getenv("LLM_CACHE_DB_MAX_ENTRIES", "10000"))
+        if persistent is None:
+            persistent = os.getenv("LLM_CACHE_PERSISTENT", "true").lower() == "true"
+        self.persistent = persistent
+        self.evict_every = evict_every or int(os.getenv("LLM_CACHE_EVICT_EVERY", "100"))
+        self.touch_interval = timedelta(seconds=touch_seconds or int(os.getenv("LLM_CACHE_TOUCH_SECONDS", "3600")))
+        self._writes_since_evict = 0
+        self._memory: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._stats = {"memory_hits": 0, "db_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    @staticmethod
+    def make_key(template: str, version: str, model: str, content: str) -> str:
+        digest = hashlib.sha256()
+        digest.update(f"{template}\x00{version}\x00{model}\x00".encode("utf-8"))
+        digest.update(normalize_text(content).encode("utf-8"))
+        return digest.hexdigest()
+
+    def stats(self) -> Dict:
+        lookups = self._stats["memory_hits"] + self._stats["db_hits"] + self._stats["misses"]
+        hits = self._stats["memory_hits"] + self._stats["db_hits"]
+        return {
+            **self._stats,
+            "memory_size": len(self._memory),
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+    async def get(self, key: str) -> Any:
+        """Return the cached value, or None on a miss"""
+        value = self._memory_get(key)
+        if value is not _MISSING:
+            self._stats["memory_hits"] += 1
+            return value
+
+        if self.persistent:
+            try:
+                value = await self._db_get(key)
+            except Exception as e:
+                print(f"LLM cache read failed: {str(e)}")
+                value = _MISSING
+            if value is not _MISSING:
+                self._stats["db_hits"] += 1
+                self._memory_set(key, value)
+                return value
+
+        self._stats["misses"] += 1
+        return None
+
+    async def set(self, key: str, value: Any, template: str = None, model: str = None):
+        self._stats["stores"] += 1
+        self._memory_set(key, value)
+        if self.persistent:
+            try:
+                await self._db_set(key, value, template, model)
+            except Exception as e:
+                print(f"LLM cache write failed: {str(e)}")
+
+    def _memory_get(self, key: str) -> Any:
+        entry = self._memory.get(key)
+        if entry is None:
+            return _MISSING
+        expires_at, value = entry
+        if expires_at < time.time():
+            del self._memory[key]
+            return _MISSING
+        self._memory.move_to_end(key)
+        return value
+
+    def _memory_set(self, key: str, value: Any):
+        self._memory[key] = (time.time() + self.ttl_seconds, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    async def _db_get(self, key: str) -> Any:
+        async with SessionLocal() as db:
+            entry = await db.get(LLMCacheEntry, key)
+            if entry is None:
+                return _MISSING
+            now = datetime.utcnow()
+            if entry.expires_at and entry.expires_at < now:
+                await db.delete(entry)
+                await db.commit()
+                return _MISSING
+            if entry.accessed_at is None or now - entry.accessed_at > self.touch_interval:
+                entry.accessed_at = now
+                await db.commit()
+            return entry.value
+
+    async def _db_set(self, key: str, value: Any, template: Optional[str], model: Optional[str]):
+        now = datetime.utcnow()
+        async with SessionLocal() as db:
+            await db.merge(LLMCacheEntry(
+                key=key,
+                template=template,
+                model=model,
+                value=value,
+                created_at=now,
+                accessed_at=now,
+                expires_at=now + timedelta(seconds=self.ttl_seconds)
+            ))
+            await db.commit()
+
+            self._writes_since_evict += 1
+            if self._writes_since_evict < self.evict_every:
+                return
+            self._writes_since_evict = 0
+            # Drop expired rows, then the least recently used beyond the size bound
+            await db.execute(delete(LLMCacheEntry).where(LLMCacheEntry.expires_at < now))
+            excess = (await db.execute(select(func.count()).select_from(LLMCacheEntry))).scalar() - self.db_max_entries
+            if excess > 0:
+                stale = select(LLMCacheEntry.key).order_by(LLMCacheEntry.accessed_at).limit(excess)
+                await db.execute(delete(LLMCacheEntry).where(LLMCacheEntry.key.in_(stale.scalar_subquery())))
+                self._stats["evictions"] += excess
+            await db.commit()
+
+_llm_cache: Optional[LLMCache] = None
+
+def get_llm_cache() -> Optional[LLMCache]:
+    """
+    Process-wide cache shared by the agents, or None when LLM_CACHE_ENABLED=false
+    """
+    global _llm_cache
+    if os.getenv("LLM_CACHE_ENABLED", "true").lower() != "true":
+        return None
+    if _llm_cache is None:
+        _llm_cache = LLMCache()
+    return _llm_cache
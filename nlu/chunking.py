@@ -0,0 +1,74 @@
+from typing import List
+import re
+
+_SPEAKER_PREFIX = re.compile(r"^([^:\n]{1,60}):\s+")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap token estimate (~4 characters per token for English text)
+    """
+    return max(1, len(text) // 4)
+
+def _split_turn(turn: str, max_tokens: int) -> List[str]:
+    """
+    Split a single oversized speaker turn at sentence (then word) boundaries,
+    repeating the speaker label on every piece
+    """
+    match = _SPEAKER_PREFIX.match(turn)
+    prefix = match.group(0) if match else ""
+    body = turn[len(prefix):]
+    budget = max(1, max_tokens - estimate_tokens(prefix))
+
+    units = _SENTENCE_END.split(body)
+    if any(estimate_tokens(unit) > budget for unit in units):
+        units = body.split()
+
+    pieces, current = [], ""
+    for unit in units:
+        candidate = f"{current} {unit}".strip()
+        if current and estimate_tokens(candidate) > budget:
+            pieces.append(prefix + current)
+            current = unit
+        else:
+            current = candidate
+    if current:
+        pieces.append(prefix + current)
+    return pieces
+
+def chunk_transcript(transcript: str, max_tokens: int, overlap_turns: int = 0) -> List[str]:
+    """
+    Split a cleaned transcript ("Speaker: text" per line) into chunks of at
+    most max_tokens, breaking only between speaker turns unless a single turn
+    is itself larger than the budget. The last overlap_turns turns of each
+    chunk are repeated at the start of the next one for context.
+    """
+    turns = []
+    for line in transcript.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if estimate_tokens(line) > max_tokens:
+            turns.extend(_split_turn(line, max_tokens))
+        else:
+            turns.append(line)
+
+    chunks: List[List[str]] = []
+    current: List[str] = []
+    current_tokens = 0
+    for turn in turns:
+        tokens = estimate_tokens(turn) + 1
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append(current)
+            carried = current[-overlap_turns:] if overlap_turns else []
+            current = list(carried)
+            current_tokens = sum(estimate_tokens(t) + 1 for t in current)
+            # Never let the overlap push a chunk over budget
+            while current and current_tokens + tokens > max_tokens:
+                current_tokens -= estimate_tokens(current.pop(0)) + 1
+        current.append(turn)
+        current_tokens += tokens
+    if current:
+        chunks.append(current)
+
+    return ["\n".join(chunk) for chunk in chunks] or [transcript]
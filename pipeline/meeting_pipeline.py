@@ -0,0 +1,218 @@
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Dict, Optional, Union
+from pydantic import BaseModel
+import asyncio
+import os
+
+from asr.engine import asr_worker_count
+from core.resilience import CircuitOpenError, RetryableError
+from search.semantic import semantic_index_enabled
+from transcripts.model import Transcript
+
+STAGES = ("fetch", "download", "transcribe", "analyze", "publish")
+
+class MeetingInput(BaseModel):
+    meeting_id: str
+    platform: str = "zoom"  # Default to zoom
+    audio_url: Optional[str] = None
+    transcript: Optional[str] = None
+
+class MeetingContentError(Exception):
+    """Raised when no transcript could be obtained for a meeting"""
+
+StageCallback = Callable[[str], Awaitable[None]]
+
+class StageLimits:
+    """
+    Per-stage concurrency limits shared by everything running the pipeline
+    in this process (a limit of 0 means unbounded)
+    """
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None):
+        self._semaphores = {
+            stage: asyncio.Semaphore(limit)
+            for stage, limit in (limits or {}).items()
+            if limit and limit > 0
+        }
+
+    @classmethod
+    def from_env(cls, prefix: str = "PIPELINE_CONCURRENCY_") -> "StageLimits":
+        # One meeting per ASR worker keeps the engine busy without queueing past it
+        defaults = {"fetch": 8, "download": 4, "transcribe": asr_worker_count(), "analyze": 4, "publish": 4}
+        return cls({
+            stage: int(os.getenv(f"{prefix}{stage.upper()}", defaults[stage]))
+            for stage in STAGES
+        })
+
+    @asynccontextmanager
+    async def slot(self, stage: str):
+        semaphore = self._semaphores.get(stage)
+        if semaphore is None:
+            yield
+            return
+        async with semaphore:
+            yield
+
+class MeetingPipeline:
+    """
+    Fetch -> transcribe -> analyze -> publish for a single meeting
+    """
+
+    def __init__(self, components, limits: Optional[StageLimits] = None, combined_analysis: Optional[bool] = None):
+        self.components = components
+        self.limits = limits or StageLimits()
+        if combined_analysis is None:
+            combined_analysis = os.getenv("NLU_COMBINED_ANALYSIS", "false").lower() == "true"
+        self.combined_analysis = combined_analysis
+
+    async def run(self, meeting_input: MeetingInput, on_stage: Optional[StageCallback] = None) -> Dict:
+        print(f"\nProcessing meeting {meeting_input.meeting_id} from {meeting_input.platform}")
+
+        transcript = await self.fetch_transcript(meeting_input, on_stage)
+
+        await self._enter(on_stage, "analyze")
+        async with self.limits.slot("analyze"):
+            summary, tasks = await self.analyze(transcript)
+
+        await self._enter(on_stage, "publish")
+        async with self.limits.slot("publish"):
+            # Transcript, summary and tasks land in one transaction
+            transcript_store = await self.components.get("transcript_store")
+            await transcript_store.save(meeting_input.meeting_id, transcript, summary=summary, tasks=tasks)
+            await self.index_semantic(meeting_input.meeting_id, transcript, summary)
+            await self.publish(meeting_input.meeting_id, summary, tasks)
+
+        return {
+            "meeting_id": meeting_input.meeting_id,
+            "summary": summary,
+            "tasks": tasks
+        }
+
+    async def fetch_transcript(self, meeting_input: MeetingInput, on_stage: Optional[StageCallback] = None) -> Transcript:
+        """
+        Get the transcript from the platform, transcribing the recording or
+        falling back to the provided input when needed, parsed into speaker
+        turns
+        """
+        meeting_connector = await self.components.get("meeting_connector")
+        transcript = None
+        recording_url = None
+
+        await self._enter(on_stage, "fetch")
+        async with self.limits.slot("fetch"):
+            try:
+                print("Attempting to get transcript...")
+                # First try to get direct transcript
+                transcript = await meeting_connector.get_transcript(meeting_input.meeting_id, meeting_input.platform)
+                if transcript:
+                    print("Got transcript directly from platform")
+                else:
+                    # If no transcript, try getting recording and transcribe it
+                    print("No direct transcript, trying to get recording...")
+                    recording_url = await meeting_connector.get_recording(meeting_input.meeting_id, meeting_input.platform)
+                    if recording_url:
+                        print(f"Got recording URL: {recording_url}")
+                    else:
+                        print("No recording found")
+            except Exception as e:
+                print(f"Failed to retrieve meeting content from platform: {str(e)}")
+                if not meeting_input.audio_url and not meeting_input.transcript:
+                    if isinstance(e, (CircuitOpenError, RetryableError)):
+                        # The platform is unavailable, not the meeting: let callers retry later
+                        raise
+                    raise MeetingContentError(f"Failed to retrieve meeting content: {str(e)}")
+
+        if transcript:
+            return Transcript.parse(transcript).merged()
+
+        audio_source = recording_url or meeting_input.audio_url
+        if audio_source:
+            await self._enter(on_stage, "download")
+            async with self.limits.slot("download"):
+                recording_fetcher = await self.components.get("recording_fetcher")
+                if recording_url:
+                    headers = await meeting_connector.get_download_headers(meeting_input.platform)
+                    audio_path = await recording_fetcher.fetch_url(
+                        recording_url, key=f"{meeting_input.platform}-{meeting_input.meeting_id}", headers=headers
+                    )
+                else:
+                    audio_path = await recording_fetcher.fetch_url(meeting_input.audio_url)
+
+            await self._enter(on_stage, "transcribe")
+            async with self.limits.slot("transcribe"):
+                transcriber = await self.components.get("transcriber")
+                print(f"Transcribing audio: {audio_path}")
+                result = await transcriber.transcribe_segments(audio_path)
+                print("Successfully transcribed recording")
+            # Kept until now so a retry after a failed transcription skips the download
+            recording_fetcher.release(audio_path)
+            return Transcript.from_whisper(result).merged()
+
+        # If still no transcript, fall back to provided input
+        if meeting_input.transcript:
+            print("Using provided transcript")
+            return Transcript.parse(meeting_input.transcript).merged()
+
+        print("No content available")
+        raise MeetingContentError("Could not retrieve meeting content and no transcript provided")
+
+    async def analyze(self, transcript: Union[Transcript, str]):
+        """
+        Render the transcript once as compact speaker turns, then run
+        summarization and task extraction concurrently.
+
+        Failure policy: a summarizer or task extraction error fails the
+        meeting (throttling and open breakers are retried by the job queue);
+        only a task list Gemini answered unparseably yields no tasks.
+        Cancelling the caller cancels both in-flight LLM calls.
+        """
+        if isinstance(transcript, str):
+            transcript = Transcript.parse(transcript).merged()
+        cleaned = transcript.render()
+        if not cleaned:
+            raise MeetingContentError("Transcript is empty")
+
+        if self.combined_analysis:
+            analyst = await self.components.get("analyst")
+            return await analyst.analyze(cleaned)
+
+        summarizer = await self.components.get("summarizer")
+        task_agent = await self.components.get("task_agent")
+
+        summary, tasks = await asyncio.gather(
+            summarizer.generate_summary(cleaned),
+            task_agent.extract_tasks(cleaned),
+            return_exceptions=True
+        )
+        if isinstance(summary, BaseException):
+            raise summary
+        if isinstance(tasks, BaseException):
+            # Publishing an empty list would delete the tasks stored by an earlier run
+            raise tasks
+        return summary, tasks
+
+    async def index_semantic(self, meeting_id: str, transcript: Transcript, summary: str):
+        """Embed the meeting for cross-meeting Q&A; a failure here never fails the meeting"""
+        if not semantic_index_enabled():
+            return
+        try:
+            semantic_index = await self.components.get("semantic_index")
+            await semantic_index.index_meeting(meeting_id, transcript, summary)
+        except Exception as e:
+            print(f"Semantic indexing failed for {meeting_id}: {str(e)}")
+
+    async def publish(self, meeting_id: str, summary: str, tasks):
+        integrator = await self.components.get("integrator")
+        notion = await self.components.get("notion")
+
+        # Integrate with Notion
+        await integrator.dispatch_tasks(tasks)
+        await notion.create_meeting_page(meeting_id, summary, tasks)
+
+        # Reminders are persisted; whichever instance runs the scheduler fires them
+        scheduler = await self.components.get("scheduler")
+        await scheduler.schedule_meeting_reminders(meeting_id)
+
+    async def _enter(self, on_stage: Optional[StageCallback], stage: str):
+        if on_stage is not None:
+            await on_stage(stage)
@@ -0,0 +1,142 @@
+from abc import ABC, abstractmethod
+from email.message import EmailMessage
+from email.utils import make_msgid
+from typing import Dict, List, Optional
+from urllib.parse import quote
+import asyncio
+import json
+import os
+import smtplib
+
+from core.resilience import RetryableError, get_api_guard
+
+class ReminderChannel(ABC):
+    """
+    A way of delivering reminder digests. send() delivers one digest
+    ({"id", "assignee", "subject", "text", "link", "tasks"}) to a
+    recipient address and returns a message id if the channel has one.
+    Failures that certainly delivered nothing raise RetryableError; ones
+    that may have delivered raise ingestion.http.AmbiguousRequestError.
+    """
+    name = None
+
+    @abstractmethod
+    async def send(self, recipient: str, digest: Dict) -> Optional[str]:
+        pass
+
+    async def aclose(self):
+        pass
+
+class TeamsChannel(ReminderChannel):
+    """
+    Teams activity feed notifications through Microsoft Graph, with the
+    same app credentials used to read Teams recordings (needs the
+    TeamsActivity.Send application permission and the app installed for
+    the recipient)
+    """
+    name = "teams"
+
+    def __init__(self, connector=None):
+        if connector is None:
+            from ingestion.meeting_connector import TeamsConnector
+            connector = TeamsConnector()
+        self.connector = connector
+
+    async def send(self, recipient: str, digest: Dict) -> Optional[str]:
+        url = f"{self.connector.base_url}/users/{quote(recipient)}/teamwork/sendActivityNotification"
+        body = {
+            "topic": {"source": "text", "value": digest["subject"], "webUrl": digest["link"]},
+            "activityType": "systemDefault",
+            "previewText": {"content": digest["subject"]},
+            "templateParameters": [{"name": "systemDefaultText", "value": digest["text"][:1000]}],
+        }
+        response = await self.connector.http.post(url, headers=await self.connector._headers(), json=body,
+                                                  idempotent=False)
+        if response.status >= 300:
+            raise Exception(f"Teams notification failed: Status {response.status}, Response: {response.text()}")
+        return response.headers.get("request-id")
+
+class EmailChannel(ReminderChannel):
+    """Plain text email over SMTP (smtplib, run in a worker thread)"""
+    name = "email"
+
+    def __init__(self):
+        self.host = os.getenv("SMTP_HOST", "localhost")
+        self.port = int(os.getenv("SMTP_PORT", "587"))
+        self.username = os.getenv("SMTP_USERNAME")
+        self.password = os.getenv("SMTP_PASSWORD")
+        self.starttls = os.getenv("SMTP_STARTTLS", "true").lower() == "true"
+        self.sender = os.getenv("REMINDER_EMAIL_FROM", "reminders@localhost")
+        self.guard = get_api_guard("smtp")
+
+    async def send(self, recipient: str, digest: Dict) -> Optional[str]:
+        message = EmailMessage()
+        message["From"] = self.sender
+        message["To"] = recipient
+        message["Subject"] = digest["subject"]
+        message["Message-ID"] = make_msgid(idstring=digest["id"][:16])
+        message.set_content(f"{digest['text']}\n\n{digest['link']}\n")
+        await self.guard.call(self._send, message, host=self.host)
+        return message["Message-ID"]
+
+    async def _send(self, message: EmailMessage):
+        try:
+            await asyncio.to_thread(self._send_blocking, message)
+        except smtplib.SMTPResponseException as e:
+            # 4xx replies are temporary by definition
+            if 400 <= e.smtp_code < 500:
+                raise RetryableError(f"SMTP {self.host}: {e.smtp_code} {e.smtp_error!r}")
+            raise
+        except (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError, TimeoutError) as e:
+            raise RetryableError(f"SMTP {self.host}: {type(e).__name__} {str(e)}")
+
+    def _send_blocking(self, message: EmailMessage):
+        with smtplib.SMTP(self.host, self.port, timeout=30) as smtp:
+            if self.starttls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password)
+            smtp.send_message(message)
+
+class WebhookChannel(ReminderChannel):
+    """
+    JSON POST of the whole digest to REMINDER_WEBHOOK_URL; the digest id
+    doubles as the Idempotency-Key so receivers can drop replays
+    """
+    name = "webhook"
+
+    def __init__(self, url: Optional[str] = None):
+        from ingestion.http import ApiClient
+        self.url = url or os.getenv("REMINDER_WEBHOOK_URL")
+        if not self.url:
+            raise Exception("REMINDER_WEBHOOK_URL is not configured")
+        self.http = ApiClient("reminder_webhook")
+
+    async def send(self, recipient: str, digest: Dict) -> Optional[str]:
+        response = await self.http.post(
+            self.url,
+            data=json.dumps({**digest, "recipient": recipient}),
+            headers={"Content-Type": "application/json", "Idempotency-Key": digest["id"]},
+            idempotent=False
+        )
+        if response.status >= 300:
+            raise Exception(f"Reminder webhook failed: Status {response.status}, Response: {response.text()}")
+        return None
+
+CHANNELS = {
+    TeamsChannel.name: TeamsChannel,
+    EmailChannel.name: EmailChannel,
+    WebhookChannel.name: WebhookChannel,
+}
+
+def create_channels(names: Optional[str] = None) -> List[ReminderChannel]:
+    """Instantiate the channels listed in REMINDER_CHANNELS (comma separated)"""
+    names = names if names is not None else os.getenv("REMINDER_CHANNELS", "teams")
+    channels = []
+    for name in (part.strip() for part in names.split(",")):
+        if not name:
+            continue
+        if name not in CHANNELS:
+            raise ValueError(f"Unknown reminder channel: {name} (expected one of {', '.join(CHANNELS)})")
+        channels.append(CHANNELS[name]())
+    return channels
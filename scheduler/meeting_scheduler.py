@@ -1,65 +1,382 @@
 from datetime import datetime, timedelta
-from typing import List, Dict
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from fastapi import Request
+from sqlalchemy import select, update, or_, and_
 import asyncio
+import heapq
+import os
+import socket
+import uuid
+
+from db.database import SessionLocal, ScheduledJob, Task
+
+Handler = Callable[[Dict], Awaitable[None]]
+
+def _job_to_dict(job: ScheduledJob) -> Dict:
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "payload": job.payload,
+        "fire_at": job.fire_at.isoformat() if job.fire_at else None,
+        "status": job.status,
+        "attempts": job.attempts,
+        "error": job.error,
+    }
 
 class MeetingScheduler:
-    def __init__(self):
-        self.scheduled_tasks = []
+    """
+    Persistent schedule of one-off actions: post-meeting processing and
+    task reminders.
+
+    Every scheduled item is a row in scheduled_jobs, so the schedule
+    survives restarts. Items due within the look-ahead horizon are kept in
+    a min-heap on fire time and the loop sleeps exactly until the earliest
+    one (or until something earlier is scheduled). Firing claims the row
+    with a lease through a conditional update, so several instances can
+    share one schedule without firing anything twice; an item whose
+    instance died mid-fire is picked up again once its lease expires.
+    Cancelled or rescheduled items are dropped from the heap lazily.
+    """
+
+    def __init__(self, lease_seconds: Optional[int] = None, horizon_seconds: Optional[int] = None,
+                 refresh_seconds: Optional[float] = None, max_attempts: Optional[int] = None,
+                 concurrency: Optional[int] = None):
+        self.lease_seconds = lease_seconds or int(os.getenv("SCHEDULER_LEASE_SECONDS", "300"))
+        self.horizon = timedelta(seconds=horizon_seconds or int(os.getenv("SCHEDULER_HORIZON_SECONDS", "3600")))
+        self.refresh_seconds = refresh_seconds or float(os.getenv("SCHEDULER_REFRESH_SECONDS", "60"))
+        self.max_attempts = max_attempts or int(os.getenv("SCHEDULER_MAX_ATTEMPTS", "5"))
+        self.retry_seconds = float(os.getenv("SCHEDULER_RETRY_SECONDS", "60"))
+        self.processing_delay = timedelta(minutes=float(os.getenv("POST_PROCESSING_DELAY_MINUTES", "5")))
+        self.reminder_lead = timedelta(hours=float(os.getenv("REMINDER_LEAD_HOURS", "24")))
+        self.digest_window = timedelta(minutes=float(os.getenv("REMINDER_DIGEST_WINDOW_MINUTES", "30")))
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.handlers: Dict[str, Handler] = {
+            "post_processing": self._process_recording,
+            "reminder_digest": self._send_digest,
+        }
+        self.jobs = None
+        self._reminders = None
+        self._heap: List[Tuple[datetime, str]] = []
+        self._due: Dict[str, datetime] = {}  # id -> fire time of its live heap entry
+        self._wakeup = asyncio.Event()
+        self._semaphore = asyncio.Semaphore(concurrency or int(os.getenv("SCHEDULER_CONCURRENCY", "8")))
+        self._firing: Set[asyncio.Task] = set()
+        self._loop_task: Optional[asyncio.Task] = None
+
+    def register_handler(self, kind: str, handler: Handler):
+        self.handlers[kind] = handler
+
+    async def start(self, jobs=None):
+        """Recover the persisted schedule and start firing; jobs is the queue post-processing submits to"""
+        self.jobs = jobs
+        if self._loop_task is None:
+            print(f"Starting scheduler ({self.worker_id})")
+            self._loop_task = asyncio.create_task(self.run_scheduler())
+
+    async def stop(self):
+        tasks = [task for task in [self._loop_task, *self._firing] if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._loop_task = None
+        self._firing.clear()
+
+    async def aclose(self):
+        await self.stop()
+        if self._reminders is not None:
+            await self._reminders.aclose()
+
+    # --- Scheduling --------------------------------------------------------
+
+    async def schedule(self, kind: str, payload: Dict, fire_at: datetime, job_id: Optional[str] = None) -> str:
+        """
+        Persist an item (fire_at in UTC); scheduling an existing id moves
+        it to the new time and payload, unless it is being fired right now
+        (running under a live lease), in which case it is left to finish.
+        Returns the id.
+        """
+        job_id = job_id or uuid.uuid4().hex
+        async with SessionLocal() as db:
+            job = await db.get(ScheduledJob, job_id)
+            if job is None:
+                db.add(ScheduledJob(id=job_id, kind=kind, payload=payload, fire_at=fire_at, status="scheduled", attempts=0))
+            elif job.status == "scheduled" and job.fire_at == fire_at and job.payload == payload:
+                self._push(job_id, fire_at)
+                return job_id
+            else:
+                now = datetime.utcnow()
+                # Conditional so a claim since the read is not reset under its owner
+                moved = await db.execute(
+                    update(ScheduledJob)
+                    .where(
+                        ScheduledJob.id == job_id,
+                        or_(
+                            ScheduledJob.status != "running",
+                            ScheduledJob.lease_expires_at.is_(None),
+                            ScheduledJob.lease_expires_at < now
+                        )
+                    )
+                    .values(kind=kind, payload=payload, fire_at=fire_at, status="scheduled", attempts=0,
+                            error=None, lease_owner=None, lease_expires_at=None, updated_at=now)
+                )
+                if moved.rowcount != 1:
+                    await db.rollback()
+                    print(f"Scheduled {job_id} is running, not rescheduling it")
+                    return job_id
+            await db.commit()
+        self._push(job_id, fire_at)
+        return job_id
+
+    async def reschedule(self, job_id: str, fire_at: datetime) -> bool:
+        """Move a pending item to a new time; False when it is unknown or already fired"""
+        async with SessionLocal() as db:
+            moved = await db.execute(
+                update(ScheduledJob)
+                .where(ScheduledJob.id == job_id, ScheduledJob.status.in_(("scheduled", "failed")))
+                .values(fire_at=fire_at, status="scheduled", attempts=0, error=None, updated_at=datetime.utcnow())
+            )
+            await db.commit()
+        if moved.rowcount != 1:
+            return False
+        self._push(job_id, fire_at)
+        return True
+
+    async def cancel(self, job_id: str) -> bool:
+        async with SessionLocal() as db:
+            cancelled = await db.execute(
+                update(ScheduledJob)
+                .where(ScheduledJob.id == job_id, ScheduledJob.status == "scheduled")
+                .values(status="cancelled", updated_at=datetime.utcnow())
+            )
+            await db.commit()
+        self._due.pop(job_id, None)
+        return cancelled.rowcount == 1
+
+    async def get(self, job_id: str) -> Optional[Dict]:
+        async with SessionLocal() as db:
+            job = await db.get(ScheduledJob, job_id)
+            return _job_to_dict(job) if job else None
 
-    async def schedule_post_processing(self, meeting_id: str, recording_url: str):
+    async def schedule_post_processing(self, meeting_id: str, recording_url: str, platform: str = "zoom") -> str:
         """
-        Schedule post-meeting processing tasks
+        Schedule post-meeting processing, POST_PROCESSING_DELAY_MINUTES after now
         """
-        # Add to processing queue
-        self.scheduled_tasks.append({
-            "meeting_id": meeting_id,
-            "recording_url": recording_url,
-            "processing_time": datetime.now() + timedelta(minutes=5)  # Process 5 minutes after meeting
-        })
+        return await self.schedule(
+            "post_processing",
+            {"meeting_id": meeting_id, "platform": platform, "audio_url": recording_url},
+            datetime.utcnow() + self.processing_delay,
+            job_id=f"post_processing:{platform}:{meeting_id}"
+        )
+
+    def _digest_time(self, reminder_time: datetime) -> datetime:
+        """End of the digest window containing reminder_time"""
+        window = self.digest_window.total_seconds()
+        seconds = (reminder_time - datetime(1970, 1, 1)).total_seconds()
+        return datetime(1970, 1, 1) + timedelta(seconds=-(-seconds // window) * window)
 
     async def schedule_task_reminders(self, tasks: List[Dict]):
         """
-        Schedule reminders for tasks 24 hours before due date
+        Schedule reminders REMINDER_LEAD_HOURS before each task's due date,
+        coalesced into one digest per assignee per REMINDER_DIGEST_WINDOW_MINUTES
+        window. The digest picks up the assignee's due open tasks when it
+        fires, so tasks completed or moved since are left out.
         """
+        now = datetime.utcnow()
+        digests = set()
         for task in tasks:
-            due_date = datetime.strptime(task["due_date"], "%Y-%m-%d")
-            reminder_time = due_date - timedelta(days=1)
-            
-            if reminder_time > datetime.now():
-                self.scheduled_tasks.append({
-                    "task_id": task["id"],
-                    "reminder_time": reminder_time,
-                    "assignee": task["assignee"]
-                })
+            due_date = task.get("due_date")
+            if isinstance(due_date, str):
+                try:
+                    due_date = datetime.strptime(due_date, "%Y-%m-%d")
+                except ValueError:
+                    due_date = None
+            if not due_date or not task.get("assignee") or task.get("status", "open") == "done":
+                continue
+            reminder_time = due_date - self.reminder_lead
+            if reminder_time > now:
+                digests.add((task["assignee"], self._digest_time(reminder_time)))
+
+        for assignee, fire_at in sorted(digests, key=lambda digest: digest[1]):
+            await self.schedule("reminder_digest", {"assignee": assignee}, fire_at,
+                                job_id=f"reminder_digest:{assignee}:{fire_at:%Y%m%dT%H%M}")
+
+    async def schedule_meeting_reminders(self, meeting_id: str):
+        """Schedule the reminder digests covering a meeting's stored tasks"""
+        async with SessionLocal() as db:
+            tasks = (await db.execute(
+                select(Task.id, Task.assignee, Task.due_date, Task.status).where(Task.meeting_id == meeting_id)
+            )).all()
+        await self.schedule_task_reminders([
+            {"id": task.id, "assignee": task.assignee, "due_date": task.due_date, "status": task.status}
+            for task in tasks
+        ])
+
+    # --- Heap --------------------------------------------------------------
+
+    def _push(self, job_id: str, fire_at: datetime):
+        if fire_at > datetime.utcnow() + self.horizon:
+            # Loaded by a later refresh once it comes within the horizon
+            self._due.pop(job_id, None)
+            return
+        if self._due.get(job_id) == fire_at:
+            return
+        self._due[job_id] = fire_at
+        heapq.heappush(self._heap, (fire_at, job_id))
+        if self._heap[0] == (fire_at, job_id):
+            self._wakeup.set()
+        # Drop stale entries once they outnumber live ones
+        if len(self._heap) > 2 * len(self._due) + 1024:
+            self._heap = [(due, key) for key, due in self._due.items()]
+            heapq.heapify(self._heap)
+
+    async def _refresh(self):
+        """Load items due within the horizon, and items whose lease expired"""
+        now = datetime.utcnow()
+        async with SessionLocal() as db:
+            rows = (await db.execute(
+                select(ScheduledJob.id, ScheduledJob.fire_at)
+                .where(or_(
+                    and_(ScheduledJob.status == "scheduled", ScheduledJob.fire_at <= now + self.horizon),
+                    and_(ScheduledJob.status == "running", ScheduledJob.lease_expires_at < now),
+                ))
+                .order_by(ScheduledJob.fire_at)
+                .limit(10000)
+            )).all()
+        for row in rows:
+            self._push(row.id, row.fire_at)
 
     async def run_scheduler(self):
         """
         Main scheduler loop
         """
+        loop = asyncio.get_running_loop()
+        next_refresh = 0.0
         while True:
-            current_time = datetime.now()
-            
-            # Check for tasks that need processing
-            for task in self.scheduled_tasks[:]:
-                if task.get("processing_time", datetime.max) <= current_time:
-                    await self._process_task(task)
-                    self.scheduled_tasks.remove(task)
-            
-            await asyncio.sleep(60)  # Check every minute
-
-    async def _process_task(self, task: Dict):
+            self._wakeup.clear()
+            if loop.time() >= next_refresh:
+                try:
+                    await self._refresh()
+                except Exception as e:
+                    print(f"Scheduler failed to load the schedule: {str(e)}")
+                next_refresh = loop.time() + self.refresh_seconds
+
+            now = datetime.utcnow()
+            while self._heap and self._heap[0][0] <= now:
+                fire_at, job_id = heapq.heappop(self._heap)
+                if self._due.get(job_id) != fire_at:
+                    continue  # cancelled or rescheduled since it was pushed
+                del self._due[job_id]
+                task = asyncio.create_task(self._fire(job_id))
+                self._firing.add(task)
+                task.add_done_callback(self._firing.discard)
+
+            timeout = next_refresh - loop.time()
+            if self._heap:
+                timeout = min(timeout, (self._heap[0][0] - datetime.utcnow()).total_seconds())
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max(0.0, timeout))
+            except asyncio.TimeoutError:
+                pass
+
+    # --- Firing ------------------------------------------------------------
+
+    async def _claim(self, job_id: str) -> Optional[ScheduledJob]:
+        now = datetime.utcnow()
+        async with SessionLocal() as db:
+            # Conditional update so only one instance wins the item
+            claimed = await db.execute(
+                update(ScheduledJob)
+                .where(
+                    ScheduledJob.id == job_id,
+                    ScheduledJob.fire_at <= now,
+                    or_(
+                        ScheduledJob.status == "scheduled",
+                        and_(ScheduledJob.status == "running", ScheduledJob.lease_expires_at < now)
+                    )
+                )
+                .values(
+                    status="running",
+                    lease_owner=self.worker_id,
+                    lease_expires_at=now + timedelta(seconds=self.lease_seconds),
+                    attempts=ScheduledJob.attempts + 1,
+                    updated_at=now
+                )
+            )
+            await db.commit()
+            if claimed.rowcount != 1:
+                return None
+            return await db.get(ScheduledJob, job_id)
+
+    async def _update(self, job_id: str, **values):
+        async with SessionLocal() as db:
+            await db.execute(
+                update(ScheduledJob)
+                .where(ScheduledJob.id == job_id, ScheduledJob.lease_owner == self.worker_id)
+                .values(updated_at=datetime.utcnow(), **values)
+            )
+            await db.commit()
+
+    async def _fire(self, job_id: str):
+        async with self._semaphore:
+            try:
+                job = await self._claim(job_id)
+            except Exception as e:
+                print(f"Scheduler failed to claim {job_id}: {str(e)}")
+                return
+            if job is None:
+                return  # fired by another instance, cancelled or moved
+            await self._process_task(job)
+
+    async def _process_task(self, job: ScheduledJob):
         """
-        Process a scheduled task
+        Run a claimed item's handler; failures are retried with backoff
         """
-        if "recording_url" in task:
-            # Handle post-meeting processing
-            pass
-        elif "task_id" in task:
-            # Handle task reminder
-            await self._send_reminder(task)
-
-    async def _send_reminder(self, task: Dict):
+        handler = self.handlers.get(job.kind)
+        try:
+            if handler is None:
+                raise Exception(f"No handler for scheduled {job.kind}")
+            await handler(job.payload)
+            await self._update(job.id, status="done", error=None, lease_owner=None, lease_expires_at=None)
+        except asyncio.CancelledError:
+            # Shutting down: hand the item back (if this fails the lease simply expires)
+            try:
+                await self._update(job.id, status="scheduled", lease_owner=None, lease_expires_at=None,
+                                   attempts=ScheduledJob.attempts - 1)
+            except Exception as e:
+                print(f"Failed to release scheduled {job.id}: {str(e)}")
+            raise
+        except Exception as e:
+            if job.attempts >= self.max_attempts:
+                print(f"Scheduled {job.id} failed: {str(e)}")
+                await self._update(job.id, status="failed", error=str(e), lease_owner=None, lease_expires_at=None)
+                return
+            retry_at = datetime.utcnow() + timedelta(seconds=self.retry_seconds * 2 ** (job.attempts - 1))
+            print(f"Scheduled {job.id} failed, retrying at {retry_at.isoformat()}: {str(e)}")
+            await self._update(job.id, status="scheduled", fire_at=retry_at, error=str(e),
+                               lease_owner=None, lease_expires_at=None)
+            self._push(job.id, retry_at)
+
+    async def _process_recording(self, payload: Dict):
         """
-        Send a reminder for a task
+        Handle post-meeting processing: queue the meeting for the pipeline
         """
-        # Implementation for sending reminders (e.g., via Teams)
\ No newline at end of file
+        if self.jobs is None:
+            raise Exception("Scheduler has no job queue")
+        await self.jobs.submit(payload)
+
+    @property
+    def reminders(self):
+        # Channels are created on first use so a schedule without reminders needs no credentials
+        if self._reminders is None:
+            from scheduler.reminders import ReminderDispatcher
+            self._reminders = ReminderDispatcher()
+        return self._reminders
+
+    async def _send_digest(self, payload: Dict):
+        await self.reminders.send_digest(payload["assignee"])
+
+def get_scheduler(request: Request) -> MeetingScheduler:
+    """
+    FastAPI dependency returning the scheduler started at startup
+    """
+    return request.app.state.scheduler
@@ -0,0 +1,205 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from urllib.parse import quote
+from sqlalchemy import select, update, or_
+from sqlalchemy.exc import IntegrityError
+import asyncio
+import hashlib
+import json
+import os
+
+from db.database import SessionLocal, ReminderDelivery, Task
+from ingestion.http import AmbiguousRequestError
+from scheduler.channels import ReminderChannel, create_channels
+
+class RecipientDirectory:
+    """
+    Maps task assignees (as extracted from transcripts, usually display
+    names) to channel addresses, from the JSON file in
+    REMINDER_RECIPIENTS_FILE: {"Sarah": {"email": "...", "teams": "..."}}.
+    Assignees that already look like an email address are used as is for
+    email and Teams; the webhook channel receives the assignee name.
+    """
+
+    def __init__(self, entries: Optional[Dict[str, Dict]] = None):
+        self.entries = {name.strip().lower(): addresses for name, addresses in (entries or {}).items()}
+
+    @classmethod
+    def from_env(cls) -> "RecipientDirectory":
+        path = os.getenv("REMINDER_RECIPIENTS_FILE")
+        if not path:
+            return cls()
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def address(self, assignee: str, channel: str) -> Optional[str]:
+        if channel == "webhook":
+            return assignee
+        entry = self.entries.get(assignee.strip().lower(), {})
+        if channel in entry:
+            return entry[channel]
+        if channel == "teams" and "email" in entry:
+            return entry["email"]  # Graph accepts the user principal name
+        return assignee if "@" in assignee else None
+
+def delivery_key(channel: str, task: Task) -> str:
+    return f"{channel}:{task.id}:{task.due_date.date().isoformat()}"
+
+def build_digest(assignee: str, tasks: List[Task], link: str) -> Dict:
+    tasks = sorted(tasks, key=lambda task: (task.due_date, task.id))
+    lines = [
+        f"- {task.title} (due {task.due_date.date().isoformat()}, meeting {task.meeting_id})"
+        for task in tasks
+    ]
+    count = f"{len(tasks)} task{'s' if len(tasks) != 1 else ''}"
+    return {
+        "assignee": assignee,
+        "subject": f"Reminder: {count} due soon",
+        "text": f"Hi {assignee}, you have {count} due soon:\n" + "\n".join(lines),
+        "link": f"{link}?assignee={quote(assignee)}",
+        "tasks": [
+            {"task_id": task.id, "title": task.title, "due_date": task.due_date.date().isoformat(),
+             "meeting_id": task.meeting_id}
+            for task in tasks
+        ],
+    }
+
+class ReminderDispatcher:
+    """
+    Sends one digest per assignee and channel covering all of their open
+    tasks coming due, instead of one message per task.
+
+    Every (channel, task, due date) delivery is recorded: it is claimed as
+    "sending" with a lease before the send and marked "sent" after it, so
+    a digest retried after a partial failure only carries what has not
+    gone out on that channel. A send that fails without telling whether it
+    was delivered (timeout, 5xx) is marked "unconfirmed" and not retried,
+    so those reminders may be missed rather than repeated. Only a send
+    still in flight when its instance dies, found again once the lease
+    expires, can reach the recipient twice. Sends across all digests are
+    bounded by REMINDER_CONCURRENCY.
+    """
+
+    def __init__(self, channels: Optional[List[ReminderChannel]] = None,
+                 directory: Optional[RecipientDirectory] = None, lead: Optional[timedelta] = None,
+                 concurrency: Optional[int] = None, lease_seconds: Optional[int] = None):
+        self.channels = channels if channels is not None else create_channels()
+        self.directory = directory or RecipientDirectory.from_env()
+        self.lead = lead or timedelta(hours=float(os.getenv("REMINDER_LEAD_HOURS", "24")))
+        self.lease = timedelta(seconds=lease_seconds or int(os.getenv("REMINDER_SEND_LEASE_SECONDS", "300")))
+        self.link = os.getenv("REMINDER_LINK_URL", "http://localhost:8000/tasks")
+        self._semaphore = asyncio.Semaphore(concurrency or int(os.getenv("REMINDER_CONCURRENCY", "10")))
+
+    async def send_digest(self, assignee: str) -> int:
+        """
+        Deliver the assignee's due reminders on every channel; returns the
+        number of task reminders sent. Raises if any channel failed, after
+        the others have been tried.
+        """
+        tasks = await self._due_tasks(assignee)
+        if not tasks:
+            return 0
+        results = await asyncio.gather(
+            *(self._deliver(channel, assignee, tasks) for channel in self.channels),
+            return_exceptions=True
+        )
+        failures = [f"{channel.name}: {str(result)}" for channel, result in zip(self.channels, results)
+                    if isinstance(result, BaseException)]
+        if failures:
+            raise Exception(f"Reminder digest for {assignee} failed on {'; '.join(failures)}")
+        return sum(results)
+
+    async def _due_tasks(self, assignee: str) -> List[Task]:
+        """Open tasks due between the start of today and the reminder lead from now"""
+        now = datetime.utcnow()
+        async with SessionLocal() as db:
+            return (await db.execute(
+                select(Task).where(
+                    Task.assignee == assignee,
+                    or_(Task.status.is_(None), Task.status != "done"),
+                    Task.due_date >= now.replace(hour=0, minute=0, second=0, microsecond=0),
+                    Task.due_date <= now + self.lead,
+                )
+            )).scalars().all()
+
+    async def _deliver(self, channel: ReminderChannel, assignee: str, tasks: List[Task]) -> int:
+        recipient = self.directory.address(assignee, channel.name)
+        if recipient is None:
+            print(f"No {channel.name} address for {assignee}, skipping")
+            return 0
+        tasks = await self._claim(channel.name, assignee, tasks)
+        if not tasks:
+            return 0
+
+        keys = [delivery_key(channel.name, task) for task in tasks]
+        digest = {"id": hashlib.sha256("\n".join(sorted(keys)).encode("utf-8")).hexdigest(),
+                  **build_digest(assignee, tasks, self.link)}
+        try:
+            async with self._semaphore:
+                message_id = await channel.send(recipient, digest)
+        except AmbiguousRequestError as e:
+            await self._finish(keys, status="unconfirmed", digest_id=digest["id"], error=str(e),
+                               lease_expires_at=None)
+            raise
+        except Exception as e:
+            await self._finish(keys, status="failed", error=str(e), lease_expires_at=None)
+            raise
+        await self._finish(keys, status="sent", digest_id=digest["id"], message_id=message_id,
+                           error=None, lease_expires_at=None, sent_at=datetime.utcnow())
+        print(f"Sent {channel.name} reminder digest to {assignee} ({len(tasks)} tasks)")
+        return len(tasks)
+
+    async def _claim(self, channel: str, assignee: str, tasks: List[Task]) -> List[Task]:
+        """
+        Claim the deliveries not yet attempted or that certainly failed (and
+        not being sent elsewhere); returns their tasks
+        """
+        now = datetime.utcnow()
+        by_key = {delivery_key(channel, task): task for task in tasks}
+        claimed = []
+        async with SessionLocal() as db:
+            existing = {
+                row.key: row
+                for row in (await db.execute(
+                    select(ReminderDelivery).where(ReminderDelivery.key.in_(list(by_key)))
+                )).scalars()
+            }
+            for key, task in by_key.items():
+                row = existing.get(key)
+                if row is None:
+                    db.add(ReminderDelivery(key=key, channel=channel, task_id=task.id, assignee=assignee,
+                                            status="sending", attempts=1, lease_expires_at=now + self.lease))
+                    claimed.append(task)
+                    continue
+                if row.status in ("sent", "unconfirmed") or (row.status == "sending" and row.lease_expires_at > now):
+                    continue
+                # Conditional on the row being unchanged since it was read
+                won = await db.execute(
+                    update(ReminderDelivery)
+                    .where(ReminderDelivery.key == key, ReminderDelivery.status == row.status,
+                           ReminderDelivery.attempts == row.attempts)
+                    .values(status="sending", attempts=ReminderDelivery.attempts + 1,
+                            lease_expires_at=now + self.lease, updated_at=now)
+                )
+                if won.rowcount == 1:
+                    claimed.append(task)
+            try:
+                await db.commit()
+            except IntegrityError:
+                # Another instance recorded one of these deliveries first; the retry sorts it out
+                await db.rollback()
+                raise Exception(f"Concurrent {channel} reminder delivery for {assignee}")
+        return claimed
+
+    async def _finish(self, keys: List[str], **values):
+        async with SessionLocal() as db:
+            await db.execute(
+                update(ReminderDelivery)
+                .where(ReminderDelivery.key.in_(keys))
+                .values(updated_at=datetime.utcnow(), **values)
+            )
+            await db.commit()
+
+    async def aclose(self):
+        for channel in self.channels:
+            await channel.aclose()
@@ -0,0 +1,34 @@
+from datetime import datetime, timezone
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel
+
+from scheduler.meeting_scheduler import MeetingScheduler, get_scheduler
+
+router = APIRouter()
+
+class Reschedule(BaseModel):
+    fire_at: datetime
+
+@router.get("/schedule/{job_id}")
+async def get_scheduled(job_id: str, scheduler: MeetingScheduler = Depends(get_scheduler)):
+    """Status and fire time (UTC) of a scheduled item"""
+    job = await scheduler.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Scheduled item not found")
+    return job
+
+@router.post("/schedule/{job_id}/reschedule")
+async def reschedule(job_id: str, request: Reschedule, scheduler: MeetingScheduler = Depends(get_scheduler)):
+    """Move a pending item to a new time (naive times are taken as UTC)"""
+    fire_at = request.fire_at
+    if fire_at.tzinfo is not None:
+        fire_at = fire_at.astimezone(timezone.utc).replace(tzinfo=None)
+    if not await scheduler.reschedule(job_id, fire_at):
+        raise HTTPException(status_code=409, detail="Item is not pending")
+    return await scheduler.get(job_id)
+
+@router.delete("/schedule/{job_id}")
+async def cancel_scheduled(job_id: str, scheduler: MeetingScheduler = Depends(get_scheduler)):
+    if not await scheduler.cancel(job_id):
+        raise HTTPException(status_code=409, detail="Item is not pending")
+    return {"id": job_id, "status": "cancelled"}
@@ -0,0 +1,80 @@
+from typing import List, Optional
+import os
+
+import numpy as np
+
+DEFAULT_EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+class Embedder:
+    """
+    Sentence embeddings computed locally on the CPU with ONNX Runtime: a
+    small transformer (all-MiniLM-L6-v2 by default, 384 dimensions) with
+    mean pooling, returning unit-length float32 vectors.
+
+    EMBEDDING_MODEL is a Hugging Face repository with onnx/model.onnx and
+    tokenizer.json, or a local directory holding the same files. The model
+    is loaded on first use.
+    """
+
+    def __init__(self, model_name: Optional[str] = None, threads: Optional[int] = None,
+                 max_tokens: int = 256, batch_size: int = 32):
+        self.model_name = model_name or os.getenv("EMBEDDING_MODEL", DEFAULT_EMBEDDING_MODEL)
+        self.threads = threads or int(os.getenv("EMBEDDING_THREADS", "2"))
+        self.max_tokens = max_tokens
+        self.batch_size = batch_size
+        self.session = None
+        self.tokenizer = None
+        self.dim = None
+
+    def _file(self, name: str) -> str:
+        if os.path.isdir(self.model_name):
+            for candidate in (os.path.join(self.model_name, name), os.path.join(self.model_name, os.path.basename(name))):
+                if os.path.exists(candidate):
+                    return candidate
+            raise Exception(f"{name} not found in {self.model_name}")
+        from huggingface_hub import hf_hub_download
+        return hf_hub_download(self.model_name, name)
+
+    def load(self):
+        """Load the tokenizer and ONNX session (blocking)"""
+        if self.session is not None:
+            return
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        tokenizer = Tokenizer.from_file(self._file("tokenizer.json"))
+        tokenizer.enable_truncation(max_length=self.max_tokens)
+        tokenizer.enable_padding()
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = self.threads
+        options.inter_op_num_threads = 1
+        session = ort.InferenceSession(self._file("onnx/model.onnx"), options, providers=["CPUExecutionProvider"])
+
+        self.tokenizer = tokenizer
+        self._inputs = {model_input.name for model_input in session.get_inputs()}
+        self.session = session
+        self.dim = int(self.embed(["dimension probe"]).shape[1])
+        print(f"Loaded embedding model {self.model_name} ({self.dim} dimensions)")
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Unit-length embeddings, one row per text (blocking)"""
+        self.load()
+        batches = []
+        for start in range(0, len(texts), self.batch_size):
+            encodings = self.tokenizer.encode_batch(texts[start:start + self.batch_size])
+            ids = np.array([encoding.ids for encoding in encodings], dtype=np.int64)
+            mask = np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+            feed = {"input_ids": ids, "attention_mask": mask}
+            if "token_type_ids" in self._inputs:
+                feed["token_type_ids"] = np.zeros_like(ids)
+            hidden = self.session.run(None, feed)[0]
+
+            # Mean over the real (unpadded) tokens
+            weights = mask[:, :, None].astype(np.float32)
+            pooled = (hidden * weights).sum(axis=1) / np.maximum(weights.sum(axis=1), 1e-9)
+            pooled /= np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+            batches.append(pooled.astype(np.float32))
+        if not batches:
+            return np.zeros((0, self.dim or 0), dtype=np.float32)
+        return np.concatenate(batches)
@@ -0,0 +1,159 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import delete, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+import html
+import re
+
+from db.database import SessionLocal, Meeting, SearchDocument, Task, engine
+from transcripts.model import Transcript
+
+SEARCH_KINDS = ("transcript", "summary", "task")
+
+# Highlight markers placed by the database, turned into <mark> after escaping
+_OPEN, _CLOSE = "\x02", "\x03"
+_TERM = re.compile(r'"([^"]+)"|(\w+)', re.UNICODE)
+
+async def index_transcript(db: AsyncSession, meeting_id: str, transcript: Transcript):
+    """Replace the meeting's indexed transcript turns (within the caller's transaction)"""
+    rows = [
+        {"meeting_id": meeting_id, "kind": "transcript", "ref": i, "speaker": segment.speaker,
+         "start": segment.start, "body": segment.text}
+        for i, segment in enumerate(transcript.segments)
+        if segment.text
+    ]
+    await _replace(db, meeting_id, "transcript", rows)
+
+async def index_summary(db: AsyncSession, meeting_id: str, summary: str):
+    rows = [{"meeting_id": meeting_id, "kind": "summary", "ref": 0, "body": summary}] if summary else []
+    await _replace(db, meeting_id, "summary", rows)
+
+async def index_tasks(db: AsyncSession, meeting_id: str, tasks: Iterable[Tuple[int, Dict]]):
+    """Replace the meeting's indexed tasks, given as (task id, task dict) pairs"""
+    rows = [
+        {"meeting_id": meeting_id, "kind": "task", "ref": task_id, "speaker": task.get("assignee"),
+         "body": "\n".join(part for part in (task.get("title"), task.get("description")) if part)}
+        for task_id, task in tasks
+    ]
+    await _replace(db, meeting_id, "task", rows)
+
+async def _replace(db: AsyncSession, meeting_id: str, kind: str, rows: List[Dict]):
+    # Only the changed meeting is touched: an index range delete plus one bulk insert
+    await db.execute(delete(SearchDocument).where(SearchDocument.meeting_id == meeting_id, SearchDocument.kind == kind))
+    if rows:
+        await db.execute(insert(SearchDocument), rows)
+
+def _fts_query(query: str) -> Optional[str]:
+    """
+    Free text as an FTS5 expression: every word (or "quoted phrase") must
+    match, the last word also as a prefix. User input never reaches the
+    FTS5 query syntax unquoted.
+    """
+    terms = []
+    for phrase, word in _TERM.findall(query):
+        terms.append('"' + (phrase or word).replace('"', "") + '"')
+    if not terms:
+        return None
+    if not query.rstrip().endswith('"'):
+        terms[-1] += "*"
+    return " ".join(terms)
+
+def _highlight(snippet: Optional[str]) -> str:
+    escaped = html.escape(snippet or "")
+    return escaped.replace(_OPEN, "<mark>").replace(_CLOSE, "</mark>")
+
+async def search(db: AsyncSession, query: str, kind: Optional[str] = None, meeting_id: Optional[str] = None,
+                 limit: int = 20, offset: int = 0) -> Dict:
+    """
+    Ranked matches (best first) with highlighted snippets; fetches one
+    extra row to tell whether another page exists
+    """
+    filters = ""
+    params = {"limit": limit + 1, "offset": offset}
+    if kind:
+        filters += " AND d.kind = :kind"
+        params["kind"] = kind
+    if meeting_id:
+        filters += " AND d.meeting_id = :meeting_id"
+        params["meeting_id"] = meeting_id
+
+    if engine.dialect.name == "postgresql":
+        params.update(query=query, options=f"StartSel={_OPEN}, StopSel={_CLOSE}, MaxWords=32, MinWords=12, MaxFragments=1")
+        statement = f"""
+            SELECT d.meeting_id, d.kind, d.ref, d.speaker, d.start,
+                   ts_headline('english', d.body, q, :options) AS snippet,
+                   ts_rank_cd(d.tsv, q) AS score
+            FROM search_documents d, websearch_to_tsquery('english', :query) q
+            WHERE d.tsv @@ q{filters}
+            ORDER BY score DESC, d.id
+            LIMIT :limit OFFSET :offset
+        """
+    else:
+        match = _fts_query(query)
+        if match is None:
+            return {"items": [], "next_offset": None}
+        params["query"] = match
+        # bm25() is lower for better matches
+        statement = f"""
+            SELECT d.meeting_id, d.kind, d.ref, d.speaker, d.start,
+                   snippet(search_fts, 0, char(2), char(3), '…', 24) AS snippet,
+                   -bm25(search_fts) AS score
+            FROM search_fts JOIN search_documents d ON d.id = search_fts.rowid
+            WHERE search_fts MATCH :query{filters}
+            ORDER BY bm25(search_fts), d.id
+            LIMIT :limit OFFSET :offset
+        """
+
+    rows = (await db.execute(text(statement), params)).all()
+    has_more = len(rows) > limit
+    return {
+        "items": [
+            {
+                "meeting_id": row.meeting_id,
+                "kind": row.kind,
+                "ref": row.ref,
+                "speaker": row.speaker,
+                "start": row.start,
+                "snippet": _highlight(row.snippet),
+                "score": round(float(row.score), 6),
+            }
+            for row in rows[:limit]
+        ],
+        "next_offset": offset + limit if has_more else None,
+    }
+
+async def reindex_all(batch_size: int = 200) -> int:
+    """
+    Index every stored meeting from scratch (for databases created before
+    the search index); returns the number of meetings indexed
+    """
+    indexed = 0
+    last_id = 0
+    while True:
+        async with SessionLocal() as db:
+            meetings = (await db.execute(
+                select(Meeting.id, Meeting.meeting_id, Meeting.transcript, Meeting.summary)
+                .where(Meeting.id > last_id).order_by(Meeting.id).limit(batch_size)
+            )).all()
+            if not meetings:
+                return indexed
+            for meeting in meetings:
+                if meeting.transcript is not None:
+                    await index_transcript(db, meeting.meeting_id, Transcript.from_bytes(meeting.transcript))
+                await index_summary(db, meeting.meeting_id, meeting.summary)
+                tasks = (await db.execute(select(Task).where(Task.meeting_id == meeting.meeting_id))).scalars()
+                await index_tasks(db, meeting.meeting_id, [
+                    (task.id, {"title": task.title, "description": task.description, "assignee": task.assignee})
+                    for task in tasks
+                ])
+            await db.commit()
+        indexed += len(meetings)
+        last_id = meetings[-1].id
+
+async def ensure_search_index():
+    """Backfill the index once when meetings exist but nothing is indexed yet"""
+    async with SessionLocal() as db:
+        indexed = (await db.execute(select(SearchDocument.id).limit(1))).first()
+        stored = (await db.execute(select(Meeting.id).limit(1))).first()
+    if stored and not indexed:
+        print("Building search index for existing meetings")
+        print(f"Search index built for {await reindex_all()} meetings")
@@ -0,0 +1,63 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field
+from sqlalchemy.ext.asyncio import AsyncSession
+import os
+
+from core.components import ComponentRegistry, get_components
+from core.resilience import CircuitOpenError, RetryableError
+from db.database import get_db
+from nlu.chunking import estimate_tokens
+from search.index import SEARCH_KINDS, search
+from search.semantic import semantic_index_enabled
+
+router = APIRouter()
+
+class Question(BaseModel):
+    question: str = Field(..., min_length=1, max_length=1000)
+    k: int = Field(default_factory=lambda: int(os.getenv("SEMANTIC_TOP_K", "6")), ge=1, le=20)
+    meeting_ids: Optional[List[str]] = None
+
+@router.get("/search")
+async def search_meetings(q: str = Query(..., min_length=1, max_length=500), kind: Optional[str] = None,
+                          meeting_id: Optional[str] = None, limit: int = Query(20, ge=1, le=100),
+                          offset: int = Query(0, ge=0, le=1000), db: AsyncSession = Depends(get_db)):
+    """Full text search over transcript turns, summaries and tasks, best matches first"""
+    if kind is not None and kind not in SEARCH_KINDS:
+        raise HTTPException(status_code=400, detail=f"kind must be one of {', '.join(SEARCH_KINDS)}")
+    results = await search(db, q, kind=kind, meeting_id=meeting_id, limit=limit, offset=offset)
+    return {"query": q, **results}
+
+@router.post("/ask")
+async def ask(question: Question, components: ComponentRegistry = Depends(get_components)):
+    """
+    Answer a question across meetings: the k most similar passages are
+    retrieved locally and only those are sent to Gemini
+    """
+    if not semantic_index_enabled():
+        raise HTTPException(status_code=404, detail="Semantic index is disabled")
+    semantic_index = await components.get("semantic_index")
+    passages = await semantic_index.retrieve(question.question, k=question.k, meeting_ids=question.meeting_ids)
+    if not passages:
+        return {"question": question.question, "answer": None, "sources": [], "context_tokens": 0}
+
+    qa_agent = await components.get("qa_agent")
+    try:
+        answer = await qa_agent.answer(question.question, passages)
+    except CircuitOpenError as e:
+        return JSONResponse(status_code=503, content={"detail": str(e)}, headers={"Retry-After": str(int(e.retry_after))})
+    except RetryableError as e:
+        return JSONResponse(status_code=503, content={"detail": str(e)}, headers={"Retry-After": str(int(e.retry_after or 30))})
+    return {
+        "question": question.question,
+        "answer": answer,
+        "sources": [{"ref": i + 1, **passage} for i, passage in enumerate(passages)],
+        "context_tokens": sum(estimate_tokens(passage["text"]) for passage in passages),
+    }
+
+@router.get("/stats/semantic-index")
+async def semantic_index_stats(components: ComponentRegistry = Depends(get_components)):
+    if not semantic_index_enabled():
+        return {"enabled": False}
+    return (await components.get("semantic_index")).stats()
@@ -0,0 +1,267 @@
+from collections import defaultdict
+from typing import Dict, List, Optional
+from sqlalchemy import delete, select
+import asyncio
+import hashlib
+import os
+import time
+
+import numpy as np
+
+from db.database import DATABASE_URL, SessionLocal, Meeting, SemanticChunk
+from search.embeddings import Embedder
+from search.vectors import VectorIndex
+from transcripts.model import Transcript
+
+def semantic_index_enabled() -> bool:
+    return os.getenv("SEMANTIC_INDEX_ENABLED", "true").lower() == "true"
+
+def default_index_dir() -> str:
+    """SEMANTIC_INDEX_DIR, else next to the SQLite database file"""
+    configured = os.getenv("SEMANTIC_INDEX_DIR")
+    if configured:
+        return configured
+    if DATABASE_URL.startswith("sqlite:///") and ":memory:" not in DATABASE_URL:
+        return DATABASE_URL[len("sqlite:///"):] + ".vectors"
+    return "./vector_index"
+
+def chunk_meeting(transcript: Optional[Transcript], summary: Optional[str], max_chars: int) -> List[Dict]:
+    """
+    Passages to embed: consecutive speaker turns packed up to max_chars
+    (each passage keeps the start time of its first turn), and the summary
+    split at paragraph boundaries the same way
+    """
+    chunks = []
+
+    def pack(kind: str, units):
+        lines, start = [], None
+        for unit_start, line in units:
+            if lines and sum(len(existing) + 1 for existing in lines) + len(line) > max_chars:
+                chunks.append({"kind": kind, "start": start, "body": "\n".join(lines)})
+                lines = []
+            if not lines:
+                start = unit_start
+            lines.append(line)
+        if lines:
+            chunks.append({"kind": kind, "start": start, "body": "\n".join(lines)})
+
+    if transcript is not None:
+        pack("transcript", (
+            (turn.start, f"{turn.speaker}: {turn.text}" if turn.speaker else turn.text)
+            for turn in transcript.merged(max_chars=max_chars).segments
+        ))
+    if summary:
+        pack("summary", ((None, paragraph.strip()) for paragraph in summary.split("\n\n") if paragraph.strip()))
+
+    for chunk in chunks:
+        chunk["hash"] = hashlib.sha256(f"{chunk['kind']}\x00{chunk['body']}".encode("utf-8")).hexdigest()
+    return chunks
+
+class SemanticIndex:
+    """
+    Embedding retrieval over meeting transcripts and summaries.
+
+    Passages are embedded locally (search.embeddings); their text, meeting
+    and quantized vector live in the semantic_chunks table, whose row id is
+    the passage's slot in a memory-mapped vector index on each host
+    (search.vectors). A vector is written to the files only after its row
+    is committed, and every SEMANTIC_SYNC_SECONDS the files are brought in
+    line with the table, so passages indexed or removed by other instances
+    show up here too. Re-indexing a meeting only embeds passages whose
+    text changed and removes those that disappeared.
+    """
+
+    def __init__(self, directory: Optional[str] = None, embedder: Optional[Embedder] = None,
+                 chunk_chars: Optional[int] = None):
+        self.directory = directory or default_index_dir()
+        self.embedder = embedder or Embedder()
+        self.chunk_chars = chunk_chars or int(os.getenv("SEMANTIC_CHUNK_CHARS", "1000"))
+        self.sync_seconds = float(os.getenv("SEMANTIC_SYNC_SECONDS", "60"))
+        self.index: Optional[VectorIndex] = None
+        self._synced_at = 0.0
+        self._ready_lock = asyncio.Lock()
+        self._write_lock = asyncio.Lock()
+        self._sync_lock = asyncio.Lock()
+
+    async def warm_up(self):
+        await self._ready()
+
+    async def _ready(self) -> VectorIndex:
+        if self.index is not None:
+            if time.monotonic() - self._synced_at > self.sync_seconds:
+                async with self._sync_lock:
+                    if time.monotonic() - self._synced_at > self.sync_seconds:
+                        await self._sync(self.index)
+            return self.index
+        async with self._ready_lock:
+            if self.index is None:
+                await asyncio.to_thread(self.embedder.load)
+                index = await asyncio.to_thread(VectorIndex, self.directory, self.embedder.dim, self.embedder.model_name)
+                if index.reset_needed:
+                    async with SessionLocal() as db:
+                        await db.execute(delete(SemanticChunk))
+                        await db.commit()
+                await self._sync(index)
+                self.index = index
+        return self.index
+
+    async def _sync(self, index: VectorIndex):
+        """
+        Bring this host's index files in line with semantic_chunks: free the
+        vectors whose rows are gone, load those indexed by other instances
+        """
+        async with SessionLocal() as db:
+            slots = (await db.execute(select(SemanticChunk.slot))).scalars().all()
+        missing = await asyncio.to_thread(index.reconcile, slots)
+        for start in range(0, len(missing), 1000):
+            async with SessionLocal() as db:
+                rows = (await db.execute(
+                    select(SemanticChunk.slot, SemanticChunk.vector)
+                    .where(SemanticChunk.slot.in_(missing[start:start + 1000]), SemanticChunk.vector.is_not(None))
+                )).all()
+            if rows:
+                codes = np.frombuffer(b"".join(row.vector for row in rows), dtype=np.int8)
+                await asyncio.to_thread(index.put, [row.slot for row in rows], codes)
+        if missing:
+            print(f"Loaded {len(missing)} vectors indexed by other instances")
+        self._synced_at = time.monotonic()
+
+    async def index_meeting(self, meeting_id: str, transcript: Optional[Transcript], summary: Optional[str] = None) -> int:
+        """Bring the meeting's passages up to date; returns the number embedded"""
+        index = await self._ready()
+        chunks = chunk_meeting(transcript, summary, self.chunk_chars)
+
+        async with self._write_lock:
+            async with SessionLocal() as db:
+                rows = (await db.execute(
+                    select(SemanticChunk.slot, SemanticChunk.content_hash).where(SemanticChunk.meeting_id == meeting_id)
+                )).all()
+            existing = defaultdict(list)
+            for row in rows:
+                existing[row.content_hash].append(row.slot)
+
+            added = []
+            for chunk in chunks:
+                if existing.get(chunk["hash"]):
+                    existing[chunk["hash"]].pop()
+                else:
+                    added.append(chunk)
+            removed = [slot for slots in existing.values() for slot in slots]
+            if not added and not removed:
+                return 0
+
+            # Embedding happens outside any transaction
+            codes = np.zeros((0, index.dim), dtype=np.int8)
+            if added:
+                vectors = await asyncio.to_thread(self.embedder.embed, [chunk["body"] for chunk in added])
+                codes = VectorIndex.quantize(vectors)
+            rows = [
+                SemanticChunk(meeting_id=meeting_id, kind=chunk["kind"], start=chunk["start"],
+                              content_hash=chunk["hash"], body=chunk["body"], vector=code.tobytes())
+                for chunk, code in zip(added, codes)
+            ]
+            async with SessionLocal() as db:
+                if removed:
+                    await db.execute(delete(SemanticChunk).where(SemanticChunk.slot.in_(removed)))
+                db.add_all(rows)
+                await db.commit()
+            # The database assigns the slots; the files follow once the rows are committed
+            await asyncio.to_thread(index.put, [row.slot for row in rows], codes)
+            if removed:
+                await asyncio.to_thread(index.delete, removed)
+        return len(added)
+
+    async def remove_meeting(self, meeting_id: str):
+        index = await self._ready()
+        async with self._write_lock:
+            async with SessionLocal() as db:
+                slots = (await db.execute(
+                    select(SemanticChunk.slot).where(SemanticChunk.meeting_id == meeting_id)
+                )).scalars().all()
+                await db.execute(delete(SemanticChunk).where(SemanticChunk.meeting_id == meeting_id))
+                await db.commit()
+            await asyncio.to_thread(index.delete, slots)
+
+    async def retrieve(self, question: str, k: int = 6, meeting_ids: Optional[List[str]] = None) -> List[Dict]:
+        """
+        The k passages closest to the question, best first, optionally only
+        from the given meetings
+        """
+        index = await self._ready()
+        query = (await asyncio.to_thread(self.embedder.embed, [question]))[0]
+
+        restrict = None
+        if meeting_ids:
+            async with SessionLocal() as db:
+                restrict = (await db.execute(
+                    select(SemanticChunk.slot).where(SemanticChunk.meeting_id.in_(meeting_ids))
+                )).scalars().all()
+            if not restrict:
+                return []
+        matches = await asyncio.to_thread(index.search, query, k, restrict)
+        if not matches:
+            return []
+
+        async with SessionLocal() as db:
+            rows = {
+                row.slot: row
+                for row in (await db.execute(
+                    select(SemanticChunk).where(SemanticChunk.slot.in_([slot for slot, _ in matches]))
+                )).scalars()
+            }
+        return [
+            {
+                "meeting_id": rows[slot].meeting_id,
+                "kind": rows[slot].kind,
+                "start": rows[slot].start,
+                "text": rows[slot].body,
+                "score": round(score, 4),
+            }
+            for slot, score in matches
+            if slot in rows
+        ]
+
+    async def reindex_all(self, batch_size: int = 50) -> int:
+        """Index every stored meeting; returns the number of meetings indexed"""
+        indexed = 0
+        last_id = 0
+        while True:
+            async with SessionLocal() as db:
+                meetings = (await db.execute(
+                    select(Meeting.id, Meeting.meeting_id, Meeting.transcript, Meeting.summary)
+                    .where(Meeting.id > last_id).order_by(Meeting.id).limit(batch_size)
+                )).all()
+            if not meetings:
+                return indexed
+            for meeting in meetings:
+                transcript = Transcript.from_bytes(meeting.transcript) if meeting.transcript is not None else None
+                await self.index_meeting(meeting.meeting_id, transcript, meeting.summary)
+            indexed += len(meetings)
+            last_id = meetings[-1].id
+
+    async def ensure_built(self):
+        """Backfill once when meetings exist but nothing is embedded yet"""
+        await self._ready()
+        async with SessionLocal() as db:
+            indexed = (await db.execute(select(SemanticChunk.slot).limit(1))).first()
+            stored = (await db.execute(select(Meeting.id).limit(1))).first()
+        if stored and not indexed:
+            print("Building semantic index for existing meetings")
+            print(f"Semantic index built for {await self.reindex_all()} meetings")
+
+    def stats(self) -> Dict:
+        if self.index is None:
+            return {"loaded": False}
+        return {"loaded": True, "model": self.embedder.model_name, **self.index.stats()}
+
+    def close(self):
+        if self.index is not None:
+            self.index.close()
+
+async def ensure_semantic_index(components):
+    """Load the index and embed meetings stored before it existed (startup task)"""
+    try:
+        semantic_index = await components.get("semantic_index")
+        await semantic_index.ensure_built()
+    except Exception as e:
+        print(f"Semantic index unavailable: {str(e)}")
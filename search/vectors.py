@@ -0,0 +1,312 @@
+from contextlib import contextmanager
+from typing import Iterable, List, Optional, Tuple
+import json
+import os
+import threading
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of one process are serialized
+    fcntl = None
+
+# Slot states in the assignment file; clustered slots hold their list number
+FREE = -2
+UNCLUSTERED = -1
+
+class VectorIndex:
+    """
+    Approximate nearest neighbour index over unit-length embeddings, kept
+    in memory-mapped files in one directory:
+
+    - vectors.i8: one int8-quantized vector per slot (dim bytes each)
+    - assign.i32: per slot, its inverted list, UNCLUSTERED or FREE
+    - centroids.npy: the coarse quantizer (spherical k-means centroids)
+    - meta.json: dimension, embedding model and a change counter
+
+    Slots are chosen by the caller: search.semantic uses the row id of the
+    passage in the database, which also holds the authoritative copy of
+    each vector, so the files are a per-host replica that reconcile()
+    brings back in line. Until enough vectors exist to train the quantizer
+    every search is exact; after that a search scores only the vectors in
+    the nprobe lists whose centroids are closest to the query.
+
+    Methods are blocking. Threads are serialized by a lock and processes
+    sharing the directory by an flock on index.lock (shared for searches);
+    every call first picks up the changes other processes made.
+    """
+
+    def __init__(self, directory: str, dim: int, model: str, nprobe: Optional[int] = None,
+                 train_min: Optional[int] = None, max_lists: int = 1024):
+        self.directory = directory
+        self.dim = dim
+        self.model = model
+        self.nprobe = nprobe or int(os.getenv("SEMANTIC_NPROBE", "16"))
+        self.train_min = train_min or int(os.getenv("SEMANTIC_TRAIN_MIN", "4096"))
+        self.max_lists = max_lists
+        self._lock = threading.Lock()
+        self._lists = None  # (slots sorted by list, list start offsets), rebuilt lazily
+        self._generation = None
+        self.reset_needed = False
+        os.makedirs(self.directory, exist_ok=True)
+        self._lock_file = open(self._path("index.lock"), "a+")
+        with self._locked():
+            pass
+
+    # --- Files -------------------------------------------------------------
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    @contextmanager
+    def _locked(self, exclusive: bool = True):
+        with self._lock:
+            if fcntl is not None:
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                self._refresh_locked()
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _read_meta(self) -> dict:
+        if not os.path.exists(self._path("meta.json")):
+            return {}
+        with open(self._path("meta.json")) as f:
+            return json.load(f)
+
+    def _refresh_locked(self):
+        """Open the files, or pick up what another process changed since the last call"""
+        meta = self._read_meta()
+        if self._generation is None:
+            self._open_locked(meta)
+            return
+        if meta.get("generation", 0) == self._generation:
+            return
+        capacity = os.path.getsize(self._path("assign.i32")) // 4
+        if capacity != self.capacity:
+            self._map(capacity)
+        if meta.get("trained_on", 0) != self.trained_on:
+            self._load_centroids(meta)
+        self._lists = None
+        self._generation = meta.get("generation", 0)
+
+    def _open_locked(self, meta: dict):
+        if meta and (meta.get("dim") != self.dim or meta.get("model") != self.model):
+            # Vectors from another embedding model are not comparable
+            print(f"Embedding model changed ({meta.get('model')} -> {self.model}), clearing vector index")
+            for name in ("vectors.i8", "assign.i32", "centroids.npy"):
+                if os.path.exists(self._path(name)):
+                    os.remove(self._path(name))
+            meta = {"generation": meta.get("generation", 0)}
+            self.reset_needed = True
+
+        if not os.path.exists(self._path("assign.i32")):
+            self._grow(0, 1024)
+        self._map(os.path.getsize(self._path("assign.i32")) // 4)
+        self._load_centroids(meta)
+        self._generation = meta.get("generation", 0)
+        self._commit_locked()
+
+    def _load_centroids(self, meta: dict):
+        self.centroids = None
+        self.trained_on = 0
+        if os.path.exists(self._path("centroids.npy")):
+            self.centroids = np.load(self._path("centroids.npy"))
+            self.trained_on = meta.get("trained_on", 0)
+
+    def _map(self, capacity: int):
+        self.capacity = capacity
+        self.vectors = np.memmap(self._path("vectors.i8"), dtype=np.int8, mode="r+", shape=(capacity, self.dim))
+        self.assign = np.memmap(self._path("assign.i32"), dtype=np.int32, mode="r+", shape=(capacity,))
+
+    def _grow(self, capacity: int, new_capacity: int):
+        """Extend both files; new slots start out FREE"""
+        with open(self._path("vectors.i8"), "ab") as f:
+            f.truncate(new_capacity * self.dim)
+        with open(self._path("assign.i32"), "ab") as f:
+            f.write(np.full(new_capacity - capacity, FREE, dtype=np.int32).tobytes())
+
+    def _commit_locked(self):
+        """Write the changes through and tell other processes about them"""
+        self.vectors.flush()
+        self.assign.flush()
+        self._generation += 1
+        with open(self._path("meta.json"), "w") as f:
+            json.dump({"dim": self.dim, "model": self.model, "trained_on": self.trained_on,
+                       "generation": self._generation}, f)
+
+    def flush(self):
+        with self._lock:
+            self.vectors.flush()
+            self.assign.flush()
+
+    def close(self):
+        self.flush()
+        self._lock_file.close()
+
+    # --- Updates -----------------------------------------------------------
+
+    @staticmethod
+    def quantize(vectors: np.ndarray) -> np.ndarray:
+        """int8 codes of unit-length float vectors, as stored in the files"""
+        return np.clip(np.rint(np.asarray(vectors, dtype=np.float32) * 127), -127, 127).astype(np.int8)
+
+    def put(self, slots: Iterable[int], codes: np.ndarray):
+        """Store quantized vectors (see quantize) in the given slots"""
+        slots = np.fromiter(slots, dtype=np.int64)
+        if not len(slots):
+            return
+        codes = np.asarray(codes, dtype=np.int8).reshape(len(slots), self.dim)
+        with self._locked():
+            needed = int(slots.max()) + 1
+            if needed > self.capacity:
+                capacity = self.capacity
+                new_capacity = max(capacity * 2, needed)
+                self.vectors.flush()
+                self.assign.flush()
+                self._grow(capacity, new_capacity)
+                self._map(new_capacity)
+            self.vectors[slots] = codes
+            if self.centroids is not None:
+                self.assign[slots] = self._nearest_list(codes.astype(np.float32) / 127)
+            else:
+                self.assign[slots] = UNCLUSTERED
+            self._lists = None
+
+            live = int(np.count_nonzero(self.assign[:] != FREE))
+            if live >= self.train_min and live >= 4 * max(self.trained_on, self.train_min // 4):
+                self._train(live)
+            self._commit_locked()
+
+    def delete(self, slots: Iterable[int]):
+        slots = np.fromiter(slots, dtype=np.int64)
+        if not len(slots):
+            return
+        with self._locked():
+            self._delete_locked(slots[slots < self.capacity])
+            self._commit_locked()
+
+    def _delete_locked(self, slots: np.ndarray):
+        self.assign[slots] = FREE
+        self.vectors[slots] = 0
+        self._lists = None
+
+    def reconcile(self, live_slots: Iterable[int]) -> List[int]:
+        """
+        Free every slot below the highest live slot that is not live (its
+        row was deleted, or its vector written by a process that then
+        failed); returns the live slots these files are missing.
+        Slots above the highest live one are newer than the caller's
+        snapshot of live_slots and are left alone.
+        """
+        live = np.unique(np.fromiter(live_slots, dtype=np.int64))
+        with self._locked():
+            held = live[live < self.capacity]
+            keep = np.zeros(self.capacity, dtype=bool)
+            keep[held] = True
+            keep[(int(live[-1]) + 1 if len(live) else self.capacity):] = True
+            orphans = np.flatnonzero((self.assign[:] != FREE) & ~keep)
+            if len(orphans):
+                print(f"Freeing {len(orphans)} orphaned vectors")
+                self._delete_locked(orphans)
+                self._commit_locked()
+            missing = np.concatenate([held[self.assign[held] == FREE], live[live >= self.capacity]])
+        return missing.tolist()
+
+    # --- Coarse quantizer --------------------------------------------------
+
+    def _scores(self, slots: np.ndarray, query: np.ndarray) -> np.ndarray:
+        # int8 rows are cast in blocks so a large list never materializes as float32 at once
+        scores = np.empty(len(slots), dtype=np.float32)
+        for start in range(0, len(slots), 65536):
+            block = slots[start:start + 65536]
+            scores[start:start + len(block)] = self.vectors[block].astype(np.float32) @ query
+        return scores / 127
+
+    def _nearest_list(self, vectors: np.ndarray) -> np.ndarray:
+        return np.argmax(vectors @ self.centroids.T, axis=1).astype(np.int32)
+
+    def _train(self, live: int, iterations: int = 10):
+        """
+        Spherical k-means over a sample of the live vectors, then assign
+        every vector to its nearest centroid
+        """
+        nlist = min(self.max_lists, max(16, int(np.sqrt(live))))
+        print(f"Training vector index: {live} vectors, {nlist} lists")
+        slots = np.flatnonzero(self.assign[:] != FREE)
+        rng = np.random.default_rng(0)
+        sample = rng.choice(slots, size=min(len(slots), nlist * 64), replace=False)
+        sample.sort()
+        data = self.vectors[sample].astype(np.float32) / 127
+
+        centroids = data[rng.choice(len(data), size=nlist, replace=False)]
+        for _ in range(iterations):
+            labels = np.argmax(data @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, data)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            # Empty clusters keep their previous centroid
+            centroids = np.where(norms > 0, sums / np.maximum(norms, 1e-12), centroids)
+
+        self.centroids = centroids.astype(np.float32)
+        for start in range(0, len(slots), 65536):
+            block = slots[start:start + 65536]
+            self.assign[block] = self._nearest_list(self.vectors[block].astype(np.float32) / 127)
+        np.save(self._path("centroids.npy"), self.centroids)
+        self.trained_on = live
+        self._lists = None
+
+    def _inverted_lists(self) -> Tuple[np.ndarray, np.ndarray]:
+        if self._lists is None:
+            order = np.argsort(self.assign[:], kind="stable")
+            bounds = np.searchsorted(self.assign[:][order], np.arange(-2, len(self.centroids) + 1))
+            self._lists = (order, bounds)
+        return self._lists
+
+    # --- Search ------------------------------------------------------------
+
+    def search(self, query: np.ndarray, k: int, slots: Optional[Iterable[int]] = None) -> List[Tuple[int, float]]:
+        """
+        (slot, cosine similarity) of the k best matches, best first. With
+        slots, only those are scored, exactly.
+        """
+        query = np.asarray(query, dtype=np.float32).reshape(self.dim)
+        with self._locked(exclusive=False):
+            if slots is not None:
+                candidates = np.fromiter(slots, dtype=np.int64)
+                # Rows committed elsewhere may not have reached this host's files yet
+                candidates = candidates[candidates < self.capacity]
+                candidates = candidates[self.assign[candidates] != FREE]
+            elif self.centroids is None:
+                candidates = np.flatnonzero(self.assign[:] != FREE)
+            else:
+                order, bounds = self._inverted_lists()
+                probes = np.argsort(-(self.centroids @ query))[:self.nprobe]
+                # bounds[i + 2] is where list i starts (FREE and UNCLUSTERED sort first)
+                parts = [order[bounds[p + 2]:bounds[p + 3]] for p in probes]
+                parts.append(order[bounds[1]:bounds[2]])  # not yet clustered
+                candidates = np.concatenate(parts)
+            if not len(candidates):
+                return []
+            scores = self._scores(candidates, query)
+
+        if len(candidates) > k:
+            top = np.argpartition(-scores, k)[:k]
+        else:
+            top = np.arange(len(candidates))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(candidates[i]), float(scores[i])) for i in top]
+
+    def stats(self):
+        with self._locked(exclusive=False):
+            live = int(np.count_nonzero(self.assign[:] != FREE))
+        return {
+            "vectors": live,
+            "capacity": self.capacity,
+            "lists": 0 if self.centroids is None else len(self.centroids),
+            "nprobe": self.nprobe,
+            "bytes": self.capacity * (self.dim + 4),
+        }
@@ -0,0 +1,262 @@
+from typing import Dict, Iterable, List, Optional
+import json
+import re
+import sys
+import zlib
+
+_TIMING_LINE = re.compile(
+    r"^((?:\d{1,2}:)?\d{1,2}:\d{2}(?:[.,]\d{1,3})?)\s*-->\s*((?:\d{1,2}:)?\d{1,2}:\d{2}(?:[.,]\d{1,3})?)"
+)
+_CUE_NUMBER = re.compile(r"^\d+$")
+# A header or NOTE/STYLE/REGION block: the keyword alone or followed by a space or tab
+_BLOCK_START = re.compile(r"^(?:WEBVTT|NOTE|STYLE|REGION)(?:[ \t]|$)")
+_SPEAKER_LINE = re.compile(r"^([^:\n]{1,60}):\s+(.*)$")
+_VOICE_SPAN = re.compile(r"<v(?:\.[^\s>]*)?\s+([^>]+)>(.*?)(?:</v>|(?=<v[\s.])|$)")
+_TAG = re.compile(r"</?[^>]+>")
+
+FORMAT_VERSION = 1
+
+def _parse_timestamp(value: str) -> float:
+    seconds = 0.0
+    for part in value.replace(",", ".").split(":"):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+def _split_speakers(line: str) -> List[tuple]:
+    """(speaker, text) pairs for one payload line; speaker is None when unlabelled"""
+    voices = _VOICE_SPAN.findall(line)
+    if voices:
+        return [(speaker.strip(), _TAG.sub("", text)) for speaker, text in voices]
+    line = _TAG.sub("", line)
+    labelled = _SPEAKER_LINE.match(line)
+    if labelled:
+        return [(labelled.group(1).strip(), labelled.group(2))]
+    return [(None, line)]
+
+class Segment:
+    """One timed utterance; start/end are seconds, or None for untimed text"""
+    __slots__ = ("speaker", "start", "end", "text")
+
+    def __init__(self, speaker: Optional[str], start: Optional[float], end: Optional[float], text: str):
+        # Interned so the many segments of one speaker share a single string
+        self.speaker = sys.intern(speaker) if speaker else None
+        self.start = start
+        self.end = end
+        self.text = text
+
+    def __repr__(self):
+        return f"Segment({self.speaker!r}, {self.start}, {self.end}, {self.text!r})"
+
+class Transcript:
+    """
+    A parsed meeting transcript: an ordered list of compact segments.
+
+    Built from platform VTT/SRT files, Whisper segment output or plain
+    "Speaker: text" lines. merged() collapses consecutive cues of the same
+    speaker into turns, render() produces the token-efficient text sent to
+    the LLM agents, and to_bytes()/from_bytes() give the compressed form
+    stored in the database.
+    """
+
+    def __init__(self, segments: Optional[Iterable[Segment]] = None, language: Optional[str] = None):
+        self.segments: List[Segment] = list(segments or [])
+        self.language = language
+
+    def __len__(self):
+        return len(self.segments)
+
+    @property
+    def speakers(self) -> List[str]:
+        seen = {}
+        for segment in self.segments:
+            if segment.speaker is not None:
+                seen.setdefault(segment.speaker, None)
+        return list(seen)
+
+    @property
+    def duration(self) -> Optional[float]:
+        ends = [segment.end for segment in self.segments if segment.end is not None]
+        return max(ends) if ends else None
+
+    @property
+    def text(self) -> str:
+        return " ".join(segment.text for segment in self.segments)
+
+    # --- Parsing -----------------------------------------------------------
+
+    @classmethod
+    def parse(cls, raw: str) -> "Transcript":
+        """Parse WebVTT, SRT or plain text, whichever raw looks like"""
+        if not raw:
+            return cls()
+        if any(_TIMING_LINE.match(line.strip()) for line in raw.splitlines()[:50]):
+            return cls.from_vtt(raw)
+        return cls.from_text(raw)
+
+    @classmethod
+    def from_vtt(cls, raw: str) -> "Transcript":
+        """
+        Parse WebVTT (Zoom, Teams) or SRT cues. Speakers come from <v> voice
+        tags or a "Name: " prefix; cue numbers, headers, NOTE/STYLE blocks
+        and inline markup are dropped.
+        """
+        segments = []
+        start = end = None
+        speaker = None
+        skipping_block = False
+        for raw_line in raw.splitlines():
+            line = raw_line.strip()
+            if not line:
+                start = end = None
+                skipping_block = False
+                continue
+            if skipping_block:
+                continue
+            if start is None and _BLOCK_START.match(line):
+                skipping_block = True
+                continue
+            timing = _TIMING_LINE.match(line)
+            if timing:
+                start, end = _parse_timestamp(timing.group(1)), _parse_timestamp(timing.group(2))
+                speaker = None
+                continue
+            if start is None:
+                # Cue identifier (number or name) before the timing line
+                continue
+            for cue_speaker, text in _split_speakers(line):
+                text = " ".join(text.split())
+                if not text:
+                    continue
+                # Later lines of a cue without a label belong to its speaker
+                speaker = cue_speaker or speaker
+                segments.append(Segment(speaker, start, end, text))
+        return cls(segments)
+
+    @classmethod
+    def from_text(cls, raw: str) -> "Transcript":
+        """Untimed "Speaker: text" (or unlabelled) lines"""
+        segments = []
+        for raw_line in raw.splitlines():
+            line = raw_line.strip()
+            if not line or _CUE_NUMBER.match(line):
+                continue
+            for speaker, text in _split_speakers(line):
+                text = " ".join(text.split())
+                if not text:
+                    continue
+                # Unlabelled lines continue the current speaker's turn
+                if speaker is None and segments and segments[-1].speaker is not None:
+                    speaker = segments[-1].speaker
+                segments.append(Segment(speaker, None, None, text))
+        return cls(segments)
+
+    @classmethod
+    def from_whisper(cls, result: Dict) -> "Transcript":
+        """From {"text", "language", "segments": [{"start", "end", "text"}]}"""
+        segments = [
+            Segment(segment.get("speaker"), segment["start"], segment["end"], " ".join(segment["text"].split()))
+            for segment in result.get("segments") or []
+            if segment["text"].strip()
+        ]
+        if not segments and (result.get("text") or "").strip():
+            segments = [Segment(None, None, None, " ".join(result["text"].split()))]
+        return cls(segments, language=result.get("language"))
+
+    # --- Turns and rendering -----------------------------------------------
+
+    def merged(self, max_gap_seconds: float = 2.0, max_chars: int = 2000) -> "Transcript":
+        """
+        Merge consecutive segments into speaker turns. Labelled segments of
+        the same speaker always merge; unlabelled timed segments (Whisper)
+        merge while the pause between them is at most max_gap_seconds. No
+        turn grows beyond max_chars.
+        """
+        turns: List[Segment] = []
+        for segment in self.segments:
+            previous = turns[-1] if turns else None
+            if previous is not None and len(previous.text) + len(segment.text) < max_chars:
+                if segment.speaker is not None:
+                    same = segment.speaker == previous.speaker
+                else:
+                    same = (
+                        previous.speaker is None
+                        and previous.end is not None and segment.start is not None
+                        and segment.start - previous.end <= max_gap_seconds
+                    )
+                if same:
+                    previous.text += " " + segment.text
+                    if segment.end is not None:
+                        previous.end = segment.end
+                    continue
+            turns.append(Segment(segment.speaker, segment.start, segment.end, segment.text))
+        return Transcript(turns, language=self.language)
+
+    def render(self, timestamps: bool = False) -> str:
+        """
+        Prompt text: one "Speaker: text" line per segment, with no cue
+        numbers or timing lines. With timestamps, each line is prefixed by
+        a coarse [mm:ss] start time.
+        """
+        lines = []
+        for segment in self.segments:
+            line = f"{segment.speaker}: {segment.text}" if segment.speaker else segment.text
+            if timestamps and segment.start is not None:
+                minutes, seconds = divmod(int(segment.start), 60)
+                line = f"[{minutes:02d}:{seconds:02d}] {line}"
+            lines.append(line)
+        return "\n".join(lines)
+
+    # --- Storage -----------------------------------------------------------
+
+    def to_dict(self) -> Dict:
+        """
+        Compact form: speakers listed once and referenced by index, times in
+        integer milliseconds (-1 when untimed)
+        """
+        speakers = self.speakers
+        index = {speaker: i for i, speaker in enumerate(speakers)}
+        return {
+            "v": FORMAT_VERSION,
+            "language": self.language,
+            "speakers": speakers,
+            "segments": [
+                [
+                    index.get(segment.speaker, -1),
+                    round(segment.start * 1000) if segment.start is not None else -1,
+                    round(segment.end * 1000) if segment.end is not None else -1,
+                    segment.text
+                ]
+                for segment in self.segments
+            ]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Transcript":
+        speakers = data.get("speakers") or []
+        return cls(
+            [
+                Segment(
+                    speakers[speaker] if speaker >= 0 else None,
+                    start / 1000 if start >= 0 else None,
+                    end / 1000 if end >= 0 else None,
+                    text
+                )
+                for speaker, start, end, text in data.get("segments") or []
+            ],
+            language=data.get("language")
+        )
+
+    def to_bytes(self) -> bytes:
+        payload = json.dumps(self.to_dict(), separators=(",", ":"), ensure_ascii=False)
+        return zlib.compress(payload.encode("utf-8"), 9)
+
+    @classmethod
+    def from_bytes(cls, data) -> "Transcript":
+        """Inverse of to_bytes(); a legacy plain-text value is parsed as raw text"""
+        if isinstance(data, str):
+            return cls.parse(data)
+        try:
+            payload = zlib.decompress(data)
+        except zlib.error:
+            return cls.parse(bytes(data).decode("utf-8", errors="replace"))
+        return cls.from_dict(json.loads(payload))
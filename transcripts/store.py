@@ -0,0 +1,102 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+import re
+
+from db.database import SessionLocal, Meeting, Task
+from search.index import index_summary, index_tasks, index_transcript
+from transcripts.model import Transcript
+
+def task_key(task: Dict) -> str:
+    """Normalized title and assignee, the identity of a task across re-runs"""
+    normalize = lambda value: re.sub(r"[^a-z0-9]+", " ", (value or "").lower()).strip()
+    return f"{normalize(task.get('title'))}|{normalize(task.get('assignee'))}"
+
+def _parse_due_date(value) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(str(value).strip()[:10])
+    except (TypeError, ValueError):
+        # LLM output such as "Not specified" or "next Friday"
+        return None
+
+async def upsert_tasks(db: AsyncSession, meeting_id: str, tasks: List) -> Dict[str, Tuple[int, str]]:
+    """
+    Upsert a meeting's tasks by key within the caller's transaction: new
+    tasks are inserted in one bulk INSERT, changed ones updated and tasks
+    no longer extracted deleted, and the search index follows. Returns
+    key -> (task id, status); existing tasks keep their status.
+    """
+    existing = {
+        row.key: row
+        for row in (await db.execute(select(Task).where(Task.meeting_id == meeting_id))).scalars()
+    }
+    saved = {}
+    by_key = {}
+    new_rows = []
+    for task in tasks:
+        task = task.dict() if hasattr(task, "dict") else task
+        key = task_key(task)
+        if key in saved:
+            continue
+        by_key[key] = task
+        values = {
+            "title": task.get("title"),
+            "assignee": task.get("assignee"),
+            "description": task.get("description"),
+            "due_date": _parse_due_date(task.get("due_date")),
+        }
+        row = existing.pop(key, None)
+        if row is None:
+            new_rows.append({"meeting_id": meeting_id, "key": key, "status": "open", **values})
+            saved[key] = None
+            continue
+        for name, value in values.items():
+            if getattr(row, name) != value:
+                setattr(row, name, value)
+        saved[key] = (row.id, row.status)
+
+    if new_rows:
+        inserted = await db.execute(insert(Task).returning(Task.key, Task.id), new_rows)
+        for key, task_id in inserted.all():
+            saved[key] = (task_id, "open")
+    if existing:
+        await db.execute(delete(Task).where(Task.id.in_([row.id for row in existing.values()])))
+    await index_tasks(db, meeting_id, [(saved[key][0], task) for key, task in by_key.items()])
+    return saved
+
+class TranscriptStore:
+    """
+    Persists a meeting's parsed transcript (compressed), summary and tasks,
+    creating the Meeting row on first write and updating the search index
+    in the same transaction
+    """
+
+    async def save(self, meeting_id: str, transcript: Optional[Transcript] = None, summary: Optional[str] = None,
+                   tasks: Optional[List] = None):
+        """Write whatever is given in one transaction"""
+        async with SessionLocal() as db:
+            meeting = (await db.execute(select(Meeting).where(Meeting.meeting_id == meeting_id))).scalar_one_or_none()
+            if meeting is None:
+                meeting = Meeting(meeting_id=meeting_id)
+                db.add(meeting)
+            if transcript is not None:
+                meeting.transcript = transcript.to_bytes()
+                await index_transcript(db, meeting_id, transcript)
+            if summary is not None:
+                meeting.summary = summary
+                await index_summary(db, meeting_id, summary)
+            if tasks is not None:
+                await upsert_tasks(db, meeting_id, tasks)
+            await db.commit()
+
+    async def load(self, meeting_id: str) -> Optional[Transcript]:
+        async with SessionLocal() as db:
+            data = (await db.execute(
+                select(Meeting.transcript).where(Meeting.meeting_id == meeting_id)
+            )).scalar_one_or_none()
+        if data is None:
+            return None
+        return Transcript.from_bytes(data)
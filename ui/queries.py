@@ -0,0 +1,120 @@
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+import base64
+import hashlib
+import json
+
+from db.database import Meeting, Task
+
+class InvalidCursor(ValueError):
+    """Raised for a pagination cursor that was not issued by this API"""
+
+def encode_cursor(values: List) -> str:
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    """A (timestamp or None, id) keyset position"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        stamp, row_id = json.loads(raw)
+        return (datetime.fromisoformat(stamp) if stamp is not None else None), int(row_id)
+    except (ValueError, TypeError):
+        raise InvalidCursor("Invalid cursor")
+
+def page_etag(page: Dict, variant: str) -> str:
+    """Strong validator of a page's content (variant keeps HTML and JSON apart)"""
+    digest = hashlib.sha256(json.dumps(page, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    return f'"{variant}-{digest[:32]}"'
+
+def _task_to_dict(task: Task) -> Dict:
+    return {
+        "id": task.id,
+        "meeting_id": task.meeting_id,
+        "title": task.title,
+        "assignee": task.assignee,
+        "description": task.description,
+        "due_date": task.due_date.date().isoformat() if task.due_date else None,
+        "status": task.status,
+    }
+
+async def list_meetings(db: AsyncSession, cursor: Optional[str] = None, limit: int = 20) -> Dict:
+    """
+    Newest meetings first, keyset-paginated on (created_at, id), each with
+    its tasks (loaded in one query for the whole page)
+    """
+    query = select(Meeting.id, Meeting.meeting_id, Meeting.summary, Meeting.created_at)
+    if cursor:
+        created_at, meeting_pk = decode_cursor(cursor)
+        query = query.where(or_(
+            Meeting.created_at < created_at,
+            and_(Meeting.created_at == created_at, Meeting.id < meeting_pk)
+        ))
+    rows = (await db.execute(
+        query.order_by(Meeting.created_at.desc(), Meeting.id.desc()).limit(limit + 1)
+    )).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    tasks_by_meeting: Dict[str, List[Dict]] = {row.meeting_id: [] for row in rows}
+    if rows:
+        tasks = (await db.execute(
+            select(Task).where(Task.meeting_id.in_(list(tasks_by_meeting))).order_by(Task.id)
+        )).scalars()
+        for task in tasks:
+            tasks_by_meeting[task.meeting_id].append(_task_to_dict(task))
+
+    return {
+        "items": [
+            {
+                "meeting_id": row.meeting_id,
+                "summary": row.summary,
+                "status": "completed" if row.summary else "processing",
+                "created_at": row.created_at.isoformat() if row.created_at else None,
+                "tasks": tasks_by_meeting[row.meeting_id],
+            }
+            for row in rows
+        ],
+        "next_cursor": encode_cursor([rows[-1].created_at, rows[-1].id]) if has_more else None,
+    }
+
+async def list_tasks(db: AsyncSession, assignee: Optional[str] = None, status: Optional[str] = None,
+                     due_from: Optional[date] = None, due_to: Optional[date] = None,
+                     cursor: Optional[str] = None, limit: int = 50) -> Dict:
+    """
+    Tasks by due date (undated last), keyset-paginated on (due_date, id);
+    every filter combination is served by one of the tasks indexes
+    """
+    query = select(Task)
+    if assignee:
+        query = query.where(Task.assignee == assignee)
+    if status == "open":
+        # Tasks stored before statuses were tracked have none and count as open
+        query = query.where(or_(Task.status.is_(None), Task.status == "open"))
+    elif status:
+        query = query.where(Task.status == status)
+    if due_from:
+        query = query.where(Task.due_date >= datetime.combine(due_from, datetime.min.time()))
+    if due_to:
+        query = query.where(Task.due_date <= datetime.combine(due_to, datetime.max.time()))
+    if cursor:
+        due_date, task_id = decode_cursor(cursor)
+        if due_date is None:
+            query = query.where(Task.due_date.is_(None), Task.id > task_id)
+        else:
+            query = query.where(or_(
+                Task.due_date > due_date,
+                and_(Task.due_date == due_date, Task.id > task_id),
+                Task.due_date.is_(None)
+            ))
+    rows = (await db.execute(
+        query.order_by(Task.due_date.asc().nulls_last(), Task.id.asc()).limit(limit + 1)
+    )).scalars().all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        "items": [_task_to_dict(task) for task in rows],
+        "next_cursor": encode_cursor([rows[-1].due_date, rows[-1].id]) if has_more else None,
+    }
@@ -1,7 +1,15 @@
-from fastapi import APIRouter, Request
+from datetime import date
+from typing import Callable, Dict, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.database import get_db
+from ui import queries
+from ui.queries import InvalidCursor, page_etag
 
 # Create templates directory
 templates = Jinja2Templates(directory="ui/templates")
@@ -12,81 +20,83 @@ router = APIRouter()
 async def dashboard(request: Request):
     """Render the main dashboard"""
     return templates.TemplateResponse(
+        request,
         "dashboard.html",
-        {"request": request, "title": "Meeting Assistant Dashboard"}
+        {"title": "Meeting Assistant Dashboard"}
     )
 
+def _not_modified(request: Request, etag: str) -> bool:
+    candidates = request.headers.get("if-none-match", "")
+    return any(tag.strip().removeprefix("W/") == etag for tag in candidates.split(",")) or candidates.strip() == "*"
+
+def _conditional(request: Request, page: Dict, variant: str, render: Callable[[], Response]) -> Response:
+    """
+    Answer 304 when the client already has this exact page, so polling
+    dashboards skip rendering and transfer of unchanged pages
+    """
+    etag = page_etag(page, variant)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    response = render()
+    response.headers.update(headers)
+    return response
+
+def _next_url(request: Request, page: Dict) -> Optional[str]:
+    if not page["next_cursor"]:
+        return None
+    return str(request.url.include_query_params(cursor=page["next_cursor"]))
+
+async def _meetings_page(db: AsyncSession, cursor: Optional[str], limit: int) -> Dict:
+    try:
+        return await queries.list_meetings(db, cursor=cursor, limit=limit)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+async def _tasks_page(db: AsyncSession, assignee: Optional[str], status: Optional[str], due_from: Optional[date],
+                      due_to: Optional[date], cursor: Optional[str], limit: int) -> Dict:
+    try:
+        return await queries.list_tasks(db, assignee=assignee, status=status, due_from=due_from, due_to=due_to,
+                                        cursor=cursor, limit=limit)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.get("/meetings")
-async def list_meetings(request: Request):
-    """List all meetings"""
-    # Demo meeting (in production, these would come from the database)
-    meetings = [
-        {
-            "title": "Project Planning Discussion",
-            "date": "October 19, 2025",
-            "duration": "30 minutes",
-            "status": "Completed",
-            "summary": """
-                <h3><strong>Key Outcomes:</strong></h3>
-                <ul class="list-disc pl-5 space-y-2">
-                    <li>Team established initial roles and responsibilities</li>
-                    <li>Frontend development assigned to Sarah</li>
-                    <li>API integration assigned to Michael</li>
-                    <li>Coordination planned between frontend, backend, and UX teams</li>
-                </ul>
-            """,
-            "tasks": [
-                {
-                    "title": "Complete Frontend Implementation",
-                    "assignee": "Sarah",
-                    "due_date": "2024-10-25"
-                },
-                {
-                    "title": "Create Design Document",
-                    "assignee": "Sarah",
-                    "due_date": "2024-10-16"
-                },
-                {
-                    "title": "Set Up Development Environment",
-                    "assignee": "Michael",
-                    "due_date": "2024-10-15"
-                }
-            ]
-        }
-    ]
-    return templates.TemplateResponse(
+async def list_meetings(request: Request, cursor: Optional[str] = None, limit: int = Query(20, ge=1, le=100),
+                        db: AsyncSession = Depends(get_db)):
+    """List meetings, newest first"""
+    page = await _meetings_page(db, cursor, limit)
+    return _conditional(request, page, "html", lambda: templates.TemplateResponse(
+        request,
         "meetings.html",
-        {"request": request, "meetings": meetings}
-    )
+        {"meetings": page["items"], "next_url": _next_url(request, page)}
+    ))
+
+@router.get("/api/meetings")
+async def list_meetings_json(request: Request, cursor: Optional[str] = None, limit: int = Query(20, ge=1, le=100),
+                             db: AsyncSession = Depends(get_db)):
+    """Meetings with their tasks as JSON; follow next_cursor for the next page"""
+    page = await _meetings_page(db, cursor, limit)
+    return _conditional(request, page, "json", lambda: JSONResponse(page))
 
 @router.get("/tasks")
-async def list_tasks(request: Request):
-    """List all tasks"""
-    # Demo tasks (in production, these would come from the database)
-    tasks = [
-        {
-            "title": "Complete Frontend Implementation",
-            "assignee": "Sarah",
-            "due_date": "2024-10-25",
-            "description": "Implement the frontend components and integrate with the backend API",
-            "completed": False
-        },
-        {
-            "title": "Create Design Document",
-            "assignee": "Sarah",
-            "due_date": "2024-10-16",
-            "description": "Create a comprehensive design document for the project including UX considerations",
-            "completed": False
-        },
-        {
-            "title": "Set Up Development Environment",
-            "assignee": "Michael",
-            "due_date": "2024-10-15",
-            "description": "Configure and set up the development environment for the team",
-            "completed": False
-        }
-    ]
-    return templates.TemplateResponse(
+async def list_tasks(request: Request, assignee: Optional[str] = None, status: Optional[str] = None,
+                     due_from: Optional[date] = None, due_to: Optional[date] = None, cursor: Optional[str] = None,
+                     limit: int = Query(50, ge=1, le=200), db: AsyncSession = Depends(get_db)):
+    """List tasks by due date, filtered by assignee, status and due date range"""
+    page = await _tasks_page(db, assignee, status, due_from, due_to, cursor, limit)
+    filters = {"assignee": assignee or "", "status": status or "", "due_from": due_from or "", "due_to": due_to or ""}
+    return _conditional(request, page, "html", lambda: templates.TemplateResponse(
+        request,
         "tasks.html",
-        {"request": request, "tasks": tasks}
-    )
\ No newline at end of file
+        {"tasks": page["items"], "filters": filters, "next_url": _next_url(request, page)}
+    ))
+
+@router.get("/api/tasks")
+async def list_tasks_json(request: Request, assignee: Optional[str] = None, status: Optional[str] = None,
+                          due_from: Optional[date] = None, due_to: Optional[date] = None,
+                          cursor: Optional[str] = None, limit: int = Query(50, ge=1, le=200),
+                          db: AsyncSession = Depends(get_db)):
+    """Tasks as JSON; follow next_cursor for the next page"""
+    page = await _tasks_page(db, assignee, status, due_from, due_to, cursor, limit)
+    return _conditional(request, page, "json", lambda: JSONResponse(page))